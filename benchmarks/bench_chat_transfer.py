@@ -0,0 +1,145 @@
+"""
+Benchmark of NDJSON chat export and import
+
+Seeds one user with a large history on file-backed SQLite, then, each in
+a fresh process so peak RSS belongs to that phase alone:
+
+- export: ChatExporter streaming to a file (server-side cursor)
+- export-all: the same records built from .all() queries, for comparison
+- import: ChatImporter reading the file back (executemany batches)
+
+Reports messages per second and peak RSS of each phase.
+
+Usage:
+    python benchmarks/bench_chat_transfer.py [messages] [messages_per_session]
+"""
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from config.settings import settings
+from models.database import Base
+from models.user import User
+from models.chat import ChatSession, Message
+import models.chat_summary  # noqa: F401  Register chat tables
+import models.chat_document  # noqa: F401
+import models.chat_archive  # noqa: F401
+from models.chat_indexes import ensure_chat_indexes
+from models.engine import create_database_engine
+from services.chat_transfer import ChatExporter, ChatImporter
+
+CONTENT = "A message of typical length for a chat turn. " * 6
+
+
+def session_factory(url: str):
+    return sessionmaker(bind=create_database_engine(url))
+
+
+def seed(url: str, messages: int, per_session: int):
+    engine = create_database_engine(url)
+    Base.metadata.create_all(bind=engine)
+    ensure_chat_indexes(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        User(email="src@example.com", username="src", hashed_password="x"),
+        User(email="dst@example.com", username="dst", hashed_password="x"),
+    ])
+    db.commit()
+    now = datetime.utcnow()
+    sessions = messages // per_session
+    db.execute(insert(ChatSession), [
+        {"session_id": f"s{i}", "user_id": 1, "title": f"Session {i}", "created_at": now, "updated_at": now}
+        for i in range(sessions)
+    ])
+    for start in range(0, sessions, 1000):
+        db.execute(insert(Message), [
+            {"session_id": pk + 1, "role": "user" if n % 2 == 0 else "assistant",
+             "content": CONTENT, "created_at": now}
+            for pk in range(start, min(start + 1000, sessions))
+            for n in range(per_session)
+        ])
+        db.commit()
+    db.close()
+    engine.dispose()
+
+
+def export_stream(url: str, path: str):
+    db = session_factory(url)()
+    exporter = ChatExporter(settings.CHAT_EXPORT_PAGE_SIZE, settings.CHAT_TRANSFER_BATCH_SIZE)
+    with open(path, "w", encoding="utf-8") as out:
+        for line in exporter.export_user(db, 1):
+            out.write(line)
+
+
+def export_all(url: str, path: str):
+    db = session_factory(url)()
+    sessions = db.query(ChatSession).filter(ChatSession.user_id == 1).order_by(ChatSession.id).all()
+    messages = db.query(Message).order_by(Message.session_id, Message.id).all()
+    by_session = {}
+    for message in messages:
+        by_session.setdefault(message.session_id, []).append(message)
+    with open(path, "w", encoding="utf-8") as out:
+        for session in sessions:
+            out.write(json.dumps({"type": "session", "session_id": session.session_id}) + "\n")
+            for message in by_session.get(session.id, []):
+                out.write(json.dumps({
+                    "type": "message", "session_id": session.session_id,
+                    "role": message.role, "content": message.content,
+                    "created_at": message.created_at.isoformat(),
+                }) + "\n")
+
+
+def import_file(url: str, path: str):
+    db = session_factory(url)()
+    with open(path, encoding="utf-8") as lines:
+        # Re-key the sessions so they import instead of being skipped
+        renamed = (line.replace('"session_id": "s', '"session_id": "imported-s', 1) for line in lines)
+        ChatImporter(2).import_lines(db, renamed, settings.CHAT_TRANSFER_BATCH_SIZE)
+
+
+def measured(target, url: str, path: str, queue):
+    start = time.perf_counter()
+    target(url, path)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def run_phase(name: str, target, url: str, path: str, messages: int):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=measured, args=(target, url, path, queue))
+    process.start()
+    elapsed, peak_mb = queue.get()
+    process.join()
+    print(f"{name:<12} {elapsed:8.1f}s {messages / elapsed:12,.0f} msg/s  peak RSS {peak_mb:7.0f} MB")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    directory = tempfile.mkdtemp()
+    url = f"sqlite:///{directory}/bench.db"
+    path = os.path.join(directory, "export.ndjson")
+
+    start = time.perf_counter()
+    seed(url, messages, per_session)
+    print(f"Seeded {messages:,} messages in {messages // per_session:,} sessions ({time.perf_counter() - start:.1f}s)")
+
+    run_phase("export-all", export_all, url, path, messages)
+    run_phase("export", export_stream, url, path, messages)
+    print(f"{'':<12} file {os.path.getsize(path) / 2**20:,.0f} MB")
+    run_phase("import", import_file, url, path, messages)
+
+
+if __name__ == "__main__":
+    main()
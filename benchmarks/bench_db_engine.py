@@ -0,0 +1,121 @@
+"""
+Benchmark of concurrent chat write throughput per database engine configuration
+
+Each worker thread plays chat turns the way ChatService does: resolve the
+session, read the recent history window, then save the turn. Reports
+turns per second, latency and "database is locked" failures for:
+
+- sqlite-default: plain engine, rollback journal (the previous setup)
+- sqlite-wal: WAL, synchronous=NORMAL, busy timeout (the defaults now)
+- sqlite-wal-full: as above with synchronous=FULL
+- postgres: pooled engine, if BENCH_POSTGRES_URL is set
+
+Usage:
+    python benchmarks/bench_db_engine.py [threads] [turns]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from config.settings import settings
+from models.database import Base
+from models.user import User
+import models.chat  # noqa: F401  Register chat tables
+import models.chat_summary  # noqa: F401
+import models.chat_document  # noqa: F401
+from models.chat_indexes import ensure_chat_indexes
+from models.engine import configure_sqlite, engine_options
+from services.chat_repository import ChatRepository
+
+SESSIONS = 32
+REPLY = "An answer of typical length. " * 20
+
+
+def sqlite_engine(path: str, tuned: bool, synchronous: str = "NORMAL"):
+    url = f"sqlite:///{path}"
+    if not tuned:
+        return create_engine(url, connect_args={"check_same_thread": False})
+    engine = create_engine(url, **engine_options(url))
+    configure_sqlite(
+        engine,
+        journal_mode="WAL",
+        synchronous=synchronous,
+        busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS
+    )
+    return engine
+
+
+def run(name: str, engine, threads: int, turns: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    ensure_chat_indexes(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    with factory() as db:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        db.add(user)
+        db.commit()
+        session_ids = [ChatRepository.create_session(db, user.id, f"s{i}").session_id for i in range(SESSIONS)]
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def turn(n: int):
+        start = time.perf_counter()
+        try:
+            with factory() as db:
+                chat_session = ChatRepository.get_session_by_id(db, session_ids[n % SESSIONS])
+                ChatRepository.get_recent_messages(db, chat_session, limit=settings.CHAT_HISTORY_WINDOW)
+                ChatRepository.save_turn(db, chat_session, f"question {n}", REPLY)
+        except OperationalError as e:
+            with lock:
+                errors.append(str(e.orig))
+            return
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(turn, range(turns)))
+    elapsed = time.perf_counter() - started
+
+    p95 = statistics.quantiles(latencies, n=20)[18] if len(latencies) > 1 else 0.0
+    print(
+        f"{name:<22} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies):>8.1f} "
+        f"{p95:>8.1f} {len(errors):>7}"
+    )
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print(f"{threads} threads, {turns} turns")
+    print(f"{'config':<22} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'locked':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        run("sqlite-default", sqlite_engine(os.path.join(directory, "a.db"), tuned=False), threads, turns)
+        run("sqlite-wal", sqlite_engine(os.path.join(directory, "b.db"), tuned=True), threads, turns)
+        run(
+            "sqlite-wal-full",
+            sqlite_engine(os.path.join(directory, "c.db"), tuned=True, synchronous="FULL"),
+            threads, turns
+        )
+    postgres_url = os.environ.get("BENCH_POSTGRES_URL")
+    if postgres_url:
+        run("postgres", create_engine(postgres_url, **engine_options(postgres_url)), threads, turns)
+
+
+if __name__ == "__main__":
+    main()
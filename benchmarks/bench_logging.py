@@ -0,0 +1,131 @@
+"""
+Microbenchmark of per-request logging cost on the calling thread
+
+A "request" logs the INFO lines of a chat turn (five records). Compares:
+
+- sync: the previous setup, a FileHandler and a StreamHandler formatting
+  and writing in the caller
+- queued: the shared QueueHandler/QueueListener pipeline (JSON records)
+- queued+sampled: the same with LOG_INFO_SAMPLE_RATE=0.1
+
+Console output goes to a file in both cases so the terminal does not
+dominate. With stall_ms, every 1000th write to a log file sleeps that
+long, standing in for a slow disk, rotation or a full pipe. Reports
+caller time per request (mean, p99, max) and, for the queued runs, how
+long the listener took to drain afterwards.
+
+Usage:
+    python benchmarks/bench_logging.py [requests] [stall_ms]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.settings import settings
+from utils import logger as log_module
+from utils.request_id import request_id_var
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+STALL_EVERY = 1000
+stall_seconds = 0.0
+
+
+class StallingFile:
+    """File wrapper whose writes occasionally block"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+        self._writes = 0
+
+    def write(self, text: str):
+        self._writes += 1
+        if stall_seconds and self._writes % STALL_EVERY == 0:
+            time.sleep(stall_seconds)
+        return self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def sync_logger(directory: str) -> logging.Logger:
+    logger = logging.getLogger("bench.sync")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for path in ("console.log", "app.log"):
+        handler = logging.StreamHandler(StallingFile(os.path.join(directory, path)))
+        handler.setFormatter(logging.Formatter(FORMAT))
+        logger.addHandler(handler)
+    return logger
+
+
+def queued_logger(directory: str, name: str, sample_rate: float):
+    settings.LOG_FILE = os.path.join(directory, f"{name}.log")
+    settings.LOG_INFO_SAMPLE_RATE = sample_rate
+    log_module._pipeline = None
+    pipeline = log_module.get_log_pipeline()
+    # Sinks write to the same kind of files as the sync run
+    pipeline.sinks[0].setStream(StallingFile(os.path.join(directory, f"{name}-console.log")))
+    pipeline.sinks[1].setStream(StallingFile(os.path.join(directory, f"{name}.log")))
+    logger = logging.getLogger(f"bench.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(pipeline.handler)
+    return logger, pipeline
+
+
+def one_request(logger: logging.Logger, i: int):
+    session_id = f"3f2b8c1e-{i:08d}"
+    logger.info(f"Chat turn tokens for session {session_id}: {{'history': 812, 'context': 0, 'total': 1024}}")
+    logger.info(f"Saved turn for session {session_id}")
+    logger.info(f"Auto-updated session {session_id} title (42 chars)")
+    logger.info(f"Updated title for session {session_id}")
+    logger.info(f"User 'alice' request {i} completed")
+
+
+def run(name: str, logger: logging.Logger, requests: int):
+    timings = []
+    for i in range(requests):
+        token = request_id_var.set(f"req-{i}")
+        start = time.perf_counter()
+        one_request(logger, i)
+        timings.append(time.perf_counter() - start)
+        request_id_var.reset(token)
+    timings.sort()
+    mean = sum(timings) / len(timings) * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"{name:<16} {mean:8.1f} us/request  p99 {p99:8.1f} us  max {timings[-1] * 1e3:6.1f} ms", end="")
+
+
+def main():
+    global stall_seconds
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    stall_seconds = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    directory = tempfile.mkdtemp()
+    settings.LOG_QUEUE_SIZE = requests * 5 + 1
+
+    run("sync", sync_logger(directory), requests)
+    print()
+
+    for name, rate in (("queued", 1.0), ("queued+sampled", 0.1)):
+        logger, pipeline = queued_logger(directory, name.replace("+", "-"), rate)
+        run(name, logger, requests)
+        start = time.perf_counter()
+        pipeline.stop()
+        print(f"  (drained in {time.perf_counter() - start:.2f}s, dropped {pipeline.stats()['dropped']})")
+
+
+if __name__ == "__main__":
+    main()
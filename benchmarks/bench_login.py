@@ -0,0 +1,100 @@
+"""
+Benchmark of login throughput and event-loop lag versus bcrypt cost
+
+Runs a burst of concurrent logins against an in-memory aiosqlite
+database for each cost factor, two ways:
+
+- inline: AuthService.authenticate_user inside the session (bcrypt on the event loop)
+- pool: AsyncAuthRepository.authenticate_user (bcrypt in the password_hasher pool)
+
+A ticker task sleeping 10 ms measures how late the event loop wakes it,
+which is the delay every other request on the worker sees during the burst.
+
+Usage:
+    python benchmarks/bench_login.py [logins] [concurrency] [costs, e.g. 10,11,12]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config.settings import settings
+from models.database import Base
+from models.user import User
+from services import async_repositories
+from services.async_repositories import AsyncAuthRepository
+from services.auth_service import AuthService
+from services.password_hasher import PasswordHasher, hash_password
+from utils.db import run_db
+
+TICK = 0.01
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def burst(factory, login, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            async with factory() as db:
+                assert await login(db) is not None
+
+    lags, stop = [], asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    lags.sort()
+    return logins / elapsed, lags[len(lags) // 2] * 1000, lags[-1] * 1000
+
+
+async def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    costs = [int(c) for c in sys.argv[3].split(",")] if len(sys.argv) > 3 else [10, 11, 12]
+    print(f"{logins} logins, {concurrency} concurrent, {os.cpu_count()} CPUs, "
+          f"{settings.PASSWORD_HASH_MAX_WORKERS} pool workers")
+    print(f"{'cost':>4} {'mode':<7} {'logins/s':>9} {'loop lag p50':>13} {'max':>9}")
+
+    for cost in costs:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with factory() as db:
+            db.add(User(email="a@example.com", username="alice",
+                        hashed_password=hash_password("secret1", cost), is_active=True))
+            await db.commit()
+
+        async_repositories.password_hasher = PasswordHasher(
+            rounds=cost,
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+            max_queue_size=logins,
+            max_per_ip=logins,
+            max_per_username=logins
+        )
+        modes = {
+            "inline": lambda db: run_db(db, AuthService.authenticate_user, "alice", "secret1"),
+            "pool": lambda db: AsyncAuthRepository.authenticate_user(db, "alice", "secret1"),
+        }
+        for mode, login in modes.items():
+            rate, p50, worst = await burst(factory, login, logins, concurrency)
+            print(f"{cost:>4} {mode:<7} {rate:>9.1f} {p50:>11.1f}ms {worst:>7.1f}ms")
+        async_repositories.password_hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark of BM25 retrieval index build time and query latency
+
+Builds indexes over synthetic documents of increasing size, chunked the
+same way as chat attachments, and times top-k queries against them.
+Compares with scoring every chunk per query (what a turn cost before the
+index existed).
+
+Usage:
+    python benchmarks/bench_retrieval_index.py
+"""
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.settings import settings
+from services.retrieval_index import BM25Index, RetrievalIndexStore, tokenize
+from services.text_chunker import TextChunker
+
+PAGE_CHARS = 3000
+PAGES = [10, 50, 200, 1000]
+QUERIES = 200
+TOP_K = settings.CHAT_DOCUMENT_MAX_PASSAGES * 3
+
+random.seed(7)
+VOCABULARY = [f"term{i}" for i in range(20000)]
+COMMON = ["the", "and", "of", "to", "in", "is", "for", "that", "with", "on"]
+
+
+def make_document(pages: int) -> str:
+    words = []
+    target = pages * PAGE_CHARS
+    size = 0
+    while size < target:
+        word = random.choice(COMMON) if random.random() < 0.4 else random.choice(VOCABULARY[:2000 + pages * 20])
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def scan(chunks, query: str, k: int):
+    """Score every chunk per query"""
+    query_terms = set(tokenize(query))
+    chunk_terms = [Counter(tokenize(content)) for _, _, content in chunks]
+    frequency = Counter()
+    for terms in chunk_terms:
+        frequency.update(query_terms & terms.keys())
+    scores = [
+        sum((1 + math.log(terms[t])) * math.log(1 + len(chunks) / frequency[t]) for t in query_terms if terms[t])
+        for terms in chunk_terms
+    ]
+    return sorted(range(len(chunks)), key=lambda i: -scores[i])[:k]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    chunker = TextChunker(
+        max_chars=settings.CHAT_DOCUMENT_CHUNK_CHARS,
+        overlap_chars=settings.CHAT_DOCUMENT_CHUNK_OVERLAP
+    )
+    print(f"{'pages':>6} {'chunks':>7} {'build ms':>9} {'save ms':>8} {'load ms':>8} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'scan p50 ms':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in PAGES:
+            text = make_document(pages)
+            chunks = [(i, 1, chunk) for i, chunk in enumerate(chunker.split(text))]
+
+            index, build_ms = timed(BM25Index.build, [1], chunks)
+            store = RetrievalIndexStore(directory, max_cached=1)
+            _, save_ms = timed(store._save, pages, index)
+            _, load_ms = timed(store._load, pages)
+
+            queries = [
+                " ".join(random.choice(COMMON + VOCABULARY[:2000]) for _ in range(random.randint(3, 12)))
+                for _ in range(QUERIES)
+            ]
+            latencies = [timed(index.search, query, TOP_K)[1] for query in queries]
+            scans = [timed(scan, chunks, query, TOP_K)[1] for query in queries[:10]]
+
+            print(
+                f"{pages:>6} {len(chunks):>7} {build_ms:>9.1f} {save_ms:>8.1f} {load_ms:>8.1f} "
+                f"{statistics.median(latencies):>7.2f} {statistics.quantiles(latencies, n=20)[18]:>7.2f} "
+                f"{statistics.median(scans):>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Load test of the sync and async repository paths inside one event loop
+
+Requests arrive at a fixed rate and each plays a chat turn the way the
+chat endpoints do: resolve the session, read the history window, save
+the turn. The sync path calls ChatRepository with a Session (queries
+block the loop); the async path calls AsyncChatRepository with an
+AsyncSession (aiosqlite). Latency is measured from each request's
+arrival time, so time spent waiting for a blocked loop counts. A probe
+also measures event-loop lag: how late a 1 ms timer fires, which is what
+every other request on the worker (health checks, streaming chunks)
+waits for.
+
+Usage:
+    python benchmarks/load_chat_db.py [requests_per_second] [seconds]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy.orm import sessionmaker
+
+from config.settings import settings
+from models.database import Base
+from models.user import User
+import models.chat  # noqa: F401  Register chat tables
+import models.chat_summary  # noqa: F401
+import models.chat_document  # noqa: F401
+from models.async_database import create_async_database_engine, async_sessionmaker
+from models.chat_indexes import ensure_chat_indexes
+from models.engine import create_database_engine
+from services.async_repositories import AsyncChatRepository
+from services.chat_repository import ChatRepository
+
+SESSIONS = 32
+PROBE_INTERVAL = 0.001
+REPLY = "An answer of typical length. " * 20
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else 0.0
+
+
+async def probe(lags, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((loop.time() - start - PROBE_INTERVAL) * 1000)
+
+
+async def run(name: str, turn, rate: float, seconds: float):
+    latencies = []
+    lags = []
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    async def request(n: int, arrival: float):
+        await turn(n)
+        latencies.append((loop.time() - arrival) * 1000)
+
+    probe_task = asyncio.create_task(probe(lags, stop))
+    started = loop.time()
+    tasks = []
+    for n in range(int(rate * seconds)):
+        arrival = started + n / rate
+        delay = arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(n, arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+    stop.set()
+    await probe_task
+
+    print(
+        f"{name:<6} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies):>8.1f} "
+        f"{percentile(latencies, 99):>8.1f} {statistics.median(lags):>8.2f} {percentile(lags, 99):>8.2f}"
+    )
+
+
+async def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{rate:g} requests/s for {seconds:g} s")
+    print(f"{'path':<6} {'turns/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'lag p50':>8} {'lag p99':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'load.db')}"
+        engine = create_database_engine(url)
+        Base.metadata.create_all(bind=engine)
+        ensure_chat_indexes(engine)
+        factory = sessionmaker(bind=engine, autoflush=False)
+        with factory() as db:
+            user = User(email="load@example.com", username="load", hashed_password="x")
+            db.add(user)
+            db.commit()
+            session_ids = [ChatRepository.create_session(db, user.id, f"s{i}").session_id for i in range(SESSIONS)]
+
+        async def sync_turn(n: int):
+            with factory() as db:
+                chat_session = ChatRepository.get_session_by_id(db, session_ids[n % SESSIONS])
+                ChatRepository.get_recent_messages(db, chat_session, limit=settings.CHAT_HISTORY_WINDOW)
+                ChatRepository.save_turn(db, chat_session, f"question {n}", REPLY)
+
+        async_engine = create_async_database_engine(url)
+        async_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+        async def async_turn(n: int):
+            async with async_factory() as db:
+                chat_session = await AsyncChatRepository.get_session_by_id(db, session_ids[n % SESSIONS])
+                await AsyncChatRepository.get_recent_messages(
+                    db, chat_session, limit=settings.CHAT_HISTORY_WINDOW
+                )
+                await AsyncChatRepository.save_turn(db, chat_session, f"question {n}", REPLY)
+
+        await run("sync", sync_turn, rate, seconds)
+        await run("async", async_turn, rate, seconds)
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
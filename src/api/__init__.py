@@ -1,5 +1,6 @@
 from .health import router as health_router
 from .summarizer import router as summarizer_router
 from .chat import router as chat_router
+from .jobs import router as jobs_router
 
-__all__ = ["health_router", "summarizer_router", "chat_router"]
+__all__ = ["health_router", "summarizer_router", "chat_router", "jobs_router"]
@@ -1,15 +1,18 @@
 """
 Authentication API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from models.database import get_db
+from models.async_database import get_request_db
 from models.schemas import UserCreate, UserResponse, Token, UserLogin
+from services.async_repositories import AsyncAuthRepository
 from services.auth_service import AuthService
+from services.principal_cache import principal_cache
+from services.password_hasher import password_hasher, LoginThrottledError, PasswordQueueFullError
 from config.settings import settings
+from utils.db import DbSession
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -20,15 +23,27 @@ router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+def client_ip(request: Request):
+    """Address of the client, used to limit concurrent logins"""
+    return request.client.host if request.client else None
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Dependency to get current authenticated user from JWT token
+    
+    Verified tokens and the users they resolve to are cached briefly
+    (see principal_cache), so most requests skip the user query.
     """
-    token_data = AuthService.decode_access_token(token)
-    user = AuthService.get_user_by_username(db, username=token_data.username)
+    token_data = principal_cache.decode_token(token)
+    user = principal_cache.get(token_data.username, token_data.user_id)
+    if user is None:
+        user = await AsyncAuthRepository.get_user_by_username(db, username=token_data.username)
+        if user is not None:
+            principal_cache.set(token_data.username, token_data.user_id, user)
     
     if user is None:
         raise HTTPException(
@@ -60,8 +75,9 @@ async def get_current_active_user(current_user = Depends(get_current_user)):
 
 @router.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
+    request: Request,
     user_create: UserCreate,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Register a new user
@@ -73,10 +89,11 @@ async def register(
     - **full_name**: Optional full name
     """
     try:
-        user = AuthService.create_user(db, user_create)
+        async with password_hasher.limit(client_ip(request), user_create.username):
+            user = await AsyncAuthRepository.create_user(db, user_create)
         logger.info(f"User registered successfully: {user.username}")
         return user
-    except HTTPException:
+    except (HTTPException, LoginThrottledError, PasswordQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Error during registration: {str(e)}")
@@ -88,18 +105,21 @@ async def register(
 
 @router.post("/auth/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Login with username/email and password
     
-    Returns JWT access token for authentication
+    Returns JWT access token for authentication. Too many logins in
+    flight from one client or for one username get 429.
     
     - **username**: Username or email
     - **password**: User password
     """
-    user = AuthService.authenticate_user(db, form_data.username, form_data.password)
+    async with password_hasher.limit(client_ip(request), form_data.username):
+        user = await AsyncAuthRepository.authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         logger.warning(f"Failed login attempt for: {form_data.username}")
@@ -122,8 +142,9 @@ async def login(
 
 @router.post("/auth/login-json", response_model=Token)
 async def login_json(
+    request: Request,
     user_login: UserLogin,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Login with JSON payload (alternative to form data)
@@ -133,7 +154,8 @@ async def login_json(
     - **username**: Username or email
     - **password**: User password
     """
-    user = AuthService.authenticate_user(db, user_login.username, user_login.password)
+    async with password_hasher.limit(client_ip(request), user_login.username):
+        user = await AsyncAuthRepository.authenticate_user(db, user_login.username, user_login.password)
     
     if not user:
         logger.warning(f"Failed login attempt for: {user_login.username}")
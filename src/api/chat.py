@@ -1,32 +1,62 @@
 """
 Chat endpoints for conversational interface with database persistence
 """
-from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Union
 from datetime import datetime
+from contextlib import aclosing
+import asyncio
 
-from models.database import get_db
+from config.settings import settings
+from models.async_database import get_request_db
 from models.schemas import (
     ChatSessionCreate, ChatSessionResponse, ChatMessageRequest,
     ChatMessageResponse, ChatHistoryResponse, MessageResponse
 )
 from services.chat_service import chat_service
-from services.file_processor_service import FileProcessorService
+from services.chat_transfer import ChatImporter, chat_exporter, NDJSON_MEDIA_TYPE
+from services.document_store import document_store
+from services.inference_executor import InferenceQueueFullError
+from services.upload_ingestion import UploadTooLargeError
 from api.auth import get_current_active_user
 from models.user import User
+from utils.db import DbSession, db_session, run_db
 from utils.logger import setup_logger
+from utils.sse import sse_event, SSE_HEADERS
 
 router = APIRouter()
 logger = setup_logger(__name__)
-file_processor = FileProcessorService()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class ChatSessionSummaryResponse(ChatSessionResponse):
+    """Chat session in a listing, with a preview of its latest message"""
+    last_message_preview: Optional[str] = None
+
+
+class ChatDocumentResponse(BaseModel):
+    """Document attached to a chat session"""
+    id: int
+    filename: str
+    char_count: int
+    chunk_count: int
+    created_at: Optional[datetime] = None
+
+
+class ChatTurnResponse(ChatMessageResponse):
+    """Chat reply with the approximate token counts of the prompt"""
+    token_usage: Optional[Dict[str, Union[int, bool]]] = None
 
 
 @router.post("/chat/sessions", response_model=ChatSessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_chat_session(
     session_data: ChatSessionCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Create a new chat session for the authenticated user
@@ -34,9 +64,11 @@ async def create_chat_session(
     Requires authentication token in Authorization header
     """
     try:
-        session_id = chat_service.create_session(db, current_user.id, session_data.title)
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.create_session(
+            db, current_user.id, session_data.title
+        )
         
+        # A new session has no messages; no need to load or count them
         return ChatSessionResponse(
             id=session.id,
             session_id=session.session_id,
@@ -44,48 +76,112 @@ async def create_chat_session(
             title=session.title,
             created_at=session.created_at,
             updated_at=session.updated_at,
-            message_count=len(session.messages)
+            message_count=0
         )
     except Exception as e:
         logger.error(f"Error creating chat session: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/chat/sessions", response_model=List[ChatSessionResponse])
+@router.get("/chat/sessions", response_model=List[ChatSessionSummaryResponse])
 async def get_user_chat_sessions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
-    Get all chat sessions for the authenticated user
+    Get chat sessions for the authenticated user, most recently active first
+    
+    Results are paginated: when more sessions exist, the X-Next-Cursor
+    response header holds the cursor to pass for the next page.
     
     Requires authentication token in Authorization header
     """
     try:
-        sessions = chat_service.get_user_sessions(db, current_user.id)
+        sessions, next_cursor = await chat_service.list_sessions(db, current_user.id, limit, cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [
-            ChatSessionResponse(
+            ChatSessionSummaryResponse(
                 id=session.id,
                 session_id=session.session_id,
                 user_id=session.user_id,
                 title=session.title,
                 created_at=session.created_at,
                 updated_at=session.updated_at,
-                message_count=len(session.messages)
+                message_count=message_count,
+                last_message_preview=preview
             )
-            for session in sessions
+            for session, message_count, preview in sessions
         ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving chat sessions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/chat/sessions/{session_id}/messages", response_model=ChatMessageResponse)
+def _export_lines(user_id: int) -> Iterator[str]:
+    # Runs in the threadpool with its own session, held open while streaming
+    with db_session() as db:
+        yield from chat_exporter.export_user(db, user_id)
+
+
+@router.get("/chat/export")
+async def export_chat_history(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Export all chat sessions of the authenticated user as NDJSON
+    
+    The response is streamed: a session line followed by its message
+    lines, for each session. Archived sessions are included.
+    
+    Requires authentication token in Authorization header
+    """
+    return StreamingResponse(
+        _export_lines(current_user.id),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="chat-export.ndjson"'}
+    )
+
+
+@router.post("/chat/import")
+async def import_chat_history(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: DbSession = Depends(get_request_db)
+):
+    """
+    Import chat sessions from an NDJSON body produced by /chat/export
+    
+    The body is read as it arrives and written in batches. A malformed
+    line stops the import; batches before it stay imported, and sending
+    the corrected body again adds only the messages that are missing.
+    
+    Requires authentication token in Authorization header
+    """
+    importer = ChatImporter(current_user.id)
+    try:
+        stats = await importer.import_stream(db, request.stream(), settings.CHAT_TRANSFER_BATCH_SIZE)
+        logger.info(f"Imported {stats['sessions']} chat sessions ({stats['messages']} messages) for user {current_user.id}")
+        return stats
+    except ValueError as e:
+        await run_db(db, Session.rollback)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing chat history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/sessions/{session_id}/messages", response_model=ChatTurnResponse)
 async def send_chat_message(
     session_id: str,
     request: ChatMessageRequest,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Send a message in a chat session
@@ -94,27 +190,31 @@ async def send_chat_message(
     """
     try:
         # Verify session belongs to user
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
         # Process chat message
+        usage = {}
         response = await chat_service.chat(
             db=db,
             session_id=session_id,
             message=request.message,
-            context=request.context
+            context=request.context,
+            chat_session=session,
+            usage=usage
         )
         
-        return ChatMessageResponse(
+        return ChatTurnResponse(
             session_id=session_id,
             user_message=request.message,
             assistant_response=response,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.utcnow(),
+            token_usage=usage
         )
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -123,26 +223,100 @@ async def send_chat_message(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/sessions/{session_id}/messages/stream")
+async def send_chat_message_stream(
+    session_id: str,
+    request: ChatMessageRequest,
+    http_request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: DbSession = Depends(get_request_db)
+):
+    """
+    Send a message in a chat session and stream the reply as Server-Sent Events
+    
+    Events are JSON objects: {"type": "token", "text": ...} for each piece,
+    then {"type": "done", ...} once the reply has been saved, or
+    {"type": "error", "detail": ...}.
+    
+    Requires authentication token in Authorization header
+    """
+    # Verify session belongs to user
+    session = await chat_service.async_repository.get_session_by_id(db, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied to this session")
+    
+    # Reject with 503 before the stream starts rather than mid-stream
+    chat_service.executor.ensure_capacity()
+    
+    async def events():
+        parts = []
+        usage = {}
+        try:
+            stream = chat_service.chat_stream(
+                db=db,
+                session_id=session_id,
+                message=request.message,
+                context=request.context,
+                chat_session=session,
+                usage=usage
+            )
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if await http_request.is_disconnected():
+                        logger.info(f"Client disconnected from chat stream {session_id}")
+                        return
+                    parts.append(chunk)
+                    yield sse_event({"type": "token", "text": chunk})
+            
+            yield sse_event({
+                "type": "done",
+                "session_id": session_id,
+                "user_message": request.message,
+                "assistant_response": "".join(parts),
+                "timestamp": datetime.utcnow().isoformat(),
+                "token_usage": usage
+            })
+        except asyncio.CancelledError:
+            logger.info(f"Chat stream {session_id} cancelled by client")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {str(e)}")
+            yield sse_event({"type": "error", "detail": str(e)})
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/chat/sessions/{session_id}/history", response_model=ChatHistoryResponse)
 async def get_chat_history(
     session_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Get chat history for a session
     
+    Returns the latest `limit` messages in chronological order. When older
+    messages exist, the X-Next-Cursor response header holds the cursor to
+    pass for the previous page. total_messages counts the whole session.
+    
     Requires authentication token in Authorization header
     """
     try:
         # Verify session belongs to user
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
-        messages = chat_service.get_session_history(db, session_id)
+        messages, next_cursor = await chat_service.get_history_page(db, session, limit, cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         
         return ChatHistoryResponse(
             session_id=session_id,
@@ -156,10 +330,12 @@ async def get_chat_history(
                 )
                 for msg in messages
             ],
-            total_messages=len(messages)
+            total_messages=await chat_service.async_repository.count_messages(db, session)
         )
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving chat history: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,7 +345,7 @@ async def get_chat_history(
 async def delete_chat_session(
     session_id: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Delete a chat session
@@ -178,13 +354,13 @@ async def delete_chat_session(
     """
     try:
         # Verify session belongs to user
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
-        chat_service.delete_session(db, session_id)
+        await chat_service.delete_session(db, session_id)
         return {"message": "Session deleted successfully"}
     except HTTPException:
         raise
@@ -198,7 +374,7 @@ async def update_chat_session_title(
     session_id: str,
     title: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Update chat session title
@@ -207,13 +383,13 @@ async def update_chat_session_title(
     """
     try:
         # Verify session belongs to user
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
-        updated_session = chat_service.update_session_title(db, session_id, title)
+        updated_session = await chat_service.update_session_title(db, session_id, title)
         return {"message": "Title updated successfully", "title": updated_session.title}
     except HTTPException:
         raise
@@ -222,37 +398,39 @@ async def update_chat_session_title(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/chat/sessions/{session_id}/messages/file", response_model=ChatMessageResponse)
+@router.post("/chat/sessions/{session_id}/messages/file", response_model=ChatTurnResponse)
 async def send_chat_message_with_file(
     session_id: str,
     message: str = Form(...),
     file: Optional[UploadFile] = File(None),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_request_db)
 ):
     """
     Send a chat message with optional file attachment (PDF, DOCX, TXT)
     
-    The AI will analyze the file content and include it in the conversation context.
+    The file is stored with the session (once per content) and the passages
+    relevant to each message, this one and later ones, are included in the
+    conversation context.
     Requires authentication token in Authorization header.
     """
     try:
         # Verify session belongs to user
-        session = chat_service.repository.get_session_by_id(db, session_id)
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
-        # Extract text from file if provided
-        context = None
+        # Store the file with the session; later turns retrieve from it too
         if file:
             logger.info(f"Processing uploaded file: {file.filename}")
             try:
-                file_text = await file_processor.extract_text(file)
-                if file_text:
-                    context = f"[Attached document: {file.filename}]\n\n{file_text}"
-                    logger.info(f"Extracted {len(file_text)} characters from {file.filename}")
+                document, reused = await document_store.add_upload(db, session, file)
+                if not reused:
+                    logger.info(f"Extracted {document.char_count} characters from {file.filename}")
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
             except Exception as e:
                 logger.error(f"Error extracting file content: {str(e)}")
                 raise HTTPException(
@@ -260,24 +438,91 @@ async def send_chat_message_with_file(
                     detail=f"Could not process file: {str(e)}"
                 )
         
-        # Process chat message with file context
+        # Process chat message; relevant passages are added from the session's documents
+        usage = {}
         response = await chat_service.chat(
             db=db,
             session_id=session_id,
             message=message,
-            context=context
+            chat_session=session,
+            usage=usage
         )
         
-        return ChatMessageResponse(
+        return ChatTurnResponse(
             session_id=session_id,
             user_message=message,
             assistant_response=response,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.utcnow(),
+            token_usage=usage
         )
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing chat message with file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/chat/sessions/{session_id}/documents", response_model=List[ChatDocumentResponse])
+async def list_chat_documents(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: DbSession = Depends(get_request_db)
+):
+    """
+    List documents attached to a chat session
+    
+    Requires authentication token in Authorization header
+    """
+    try:
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied to this session")
+        
+        return [
+            ChatDocumentResponse(
+                id=document.id,
+                filename=document.filename,
+                char_count=document.char_count,
+                chunk_count=document.chunk_count,
+                created_at=document.created_at
+            )
+            for document in await run_db(db, document_store.list_documents, session)
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error listing chat documents: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/chat/sessions/{session_id}/documents/{document_id}")
+async def delete_chat_document(
+    session_id: str,
+    document_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: DbSession = Depends(get_request_db)
+):
+    """
+    Detach a document from a chat session
+    
+    Requires authentication token in Authorization header
+    """
+    try:
+        session = await chat_service.async_repository.get_session_by_id(db, session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if session.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Access denied to this session")
+        
+        if not await run_db(db, document_store.delete_document, session, document_id):
+            raise HTTPException(status_code=404, detail="Document not found")
+        return {"message": "Document deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting chat document: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,8 +2,16 @@
 Health check endpoints
 """
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
+from services.inference_executor import inference_executor
+from services.upload_ingestion import upload_ingestor
+from services.job_service import job_service
+from services.principal_cache import principal_cache
+from services.readiness import readiness_probe
+from utils.logger import get_log_pipeline
+
 router = APIRouter()
 
 @router.get("/health")
@@ -12,5 +20,35 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "Text Summarizer API"
+        "service": "Text Summarizer API",
+        "inference": inference_executor.stats(),
+        "uploads": upload_ingestor.stats(),
+        "jobs": job_service.stats(),
+        "auth_cache": principal_cache.stats(),
+        "logging": get_log_pipeline().stats()
     }
+
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and its event loop is serving requests"""
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: database, event loop, inference queue and scraper pool
+
+    Returns 503 while any check is past its threshold, so load balancers
+    stop routing to this worker until it recovers.
+    """
+    ready, checks = await readiness_probe.check()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "timestamp": datetime.utcnow().isoformat(),
+            "checks": checks
+        }
+    )
@@ -0,0 +1,177 @@
+"""
+Background summarization job endpoints
+"""
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import Optional, Literal
+from datetime import datetime
+
+from models.database import get_db
+from models.job import SummarizationJob
+from api.summarizer import TextSummarizeRequest, URLSummarizeRequest, SummarizeResponse
+from services.job_repository import TERMINAL_STATUSES
+from services.job_service import job_service
+from services.upload_ingestion import UploadTooLargeError
+from utils.logger import setup_logger
+
+router = APIRouter()
+logger = setup_logger(__name__)
+
+
+class JobProgress(BaseModel):
+    """Progress of a running job"""
+    stage: Optional[str] = None
+    pages_done: int = 0
+    pages_total: int = 0
+    chunks_done: int = 0
+    chunks_total: int = 0
+
+
+class JobResponse(BaseModel):
+    """Response model for job status"""
+    job_id: str
+    status: str
+    source_type: str
+    length: str
+    progress: JobProgress
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def _job_response(job: SummarizationJob) -> JobResponse:
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        source_type=job.source_type,
+        length=job.length,
+        progress=JobProgress(
+            stage=job.stage,
+            pages_done=job.pages_done or 0,
+            pages_total=job.pages_total or 0,
+            chunks_done=job.chunks_done or 0,
+            chunks_total=job.chunks_total or 0
+        ),
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+@router.post("/jobs/summarize/text", response_model=JobResponse, status_code=202)
+async def submit_text_job(request: TextSummarizeRequest):
+    """
+    Queue text summarization and return immediately with a job ID
+    """
+    try:
+        job = await job_service.submit_text(request.text, request.length)
+        return _job_response(job)
+    except Exception as e:
+        logger.error(f"Error queueing text job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs/summarize/url", response_model=JobResponse, status_code=202)
+async def submit_url_job(request: URLSummarizeRequest):
+    """
+    Queue URL summarization and return immediately with a job ID
+    """
+    try:
+        job = await job_service.submit_url(str(request.url), request.length)
+        return _job_response(job)
+    except Exception as e:
+        logger.error(f"Error queueing URL job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/jobs/summarize/file", response_model=JobResponse, status_code=202)
+async def submit_file_job(
+    file: UploadFile = File(...),
+    length: Literal["short", "medium", "detailed"] = "medium"
+):
+    """
+    Queue summarization of an uploaded file (PDF, TXT, DOCX)
+    """
+    try:
+        job = await job_service.submit_file(file, length)
+        return _job_response(job)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error queueing file job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get job status and progress
+    """
+    try:
+        job = job_service.get_job(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return _job_response(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}/result", response_model=SummarizeResponse)
+async def get_job_result(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get the summary of a completed job
+    """
+    try:
+        job = job_service.get_job(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job.status == "failed":
+            raise HTTPException(status_code=422, detail=job.error or "Job failed")
+        if job.status != "completed":
+            raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+        return SummarizeResponse(
+            summary=job.summary,
+            original_length=job.original_length,
+            summary_length=job.summary_length,
+            compression_ratio=job.compression_ratio
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting job result: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Cancel a queued or running job
+
+    Answers 202 with status "cancelling" if the job's worker has not
+    stopped yet; polling the job shows "cancelled" once it has.
+    """
+    try:
+        job = await job_service.cancel(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        response = _job_response(job)
+        if job.status not in TERMINAL_STATUSES:
+            response.status = "cancelling"
+            return JSONResponse(status_code=202, content=jsonable_encoder(response))
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,14 @@
+"""
+Prometheus metrics endpoint
+"""
+from fastapi import APIRouter, Response
+
+from utils.metrics import METRICS_CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, stage, input size and error metrics in the Prometheus text format"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
@@ -1,14 +1,28 @@
 """
 Text summarization endpoints
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, Literal
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, HttpUrl, Field, ValidationError, model_validator
+from sqlalchemy.orm import Session
+from typing import Optional, Literal, List
+import asyncio
+import json
+import time
+from contextlib import aclosing
 
+from models.database import get_db
 from services.summarization_service import SummarizationService
 from services.web_scraper_service import WebScraperService
 from services.file_processor_service import FileProcessorService
+from services.batch_summarization_service import BatchSummarizationService
+from config.settings import settings
+from services.inference_executor import inference_executor, InferenceQueueFullError
+from services.summary_cache import summary_cache
+from services.page_cache import page_cache
+from services.upload_ingestion import UploadTooLargeError
 from utils.logger import setup_logger
+from utils.sse import sse_event, SSE_HEADERS
 
 router = APIRouter()
 logger = setup_logger(__name__)
@@ -17,6 +31,9 @@ logger = setup_logger(__name__)
 summarization_service = SummarizationService()
 web_scraper = WebScraperService()
 file_processor = FileProcessorService()
+batch_service = BatchSummarizationService(summarization_service, web_scraper, file_processor)
+
+CACHE_HEADER = "X-Summary-Cache"
 
 
 class TextSummarizeRequest(BaseModel):
@@ -39,16 +56,67 @@ class SummarizeResponse(BaseModel):
     compression_ratio: float
 
 
+class BatchItem(BaseModel):
+    """One input in a batch summarization request"""
+    type: Literal["text", "url", "file"]
+    text: Optional[str] = None
+    url: Optional[HttpUrl] = None
+    file: Optional[str] = Field(None, description="Filename of a file uploaded with the batch")
+    length: Optional[Literal["short", "medium", "detailed"]] = None
+    
+    @model_validator(mode="after")
+    def check_source(self):
+        if getattr(self, self.type) is None:
+            raise ValueError(f"'{self.type}' is required for {self.type} items")
+        return self
+
+
+class BatchSummarizeRequest(BaseModel):
+    """Request model for batch summarization"""
+    items: List[BatchItem] = Field(..., min_length=1)
+    length: Literal["short", "medium", "detailed"] = "medium"
+
+
+class BatchItemResult(BaseModel):
+    """Per-item result of a batch summarization"""
+    index: int
+    type: str
+    status: Literal["ok", "error"]
+    summary: Optional[str] = None
+    original_length: Optional[int] = None
+    summary_length: Optional[int] = None
+    compression_ratio: Optional[float] = None
+    cached: bool = False
+    duplicate_of: Optional[int] = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class BatchSummarizeResponse(BaseModel):
+    """Response model for batch summarization"""
+    results: List[BatchItemResult]
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+
+
 @router.post("/summarize/text", response_model=SummarizeResponse)
-async def summarize_text(request: TextSummarizeRequest):
+async def summarize_text(
+    request: TextSummarizeRequest,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """
     Summarize text directly
     """
     try:
-        summary = await summarization_service.summarize(
+        summary, cached = await summarization_service.summarize_cached(
             text=request.text,
-            length=request.length
+            length=request.length,
+            db=db
         )
+        response.headers[CACHE_HEADER] = "HIT" if cached else "MISS"
         
         return SummarizeResponse(
             summary=summary,
@@ -56,13 +124,19 @@ async def summarize_text(request: TextSummarizeRequest):
             summary_length=len(summary.split()),
             compression_ratio=round(len(summary) / len(request.text), 2)
         )
+    except InferenceQueueFullError:
+        raise
     except Exception as e:
         logger.error(f"Error summarizing text: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/summarize/url", response_model=SummarizeResponse)
-async def summarize_url(request: URLSummarizeRequest):
+async def summarize_url(
+    request: URLSummarizeRequest,
+    response: Response,
+    db: Session = Depends(get_db)
+):
     """
     Summarize content from URL
     """
@@ -74,10 +148,12 @@ async def summarize_url(request: URLSummarizeRequest):
             raise HTTPException(status_code=400, detail="Could not extract text from URL")
         
         # Summarize extracted text
-        summary = await summarization_service.summarize(
+        summary, cached = await summarization_service.summarize_cached(
             text=text,
-            length=request.length
+            length=request.length,
+            db=db
         )
+        response.headers[CACHE_HEADER] = "HIT" if cached else "MISS"
         
         return SummarizeResponse(
             summary=summary,
@@ -85,7 +161,7 @@ async def summarize_url(request: URLSummarizeRequest):
             summary_length=len(summary.split()),
             compression_ratio=round(len(summary) / len(text), 2)
         )
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Error summarizing URL: {str(e)}")
@@ -94,24 +170,31 @@ async def summarize_url(request: URLSummarizeRequest):
 
 @router.post("/summarize/file", response_model=SummarizeResponse)
 async def summarize_file(
+    response: Response,
     file: UploadFile = File(...),
-    length: Literal["short", "medium", "detailed"] = "medium"
+    length: Literal["short", "medium", "detailed"] = "medium",
+    db: Session = Depends(get_db)
 ):
     """
     Summarize content from uploaded file (PDF, TXT, DOCX)
     """
     try:
         # Extract text from file
-        text = await file_processor.extract_text(file)
+        try:
+            text = await file_processor.extract_text(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         if not text:
             raise HTTPException(status_code=400, detail="Could not extract text from file")
         
         # Summarize extracted text
-        summary = await summarization_service.summarize(
+        summary, cached = await summarization_service.summarize_cached(
             text=text,
-            length=length
+            length=length,
+            db=db
         )
+        response.headers[CACHE_HEADER] = "HIT" if cached else "MISS"
         
         return SummarizeResponse(
             summary=summary,
@@ -119,8 +202,185 @@ async def summarize_file(
             summary_length=len(summary.split()),
             compression_ratio=round(len(summary) / len(text), 2)
         )
-    except HTTPException:
+    except (HTTPException, InferenceQueueFullError):
         raise
     except Exception as e:
         logger.error(f"Error summarizing file: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/summarize/batch", response_model=BatchSummarizeResponse)
+async def summarize_batch(
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Summarize a mixed list of text, URL and file items in one request
+    
+    Send either a JSON body matching BatchSummarizeRequest, or a
+    multipart form with the same JSON in an "items" field and the files in
+    "files" parts; file items refer to an uploaded file by its filename.
+    Results are returned in input order with per-item status and timing.
+    """
+    started = time.perf_counter()
+    files = {}
+    try:
+        if http_request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await http_request.form()
+            manifest = json.loads(form.get("items") or "{}")
+            files = {
+                upload.filename: upload
+                for upload in form.getlist("files")
+                if hasattr(upload, "filename")
+            }
+        else:
+            manifest = await http_request.json()
+        batch = BatchSummarizeRequest.model_validate(manifest)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+    
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds maximum of {settings.BATCH_MAX_ITEMS} items"
+        )
+    
+    results = await batch_service.summarize_batch(
+        items=[item.model_dump() for item in batch.items],
+        default_length=batch.length,
+        files=files,
+        db=db
+    )
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    
+    return BatchSummarizeResponse(
+        results=results,
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
+
+
+def _summary_event_stream(
+    text: str,
+    length: str,
+    db: Session,
+    http_request: Request
+) -> StreamingResponse:
+    """
+    Build an SSE response that streams the summary of text
+    
+    Events are JSON objects: {"type": "token", "text": ...} for each piece,
+    then {"type": "done", ...statistics} or {"type": "error", "detail": ...}.
+    Generation stops as soon as the client disconnects.
+    """
+    cached = summarization_service.get_cached_summary(text, length, db=db)
+    if cached is None:
+        # Reject with 503 before the stream starts rather than mid-stream
+        inference_executor.ensure_capacity()
+    
+    async def events():
+        parts = []
+        try:
+            if cached is not None:
+                parts.append(cached)
+                yield sse_event({"type": "token", "text": cached})
+            else:
+                stream = summarization_service.summarize_stream(text, length, db=db)
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        if await http_request.is_disconnected():
+                            logger.info("Client disconnected, stopping summary stream")
+                            return
+                        parts.append(chunk)
+                        yield sse_event({"type": "token", "text": chunk})
+            
+            summary = "".join(parts)
+            yield sse_event({
+                "type": "done",
+                "original_length": len(text.split()),
+                "summary_length": len(summary.split()),
+                "compression_ratio": round(len(summary) / len(text), 2),
+                "cached": cached is not None
+            })
+        except asyncio.CancelledError:
+            logger.info("Summary stream cancelled by client")
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming summary: {str(e)}")
+            yield sse_event({"type": "error", "detail": str(e)})
+    
+    headers = dict(SSE_HEADERS)
+    headers[CACHE_HEADER] = "HIT" if cached is not None else "MISS"
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.post("/summarize/text/stream")
+async def summarize_text_stream(
+    request: TextSummarizeRequest,
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Summarize text directly, streaming the summary as Server-Sent Events
+    """
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    return _summary_event_stream(request.text, request.length, db, http_request)
+
+
+@router.post("/summarize/url/stream")
+async def summarize_url_stream(
+    request: URLSummarizeRequest,
+    http_request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Summarize content from URL, streaming the summary as Server-Sent Events
+    """
+    try:
+        text = await web_scraper.extract_text(str(request.url))
+    except Exception as e:
+        logger.error(f"Error extracting URL for streaming: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not text:
+        raise HTTPException(status_code=400, detail="Could not extract text from URL")
+    return _summary_event_stream(text, request.length, db, http_request)
+
+
+@router.post("/summarize/file/stream")
+async def summarize_file_stream(
+    http_request: Request,
+    file: UploadFile = File(...),
+    length: Literal["short", "medium", "detailed"] = "medium",
+    db: Session = Depends(get_db)
+):
+    """
+    Summarize content from uploaded file, streaming the summary as Server-Sent Events
+    """
+    try:
+        text = await file_processor.extract_text(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error extracting file for streaming: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not text:
+        raise HTTPException(status_code=400, detail="Could not extract text from file")
+    return _summary_event_stream(text, length, db, http_request)
+
+
+@router.get("/summarize/cache/stats")
+async def summary_cache_stats():
+    """
+    Hit/miss counters and size of the summary and scraped page caches
+    """
+    return {
+        "summaries": summary_cache.stats(),
+        "pages": page_cache.stats()
+    }
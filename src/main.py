@@ -4,15 +4,32 @@ Main application entry point
 import uvicorn
 import os
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, JSONResponse
 
-from api import summarizer, health, chat, auth
+from api import summarizer, health, chat, auth, jobs, metrics
 from config.settings import settings
 from utils.logger import setup_logger
+from utils.request_id import RequestIdMiddleware
+from utils.metrics import MetricsMiddleware
 from models.database import init_db
+from models.engine import configure_database
+from models.async_database import configure_async_database, dispose_async_database
+import models.summary_cache  # Register cache table before init_db
+import models.job  # Register job table before init_db
+import models.chat_summary  # Register chat summary table before init_db
+import models.chat_document  # Register chat document tables before init_db
+import models.chat_archive  # Register chat archive table before init_db
+from models.chat_indexes import ensure_chat_indexes
+from services.inference_executor import inference_executor, InferenceQueueFullError
+from services.password_hasher import password_hasher, LoginThrottledError, PasswordQueueFullError
+from services.http_client import http_client
+from services.file_processor_service import shutdown_pdf_pool
+from services.job_service import job_service
+from services.chat_archive import chat_archive
+from services.readiness import readiness_probe
 
 # Setup logger
 logger = setup_logger(__name__)
@@ -33,11 +50,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight requests
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Request id for log correlation (outermost, so every log line of a request carries it)
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["Health"])
 app.include_router(auth.router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(summarizer.router, prefix="/api/v1", tags=["Summarizer"])
 app.include_router(chat.router, prefix="/api/v1", tags=["Chat"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["Jobs"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+
+# Backpressure from the inference executor
+@app.exception_handler(InferenceQueueFullError)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFullError):
+    """Tell clients to back off when the model queue is saturated"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)}
+    )
+
+# Backpressure from password hashing and per-client login limits
+@app.exception_handler(PasswordQueueFullError)
+async def password_queue_full_handler(request: Request, exc: PasswordQueueFullError):
+    """Tell clients to back off when password hashing is saturated"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(settings.LOGIN_RETRY_AFTER_SECONDS)}
+    )
+
+@app.exception_handler(LoginThrottledError)
+async def login_throttled_handler(request: Request, exc: LoginThrottledError):
+    """Reject logins beyond the per-client and per-username limits"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts in progress, please retry shortly"},
+        headers={"Retry-After": str(settings.LOGIN_RETRY_AFTER_SECONDS)}
+    )
 
 # Root redirect to web UI
 @app.get("/")
@@ -57,17 +113,43 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     
+    # Open pooled HTTP client for web scraping
+    await http_client.start()
+    
     # Initialize database
     try:
+        engine = configure_database()
+        configure_async_database()
         init_db()
+        ensure_chat_indexes(engine)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
+    
+    # Resume queued jobs and start background workers
+    try:
+        await job_service.start()
+    except Exception as e:
+        logger.error(f"Failed to start job workers: {str(e)}")
+    
+    # Periodically archive idle chat sessions
+    await chat_archive.start()
+    
+    # Sample event-loop lag for the readiness probe
+    await readiness_probe.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources on shutdown"""
     logger.info("Shutting down application")
+    await job_service.stop()
+    await chat_archive.stop()
+    await readiness_probe.stop()
+    await dispose_async_database()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    await http_client.close()
+    shutdown_pdf_pool()
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,127 @@
+"""
+Async database engine and session dependency (aiosqlite / asyncpg)
+"""
+from typing import AsyncIterator, Optional, Union
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.database import get_db
+from models.engine import configure_sqlite, engine_options, is_sqlite
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Async driver used for each sync database URL
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+async_engine: Optional[AsyncEngine] = None
+
+# Loaded attributes stay readable after commit: an expired attribute
+# cannot be lazy-loaded outside the async session's greenlet
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def async_database_url(url: str) -> str:
+    """
+    URL of the same database for its async driver
+
+    Args:
+        url: Database URL, e.g. sqlite:///./data/app.db or postgresql://...
+
+    Returns:
+        URL with the async driver, e.g. sqlite+aiosqlite:///./data/app.db
+
+    Raises:
+        ValueError: If there is no async driver for the backend
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database backend: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def create_async_database_engine(url: str) -> AsyncEngine:
+    """
+    Create an async engine with the same pool and SQLite tuning as the sync one
+
+    Args:
+        url: Sync database URL
+
+    Returns:
+        AsyncEngine
+    """
+    engine = create_async_engine(async_database_url(url), **engine_options(url))
+    if is_sqlite(url):
+        configure_sqlite(
+            engine.sync_engine,
+            journal_mode=settings.SQLITE_JOURNAL_MODE,
+            synchronous=settings.SQLITE_SYNCHRONOUS,
+            busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS
+        )
+    return engine
+
+
+def configure_async_database() -> AsyncEngine:
+    """Create the application's async engine and bind AsyncSessionLocal to it"""
+    global async_engine
+    async_engine = create_async_database_engine(settings.DATABASE_URL)
+    AsyncSessionLocal.configure(bind=async_engine)
+    logger.info(f"Async database engine configured ({async_engine.url.drivername})")
+    return async_engine
+
+
+async def dispose_async_database():
+    """Close the async engine's pooled connections"""
+    global async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session"""
+    if async_engine is None:
+        configure_async_database()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def use_async_sessions(url: Optional[str] = None) -> bool:
+    """
+    Whether request handlers get an AsyncSession (DATABASE_ASYNC_SESSIONS)
+
+    "auto" uses the async driver except on SQLite. There, aiosqlite's
+    thread hop per statement plus the greenlet cost more than the queries
+    themselves, and a turn's statements wait behind other connections for
+    the single write lock. With it, benchmarks/load_chat_db.py at 200
+    turns/s has a p99 about 50x worse than the sync driver.
+    """
+    mode = settings.DATABASE_ASYNC_SESSIONS.lower()
+    if mode == "always":
+        return True
+    if mode == "never":
+        return False
+    if mode != "auto":
+        raise ValueError(f"DATABASE_ASYNC_SESSIONS must be auto, always or never, not {mode!r}")
+    return not is_sqlite(url or settings.DATABASE_URL)
+
+
+async def get_request_db() -> AsyncIterator[Union[Session, AsyncSession]]:
+    """Dependency to get the database session for a request (see use_async_sessions)"""
+    if use_async_sessions():
+        async for db in get_async_db():
+            yield db
+        return
+    gen = get_db()
+    db = next(gen)
+    try:
+        yield db
+    finally:
+        gen.close()
@@ -0,0 +1,26 @@
+"""
+Database model for archived chat session messages
+"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class ChatSessionArchive(Base):
+    """Messages of an idle chat session, moved out of the messages table"""
+    __tablename__ = "chat_session_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE"),
+        unique=True, index=True, nullable=False
+    )
+    # gzip-compressed JSON list of [id, role, content, created_at]
+    payload = Column(LargeBinary, nullable=False)
+    # Kept for session listings, which do not open the archive
+    message_count = Column(Integer, nullable=False, default=0)
+    last_message_preview = Column(String)
+    last_message_id = Column(Integer, nullable=False, default=0)
+    raw_bytes = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, server_default=func.now())
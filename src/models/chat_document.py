@@ -0,0 +1,42 @@
+"""
+Database models for documents attached to chat sessions
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class ChatDocument(Base):
+    """Extracted text of a file attached to a chat session"""
+    __tablename__ = "chat_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    filename = Column(String, nullable=False)
+    file_hash = Column(String(64), index=True, nullable=False)  # sha256 of the uploaded bytes
+    content_hash = Column(String(64), nullable=False)  # sha256 of the extracted text
+    text = Column(Text, nullable=False)
+    char_count = Column(Integer, nullable=False, default=0)
+    chunk_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_chat_documents_session_content", "session_id", "content_hash", unique=True),
+    )
+
+
+class ChatDocumentChunk(Base):
+    """Passage of a chat document, the unit of retrieval"""
+    __tablename__ = "chat_document_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(
+        Integer, ForeignKey("chat_documents.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    session_id = Column(Integer, index=True, nullable=False)  # denormalized for retrieval
+    position = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False, default=0)
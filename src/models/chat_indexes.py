@@ -0,0 +1,45 @@
+"""
+Secondary indexes for the chat tables
+"""
+from sqlalchemy import Index, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from models.chat import ChatSession, Message
+
+
+# Serves "latest N messages of a session" and keyset pagination of history
+message_history_index = Index(
+    "ix_messages_session_id_created_at",
+    Message.session_id,
+    Message.created_at
+)
+
+# Serves a user's session listing, ordered by last activity
+session_activity_index = Index(
+    "ix_chat_sessions_user_id_activity",
+    ChatSession.user_id,
+    func.coalesce(ChatSession.updated_at, ChatSession.created_at)
+)
+
+CHAT_INDEXES = [message_history_index, session_activity_index]
+
+
+def ensure_chat_indexes(bind):
+    """
+    Create chat indexes that are missing
+
+    New databases get them from create_all; this adds them to databases
+    whose tables were created before the indexes were defined. Uses
+    CREATE INDEX IF NOT EXISTS, since expression indexes are not visible
+    to reflection (checkfirst).
+
+    Args:
+        bind: Engine or connection
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            ensure_chat_indexes(conn)
+        return
+    for index in CHAT_INDEXES:
+        bind.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,23 @@
+"""
+Database model for rolling summaries of chat sessions
+"""
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class ChatSessionSummary(Base):
+    """Summary of the turns that no longer fit in a session's prompt budget"""
+    __tablename__ = "chat_session_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE"),
+        unique=True, index=True, nullable=False
+    )
+    summary = Column(Text, nullable=False)
+    summary_tokens = Column(Integer, nullable=False, default=0)
+    # Messages with id <= summarized_until_id are covered by the summary
+    summarized_until_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,131 @@
+"""
+Database engine construction with pool and SQLite tuning from settings
+"""
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_engine
+
+    File-backed SQLite and server databases get a sized connection pool;
+    in-memory SQLite keeps a single shared connection.
+
+    Args:
+        url: Database URL
+
+    Returns:
+        Options for sqlalchemy.create_engine
+    """
+    options: Dict[str, Any] = {}
+    if is_sqlite(url):
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if make_url(url).database in (None, "", ":memory:"):
+            options["poolclass"] = StaticPool
+            return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def configure_sqlite(
+    engine: Engine,
+    journal_mode: str,
+    synchronous: str,
+    busy_timeout_ms: int
+):
+    """
+    Apply pragmas to every new SQLite connection of an engine
+
+    WAL lets reads proceed while a write is in progress, and
+    busy_timeout makes a writer wait for the lock instead of failing
+    straight away with "database is locked".
+
+    Raises:
+        ValueError: If journal_mode or synchronous is not a SQLite mode
+    """
+    journal_mode = journal_mode.upper()
+    synchronous = synchronous.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLite journal mode: {journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLite synchronous mode: {synchronous}")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        finally:
+            cursor.close()
+
+
+def create_database_engine(url: str) -> Engine:
+    """
+    Create an engine tuned from settings
+
+    Args:
+        url: Database URL (SQLite or PostgreSQL)
+
+    Returns:
+        Engine
+    """
+    engine = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        configure_sqlite(
+            engine,
+            journal_mode=settings.SQLITE_JOURNAL_MODE,
+            synchronous=settings.SQLITE_SYNCHRONOUS,
+            busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS
+        )
+    return engine
+
+
+def configure_database() -> Engine:
+    """
+    Rebind the application's sessions to a tuned engine
+
+    models.database creates a plain engine at import; this replaces it
+    (and the engine behind SessionLocal, which get_db uses) with one
+    built by create_database_engine, then disposes of the original.
+
+    Returns:
+        The tuned engine
+    """
+    from models import database
+
+    engine = create_database_engine(settings.DATABASE_URL)
+    previous = database.engine
+    database.SessionLocal.configure(bind=engine)
+    database.engine = engine
+    previous.dispose()
+    logger.info(f"Database engine configured for {engine.url.get_backend_name()} ({type(engine.pool).__name__})")
+    return engine
@@ -0,0 +1,42 @@
+"""
+Database model for background summarization jobs
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class SummarizationJob(Base):
+    """Long-running summarization request processed by the job workers"""
+    __tablename__ = "summarization_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True, nullable=False)
+    status = Column(String, nullable=False, index=True, default="queued")
+    source_type = Column(String, nullable=False)  # text, url or file
+    length = Column(String, nullable=False, default="medium")
+
+    # Input (only the field matching source_type is set)
+    input_text = Column(Text)
+    input_url = Column(String)
+    file_path = Column(String)
+    filename = Column(String)
+
+    # Progress
+    stage = Column(String)
+    pages_total = Column(Integer, default=0)
+    pages_done = Column(Integer, default=0)
+    chunks_total = Column(Integer, default=0)
+    chunks_done = Column(Integer, default=0)
+
+    # Result
+    summary = Column(Text)
+    original_length = Column(Integer)
+    summary_length = Column(Integer)
+    compression_ratio = Column(Float)
+    error = Column(Text)
+
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,21 @@
+"""
+Database model for persisted summaries
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from models.database import Base
+
+
+class SummaryCacheEntry(Base):
+    """Summary stored under a content hash of its input"""
+    __tablename__ = "summary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    length = Column(String, nullable=False)
+    model_name = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_accessed_at = Column(DateTime, server_default=func.now(), index=True)
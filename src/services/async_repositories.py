@@ -0,0 +1,112 @@
+"""
+Awaitable versions of the chat and auth repositories for either session type
+"""
+from typing import Any, Callable, Optional
+
+from models.schemas import UserCreate
+from models.user import User
+from services.auth_service import AuthService
+from services.chat_repository import ChatRepository
+from services.password_hasher import password_hasher
+from utils.db import DbSession, run_db
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _awaitable(method: Callable) -> staticmethod:
+    """Repository method taking either session type; an AsyncSession runs it on the async driver"""
+    async def wrapper(db: DbSession, *args: Any, **kwargs: Any):
+        return await run_db(db, method, *args, **kwargs)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return staticmethod(wrapper)
+
+
+class AsyncChatRepository:
+    """
+    ChatRepository with awaitable methods
+
+    Same methods and arguments as ChatRepository, awaited. The queries
+    are ChatRepository's own, so both paths always return the same rows.
+    """
+
+    create_session = _awaitable(ChatRepository.create_session)
+    get_session_by_id = _awaitable(ChatRepository.get_session_by_id)
+    get_user_sessions = _awaitable(ChatRepository.get_user_sessions)
+    get_user_session_summaries = _awaitable(ChatRepository.get_user_session_summaries)
+    delete_session = _awaitable(ChatRepository.delete_session)
+    add_message = _awaitable(ChatRepository.add_message)
+    save_turn = _awaitable(ChatRepository.save_turn)
+    get_session_messages = _awaitable(ChatRepository.get_session_messages)
+    get_messages = _awaitable(ChatRepository.get_messages)
+    get_recent_messages = _awaitable(ChatRepository.get_recent_messages)
+    count_messages = _awaitable(ChatRepository.count_messages)
+    get_session_summary = _awaitable(ChatRepository.get_session_summary)
+    save_session_summary = _awaitable(ChatRepository.save_session_summary)
+    update_session_title = _awaitable(ChatRepository.update_session_title)
+
+
+class AsyncAuthRepository:
+    """
+    User lookups and registration of AuthService with awaitable methods
+
+    Password hashing and checks go to the password_hasher pool rather
+    than running inside the session's greenlet, which would hold the
+    event loop for the whole bcrypt computation.
+    """
+
+    get_user_by_login = _awaitable(AuthService.get_user_by_login)
+    get_user_by_id = _awaitable(AuthService.get_user_by_id)
+    get_user_by_username = _awaitable(AuthService.get_user_by_username)
+    get_user_by_email = _awaitable(AuthService.get_user_by_email)
+
+    @staticmethod
+    async def authenticate_user(db: DbSession, username: str, password: str) -> Optional[User]:
+        """
+        Authenticate user with username and password
+
+        A hash made at a different cost than BCRYPT_ROUNDS is replaced
+        with a fresh one once the password has been verified.
+
+        Returns:
+            User object if authentication successful, None otherwise
+
+        Raises:
+            PasswordQueueFullError: If the password pool is saturated
+        """
+        user = await run_db(db, AuthService.get_user_by_login, username)
+
+        if not user:
+            logger.warning(f"Authentication failed: User '{username}' not found")
+            return None
+
+        if not await password_hasher.verify(password, user.hashed_password):
+            logger.warning(f"Authentication failed: Invalid password for user '{username}'")
+            return None
+
+        if not user.is_active:
+            logger.warning(f"Authentication failed: User '{username}' is inactive")
+            return None
+
+        if password_hasher.needs_rehash(user.hashed_password):
+            hashed_password = await password_hasher.hash(password)
+            await run_db(db, AuthService.update_password_hash, user, hashed_password)
+            logger.info(f"Upgraded password hash of user '{username}' to cost {password_hasher.rounds}")
+
+        logger.info(f"User '{username}' authenticated successfully")
+        return user
+
+    @staticmethod
+    async def create_user(db: DbSession, user_create: UserCreate) -> User:
+        """
+        Create a new user
+
+        Raises:
+            HTTPException: If username or email already exists
+            PasswordQueueFullError: If the password pool is saturated
+        """
+        await run_db(db, AuthService.ensure_available, user_create)
+        hashed_password = await password_hasher.hash(user_create.password)
+        return await run_db(db, AuthService.add_user, user_create, hashed_password)
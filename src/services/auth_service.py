@@ -4,13 +4,13 @@ Authentication service for user management
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-import bcrypt
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from models.user import User
 from models.schemas import UserCreate, TokenData
 from config.settings import settings
+from services.password_hasher import check_password, hash_password
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -21,22 +21,13 @@ class AuthService:
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a plain password against a hashed password"""
-        try:
-            return bcrypt.checkpw(
-                plain_password.encode('utf-8'),
-                hashed_password.encode('utf-8')
-            )
-        except Exception as e:
-            logger.error(f"Password verification error: {e}")
-            return False
+        """Verify a plain password against a hashed password (blocking; see password_hasher)"""
+        return check_password(plain_password, hashed_password)
     
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Generate password hash using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Generate password hash using bcrypt at BCRYPT_ROUNDS (blocking; see password_hasher)"""
+        return hash_password(password, settings.BCRYPT_ROUNDS)
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -117,10 +108,7 @@ class AuthService:
         Returns:
             User object if authentication successful, None otherwise
         """
-        # Try to find user by username or email
-        user = db.query(User).filter(
-            (User.username == username) | (User.email == username)
-        ).first()
+        user = AuthService.get_user_by_login(db, username)
         
         if not user:
             logger.warning(f"Authentication failed: User '{username}' not found")
@@ -149,6 +137,18 @@ class AuthService:
         Returns:
             Created User object
             
+        Raises:
+            HTTPException: If username or email already exists
+        """
+        AuthService.ensure_available(db, user_create)
+        hashed_password = AuthService.get_password_hash(user_create.password)
+        return AuthService.add_user(db, user_create, hashed_password)
+    
+    @staticmethod
+    def ensure_available(db: Session, user_create: UserCreate):
+        """
+        Check that a new user's username and email are not taken
+        
         Raises:
             HTTPException: If username or email already exists
         """
@@ -167,9 +167,20 @@ class AuthService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
+    
+    @staticmethod
+    def add_user(db: Session, user_create: UserCreate, hashed_password: str) -> User:
+        """
+        Insert a new user whose password has already been hashed
         
-        # Create new user
-        hashed_password = AuthService.get_password_hash(user_create.password)
+        Args:
+            db: Database session
+            user_create: User creation schema
+            hashed_password: bcrypt hash of user_create.password
+            
+        Returns:
+            Created User object
+        """
         db_user = User(
             email=user_create.email,
             username=user_create.username,
@@ -186,6 +197,19 @@ class AuthService:
         logger.info(f"New user created: {db_user.username} ({db_user.email})")
         return db_user
     
+    @staticmethod
+    def update_password_hash(db: Session, user: User, hashed_password: str):
+        """Replace a user's stored password hash (e.g. after a cost change)"""
+        user.hashed_password = hashed_password
+        db.commit()
+    
+    @staticmethod
+    def get_user_by_login(db: Session, username: str) -> Optional[User]:
+        """Get user by username or email"""
+        return db.query(User).filter(
+            (User.username == username) | (User.email == username)
+        ).first()
+    
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
         """Get user by ID"""
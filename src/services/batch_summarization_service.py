@@ -0,0 +1,154 @@
+"""
+Service for summarizing many inputs in one request with concurrent fan-out
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from services.summarization_service import SummarizationService
+from services.web_scraper_service import WebScraperService
+from services.file_processor_service import FileProcessorService
+from services.summary_cache import SummaryCache
+from services.page_cache import PageCache
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class BatchSummarizationService:
+    """Summarize a mixed list of text, URL and uploaded-file items"""
+
+    def __init__(
+        self,
+        summarization_service: SummarizationService,
+        web_scraper: WebScraperService,
+        file_processor: FileProcessorService
+    ):
+        self.summarization_service = summarization_service
+        self.web_scraper = web_scraper
+        self.file_processor = file_processor
+
+    @staticmethod
+    def _dedup_key(item: Dict, length: str) -> Tuple[str, str, str]:
+        """Identity of an item for deduplication within a batch"""
+        kind = item["type"]
+        if kind == "text":
+            return kind, SummaryCache.normalize_text(item.get("text") or ""), length
+        if kind == "url":
+            return kind, PageCache.normalize_url(str(item.get("url") or "")), length
+        return kind, item.get("file") or "", length
+
+    async def summarize_batch(
+        self,
+        items: List[Dict],
+        default_length: str = "medium",
+        files: Optional[Dict[str, UploadFile]] = None,
+        db: Optional[Session] = None
+    ) -> List[Dict]:
+        """
+        Summarize all items, running unique inputs concurrently
+
+        Identical items (same normalized text, URL or file reference and
+        length) are processed once and the result is shared. At most
+        BATCH_CONCURRENCY items are scraped/extracted/summarized at a time.
+        A failing item is reported in its result and does not affect the
+        others.
+
+        Args:
+            items: Dicts with "type" ("text", "url" or "file") and the matching
+                "text", "url" or "file" field, plus an optional "length"
+            default_length: Length preset for items that do not set one
+            files: Uploaded files by name, for "file" items
+            db: Optional database session for the summary cache
+
+        Returns:
+            One result dict per item, in input order
+        """
+        files = files or {}
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+        first_index: Dict[Tuple[str, str, str], int] = {}
+        unique: List[Tuple[int, Dict, str]] = []
+        owners: List[int] = []
+        for index, item in enumerate(items):
+            length = item.get("length") or default_length
+            key = self._dedup_key(item, length)
+            if key not in first_index:
+                first_index[key] = index
+                unique.append((index, item, length))
+            owners.append(first_index[key])
+
+        logger.info(f"Batch of {len(items)} items ({len(unique)} unique)")
+
+        async def run(index: int, item: Dict, length: str) -> Dict:
+            async with semaphore:
+                return await self._summarize_item(index, item, length, files, db)
+
+        outcomes = await asyncio.gather(*(run(*entry) for entry in unique))
+        by_index = {outcome["index"]: outcome for outcome in outcomes}
+
+        results = []
+        for index, owner in enumerate(owners):
+            result = dict(by_index[owner])
+            result["index"] = index
+            result["duplicate_of"] = owner if owner != index else None
+            results.append(result)
+        return results
+
+    async def _summarize_item(
+        self,
+        index: int,
+        item: Dict,
+        length: str,
+        files: Dict[str, UploadFile],
+        db: Optional[Session]
+    ) -> Dict:
+        started = time.perf_counter()
+        result = {
+            "index": index,
+            "type": item["type"],
+            "status": "ok",
+            "summary": None,
+            "original_length": None,
+            "summary_length": None,
+            "compression_ratio": None,
+            "cached": False,
+            "error": None,
+        }
+        try:
+            text = await self._extract(item, files)
+            if not text or not text.strip():
+                raise ValueError("No text could be extracted")
+
+            summary, cached = await self.summarization_service.summarize_cached(
+                text=text,
+                length=length,
+                db=db
+            )
+            result.update(
+                summary=summary,
+                original_length=len(text.split()),
+                summary_length=len(summary.split()),
+                compression_ratio=round(len(summary) / len(text), 2),
+                cached=cached
+            )
+        except Exception as e:
+            logger.warning(f"Batch item {index} ({item['type']}) failed: {str(e)}")
+            result.update(status="error", error=str(e) or type(e).__name__)
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def _extract(self, item: Dict, files: Dict[str, UploadFile]) -> Optional[str]:
+        kind = item["type"]
+        if kind == "text":
+            return item.get("text")
+        if kind == "url":
+            return await self.web_scraper.extract_text(str(item["url"]))
+        upload = files.get(item.get("file") or "")
+        if upload is None:
+            raise ValueError(f"File '{item.get('file')}' was not uploaded with the batch")
+        return await self.file_processor.extract_text(upload)
@@ -0,0 +1,268 @@
+"""
+Archival of idle chat sessions into compressed rows, with transparent rehydration
+"""
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import exists, func, insert
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.chat import ChatSession, Message
+from models.chat_archive import ChatSessionArchive
+from models.chat_summary import ChatSessionSummary
+from services.chat_repository import PREVIEW_LENGTH
+from utils.db import DbSession, db_session, run_db
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ChatArchiveService:
+    """
+    Moves the messages of idle sessions out of the messages table
+
+    A session whose last activity is older than idle_days has its
+    messages stored as one gzip-compressed JSON row and deleted from the
+    messages table, keeping that table and its indexes to active
+    conversations. The archive row keeps the message count and latest
+    preview for listings. Opening the session again (a new turn or its
+    history) restores the messages in their original order. They get new
+    ids, since SQLite may have reused the old ones, and the rolling
+    summary is moved to the new ids.
+    """
+
+    def __init__(self, idle_days: int, interval_seconds: int, batch_size: int):
+        self.idle_days = idle_days
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the periodic archival task (no-op if disabled)"""
+        if self.idle_days <= 0:
+            logger.info("Chat archival disabled")
+            return
+        self._task = asyncio.create_task(self._run(), name="chat-archive")
+        logger.info(f"Chat archival started (idle after {self.idle_days} days)")
+
+    async def stop(self):
+        """Stop the periodic archival task"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                archived = await asyncio.to_thread(self._archive_in_new_session)
+                if archived:
+                    logger.info(f"Archived {archived} idle chat sessions")
+            except Exception as e:
+                logger.error(f"Chat archival failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def _archive_in_new_session(self) -> int:
+        with db_session() as db:
+            return self.archive_idle_sessions(db)
+
+    def archive_idle_sessions(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Archive up to batch_size sessions idle for longer than idle_days
+
+        Args:
+            db: Database session
+            now: Reference time (defaults to utcnow)
+
+        Returns:
+            Number of sessions archived
+        """
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.idle_days)
+        activity = func.coalesce(ChatSession.updated_at, ChatSession.created_at)
+        candidates = db.query(ChatSession.id)\
+            .filter(activity < cutoff)\
+            .filter(exists().where(Message.session_id == ChatSession.id))\
+            .filter(~exists().where(ChatSessionArchive.session_id == ChatSession.id))\
+            .order_by(ChatSession.id.asc())\
+            .limit(self.batch_size)\
+            .all()
+
+        archived = 0
+        for (session_pk,) in candidates:
+            if self.archive_session(db, session_pk):
+                archived += 1
+        return archived
+
+    def archive_session(self, db: Session, session_pk: int) -> bool:
+        """
+        Move a session's messages into an archive row, in one transaction
+
+        Returns:
+            True if archived, False if the session has no messages
+        """
+        messages = db.query(Message)\
+            .filter(Message.session_id == session_pk)\
+            .order_by(Message.id.asc())\
+            .all()
+        if not messages:
+            return False
+
+        raw = json.dumps([
+            [msg.id, msg.role, msg.content, msg.created_at.isoformat() if msg.created_at else None]
+            for msg in messages
+        ]).encode("utf-8")
+        last = messages[-1]
+        db.add(ChatSessionArchive(
+            session_id=session_pk,
+            payload=gzip.compress(raw),
+            message_count=len(messages),
+            last_message_preview=last.content[:PREVIEW_LENGTH],
+            last_message_id=last.id,
+            raw_bytes=len(raw)
+        ))
+        # Messages written after the read above stay in place
+        db.query(Message)\
+            .filter(Message.session_id == session_pk, Message.id <= last.id)\
+            .delete(synchronize_session=False)
+        db.commit()
+        return True
+
+    async def rehydrate(self, db: DbSession, chat_session: ChatSession) -> bool:
+        """
+        Restore an archived session's messages
+
+        Decompressing and parsing the archive run in a worker thread.
+        Concurrent requests opening the same session are safe: only the
+        one that deletes the archive row inserts the messages, and the
+        others find them once it commits.
+
+        Args:
+            db: Database session (sync or async)
+            chat_session: Session being opened
+
+        Returns:
+            True if this call restored the messages, False if the session
+            was not archived or another request restored it first
+        """
+        archived = await run_db(db, self._read_archive, chat_session.id)
+        if archived is None:
+            return False
+
+        archive_id, payload = archived
+        rows = await asyncio.to_thread(self._decode, payload)
+        restored = await run_db(db, self._restore, chat_session.id, archive_id, rows)
+        if restored:
+            logger.info(f"Restored {len(rows)} archived messages of session {chat_session.session_id}")
+        return restored
+
+    @staticmethod
+    def _read_archive(db: Session, session_pk: int) -> Optional[Tuple[int, bytes]]:
+        return db.query(ChatSessionArchive.id, ChatSessionArchive.payload)\
+            .filter(ChatSessionArchive.session_id == session_pk)\
+            .first()
+
+    @staticmethod
+    def _decode(payload: bytes) -> List[list]:
+        return json.loads(gzip.decompress(payload))
+
+    @staticmethod
+    def _restore(db: Session, session_pk: int, archive_id: int, rows: List[list]) -> bool:
+        """
+        Delete the archive row and insert its messages, unless another request already did
+
+        Messages written to the session while it was archived are moved
+        after the restored ones, so ids keep following message order.
+        """
+        try:
+            claimed = db.query(ChatSessionArchive)\
+                .filter(ChatSessionArchive.id == archive_id)\
+                .delete(synchronize_session=False)
+            if not claimed:
+                # The messages were restored by a request that started first
+                db.rollback()
+                return False
+
+            messages = [
+                (message_id, role, content, datetime.fromisoformat(created_at) if created_at else None)
+                for message_id, role, content, created_at in rows
+            ]
+            archived_until = messages[-1][0] if messages else 0
+            live = db.query(Message.id, Message.role, Message.content, Message.created_at)\
+                .filter(Message.session_id == session_pk)\
+                .order_by(Message.id.asc())\
+                .all()
+            messages.extend(tuple(row) for row in live)
+            if live:
+                db.query(Message)\
+                    .filter(Message.session_id == session_pk)\
+                    .delete(synchronize_session=False)
+            db.execute(insert(Message), [
+                {"session_id": session_pk, "role": role, "content": content, "created_at": created_at}
+                for _, role, content, created_at in messages
+            ])
+
+            summary = db.query(ChatSessionSummary)\
+                .filter(ChatSessionSummary.session_id == session_pk)\
+                .first()
+            if summary is not None:
+                # Live messages are covered only if written after the archive
+                covered = 0
+                for position, (message_id, *_) in enumerate(messages):
+                    in_archive = position < len(rows)
+                    if message_id > summary.summarized_until_id or \
+                            (not in_archive and message_id <= archived_until):
+                        break
+                    covered += 1
+                summary.summarized_until_id = db.query(Message.id)\
+                    .filter(Message.session_id == session_pk)\
+                    .order_by(Message.id.asc())\
+                    .offset(covered - 1)\
+                    .limit(1)\
+                    .scalar() if covered else 0
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def archived_session_ids(db: Session, session_pks: List[int]) -> Set[int]:
+        """Which of the given sessions are archived"""
+        if not session_pks:
+            return set()
+        rows = db.query(ChatSessionArchive.session_id)\
+            .filter(ChatSessionArchive.session_id.in_(session_pks))\
+            .all()
+        return {row[0] for row in rows}
+
+    @staticmethod
+    def archived_message_count(db: Session, session_pk: int) -> int:
+        """Number of messages in a session's archive (0 if it is not archived)"""
+        return db.query(ChatSessionArchive.message_count)\
+            .filter(ChatSessionArchive.session_id == session_pk)\
+            .scalar() or 0
+
+    @staticmethod
+    def read_messages(db: Session, session_pk: int) -> List[list]:
+        """
+        Archived messages of a session, without restoring them
+
+        Returns:
+            [id, role, content, created_at (ISO string or None)] in message order
+        """
+        archive = ChatArchiveService._read_archive(db, session_pk)
+        if archive is None:
+            return []
+        return ChatArchiveService._decode(archive.payload)
+
+
+# Global instance
+chat_archive = ChatArchiveService(
+    idle_days=settings.CHAT_ARCHIVE_AFTER_DAYS,
+    interval_seconds=settings.CHAT_ARCHIVE_INTERVAL_SECONDS,
+    batch_size=settings.CHAT_ARCHIVE_BATCH_SIZE
+)
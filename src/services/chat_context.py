@@ -0,0 +1,281 @@
+"""
+Token-budgeted prompt assembly for chat turns with rolling summarization
+"""
+import asyncio
+from typing import Dict, List, Optional, Set
+
+from config.settings import settings
+from models.chat import Message
+from models.chat_summary import ChatSessionSummary
+from models.summarizer import gemini_model
+from services.chat_repository import ChatRepository
+from services.inference_executor import inference_executor, InferenceExecutor
+from utils.db import db_session
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Rough characters-per-token ratio used for budgeting
+CHARS_PER_TOKEN = 4
+
+# Per-message allowance for role markers and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = "\n[...document truncated...]"
+
+# Messages folded into the rolling summary per compaction; a longer
+# backlog is caught up over the following turns
+COMPACTION_MAX_MESSAGES = 500
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Approximate token count of a string"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class ConversationContext:
+    """Prompt pieces for one turn plus their token accounting"""
+
+    def __init__(
+        self,
+        history: List[Dict],
+        context: Optional[str],
+        usage: Dict[str, int],
+        summary: Optional[str] = None,
+        evicted: Optional[List[Dict]] = None,
+        summarized_until_id: int = 0,
+        compact_until_id: Optional[int] = None,
+        older_unsummarized: bool = False
+    ):
+        self.history = history
+        self.context = context
+        self.usage = usage
+        # Plain values, so they stay readable after the turn is committed
+        self.summary = summary
+        self.evicted = evicted or []
+        self.summarized_until_id = summarized_until_id
+        # Newest message left out of the prompt and not yet summarized
+        self.compact_until_id = compact_until_id
+        # Unsummarized messages may exist before the history window
+        self.older_unsummarized = older_unsummarized
+
+
+class ConversationContextManager:
+    """
+    Fits each chat prompt into a token budget
+
+    Priority within the budget is: the new user message, the session's
+    rolling summary, the attached document (capped at context_max_tokens),
+    then as many recent messages as still fit, newest first. Messages left
+    out of the prompt, whether evicted by the budget or older than the
+    history window, are folded into the rolling summary in the background
+    once they add up to summary_trigger_tokens.
+    """
+
+    def __init__(
+        self,
+        executor: InferenceExecutor,
+        token_budget: int,
+        context_max_tokens: int,
+        history_window: int,
+        summary_trigger_tokens: int,
+        summary_max_words: int
+    ):
+        self.executor = executor
+        self.token_budget = token_budget
+        self.context_max_tokens = context_max_tokens
+        self.history_window = history_window
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self.summary_max_words = summary_max_words
+        self._compacting: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def build(
+        self,
+        summary: Optional[ChatSessionSummary],
+        messages: List[Message],
+        message: str,
+        context: Optional[str] = None
+    ) -> ConversationContext:
+        """
+        Assemble history and context for a turn within the token budget
+
+        Args:
+            summary: Rolling summary of the session, if any
+            messages: Recent messages, oldest first (not yet including the new one)
+            message: New user message
+            context: Optional extra context (e.g. an attached document)
+
+        Returns:
+            ConversationContext; history ends with the new user message
+        """
+        message_tokens = estimate_tokens(message) + MESSAGE_OVERHEAD_TOKENS
+        remaining = max(0, self.token_budget - message_tokens)
+
+        # Only messages newer than the summary are candidates for history
+        if summary is not None:
+            summarized_until_id = summary.summarized_until_id
+            messages = [msg for msg in messages if msg.id > summarized_until_id]
+            summary_text = summary.summary
+        else:
+            summarized_until_id = 0
+            summary_text = None
+        # A full window with nothing summarized in it may hide older messages
+        older_unsummarized = len(messages) >= max(1, self.history_window)
+        summary_tokens = min(estimate_tokens(summary_text), remaining)
+        remaining -= summary_tokens
+
+        document = None
+        document_tokens = 0
+        truncated = False
+        if context:
+            document, truncated = self._truncate(context, min(self.context_max_tokens, remaining))
+            document_tokens = estimate_tokens(document)
+            remaining -= document_tokens
+
+        included: List[Message] = []
+        history_tokens = 0
+        for msg in reversed(messages):
+            cost = estimate_tokens(msg.content) + MESSAGE_OVERHEAD_TOKENS
+            if cost > remaining:
+                break
+            included.append(msg)
+            history_tokens += cost
+            remaining -= cost
+        included.reverse()
+        evicted = [
+            {"id": msg.id, "role": msg.role, "content": msg.content}
+            for msg in messages[:len(messages) - len(included)]
+        ]
+
+        if evicted:
+            compact_until_id = evicted[-1]["id"]
+        elif older_unsummarized:
+            compact_until_id = messages[0].id - 1
+        else:
+            compact_until_id = None
+
+        history = [{"role": msg.role, "content": msg.content} for msg in included]
+        history.append({"role": "user", "content": message})
+
+        parts = []
+        if summary_text:
+            parts.append(f"Summary of the earlier conversation:\n{summary_text}")
+        if document:
+            parts.append(document)
+
+        usage = {
+            "budget": self.token_budget,
+            "message": message_tokens,
+            "summary": summary_tokens,
+            "context": document_tokens,
+            "context_truncated": truncated,
+            "history": history_tokens,
+            "history_messages": len(included),
+            "evicted_messages": len(evicted),
+            "total": message_tokens + summary_tokens + document_tokens + history_tokens,
+        }
+        return ConversationContext(
+            history,
+            "\n\n".join(parts) or None,
+            usage,
+            summary_text,
+            evicted,
+            summarized_until_id,
+            compact_until_id,
+            older_unsummarized
+        )
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int):
+        """Cut text to about max_tokens, at a word boundary"""
+        if estimate_tokens(text) <= max_tokens:
+            return text, False
+        max_chars = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER))
+        if max_chars == 0:
+            return None, True
+        cut = text[:max_chars]
+        space = cut.rfind(" ")
+        if space > max_chars // 2:
+            cut = cut[:space]
+        return cut + TRUNCATION_MARKER, True
+
+    def schedule_compaction(self, chat_session_pk: int, prompt: ConversationContext):
+        """
+        Fold messages left out of a turn's prompt into the rolling summary in the background
+
+        Covers every unsummarized message older than the oldest one sent,
+        loading those before the history window from the database. Does
+        nothing until they reach summary_trigger_tokens, or while a
+        compaction for the same session is still running.
+        """
+        until_id = prompt.compact_until_id
+        if until_id is None or chat_session_pk in self._compacting:
+            return
+        evicted_tokens = sum(estimate_tokens(msg["content"]) for msg in prompt.evicted)
+        if evicted_tokens < self.summary_trigger_tokens and not prompt.older_unsummarized:
+            return
+
+        self._compacting.add(chat_session_pk)
+        task = asyncio.create_task(
+            self._compact(chat_session_pk, prompt.summary, prompt.summarized_until_id, until_id)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, chat_session_pk: int, previous: Optional[str], after_id: int, until_id: int):
+        try:
+            rows = await asyncio.to_thread(self._read_range, chat_session_pk, after_id, until_id)
+            if not rows or sum(estimate_tokens(content) for _, _, content in rows) < self.summary_trigger_tokens:
+                return
+            until_id = rows[-1][0]
+
+            transcript = "\n".join(
+                f"{'User' if role == 'user' else 'Assistant'}: {content}"
+                for _, role, content in rows
+            )
+            text = transcript
+            if previous:
+                text = f"Earlier summary:\n{previous}\n\nLater conversation:\n{transcript}"
+            new_summary = await self.executor.run(
+                gemini_model.summarize,
+                text=text,
+                max_length=self.summary_max_words,
+                min_length=min(30, self.summary_max_words),
+                style="concise"
+            )
+            await asyncio.to_thread(self._save_summary, chat_session_pk, new_summary, until_id)
+            logger.info(f"Compacted chat session {chat_session_pk} history up to message {until_id}")
+        except Exception as e:
+            # Evicted turns stay out of the prompt; the next turn retries
+            logger.warning(f"Chat history compaction failed for session {chat_session_pk}: {str(e)}")
+        finally:
+            self._compacting.discard(chat_session_pk)
+
+    @staticmethod
+    def _read_range(chat_session_pk: int, after_id: int, until_id: int) -> List[tuple]:
+        with db_session() as db:
+            return [
+                (msg.id, msg.role, msg.content)
+                for msg in ChatRepository.get_messages_in_range(
+                    db, chat_session_pk, after_id, until_id, COMPACTION_MAX_MESSAGES
+                )
+            ]
+
+    @staticmethod
+    def _save_summary(chat_session_pk: int, summary: str, until_id: int):
+        with db_session() as db:
+            ChatRepository.save_session_summary(db, chat_session_pk, summary, estimate_tokens(summary), until_id)
+
+
+# Global instance
+conversation_context = ConversationContextManager(
+    executor=inference_executor,
+    token_budget=settings.CHAT_TOKEN_BUDGET,
+    context_max_tokens=settings.CHAT_CONTEXT_MAX_TOKENS,
+    history_window=settings.CHAT_HISTORY_WINDOW,
+    summary_trigger_tokens=settings.CHAT_SUMMARY_TRIGGER_TOKENS,
+    summary_max_words=settings.CHAT_SUMMARY_MAX_WORDS
+)
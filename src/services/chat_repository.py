@@ -1,17 +1,26 @@
 """
 Repository layer for chat database operations
 """
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, or_, func, cast, insert, String
 from sqlalchemy.orm import Session
 from datetime import datetime
+import base64
 import uuid
 
 from models.chat import ChatSession, Message
+from models.chat_archive import ChatSessionArchive
+from models.chat_summary import ChatSessionSummary
 from models.user import User
+from services.document_repository import DocumentRepository
 from utils.logger import setup_logger
+from utils.metrics import instrument_static_methods
 
 logger = setup_logger(__name__)
 
+# Characters of the latest message returned with each session in listings
+PREVIEW_LENGTH = 120
+
 
 class ChatRepository:
     """Repository for chat-related database operations"""
@@ -30,10 +39,13 @@ class ChatRepository:
             Created ChatSession object
         """
         session_id = str(uuid.uuid4())
+        now = datetime.utcnow()
         db_session = ChatSession(
             session_id=session_id,
             user_id=user_id,
-            title=title or f"Chat {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}"
+            title=title or f"Chat {now.strftime('%Y-%m-%d %H:%M')}",
+            # Set explicitly so new sessions sort by activity like the rest
+            updated_at=now
         )
         db.add(db_session)
         db.commit()
@@ -65,6 +77,90 @@ class ChatRepository:
             .limit(limit)\
             .all()
     
+    @staticmethod
+    def get_user_session_summaries(
+        db: Session,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Tuple[ChatSession, int, Optional[str]]], Optional[str]]:
+        """
+        Get a page of a user's chat sessions with message counts and previews
+        
+        Counts and the latest message preview are computed by correlated
+        subqueries, so the page is loaded in a single SQL statement instead
+        of lazy-loading every session's messages. Archived sessions take
+        them from their archive row. Sessions are ordered by last activity
+        (updated_at, falling back to created_at), newest first.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            limit: Maximum number of sessions to return
+            cursor: Opaque cursor from a previous page
+            
+        Returns:
+            Tuple of ([(ChatSession, message_count, last_message_preview)], next_cursor);
+            next_cursor is None on the last page
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        message_count = db.query(func.count(Message.id))\
+            .filter(Message.session_id == ChatSession.id)\
+            .correlate(ChatSession)\
+            .scalar_subquery()
+        last_message = db.query(func.substr(Message.content, 1, PREVIEW_LENGTH))\
+            .filter(Message.session_id == ChatSession.id)\
+            .order_by(Message.id.desc())\
+            .limit(1)\
+            .correlate(ChatSession)\
+            .scalar_subquery()
+        activity = func.coalesce(ChatSession.updated_at, ChatSession.created_at)
+        # Compared as stored text so the cursor matches ORDER BY exactly,
+        # whatever precision the timestamps were written with
+        activity_key = cast(activity, String)
+        
+        query = db.query(
+                ChatSession,
+                message_count + func.coalesce(ChatSessionArchive.message_count, 0),
+                func.coalesce(last_message, ChatSessionArchive.last_message_preview),
+                activity_key
+            )\
+            .outerjoin(ChatSessionArchive, ChatSessionArchive.session_id == ChatSession.id)\
+            .filter(ChatSession.user_id == user_id)
+        if cursor:
+            after_key, after_id = ChatRepository._decode_cursor(cursor)
+            query = query.filter(or_(
+                activity_key < after_key,
+                and_(activity_key == after_key, ChatSession.id < after_id)
+            ))
+        rows = query\
+            .order_by(activity.desc(), ChatSession.id.desc())\
+            .limit(limit + 1)\
+            .all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_session, _, _, last_key = rows[-1]
+            next_cursor = ChatRepository._encode_cursor(last_key, last_session.id)
+        return [(session, count or 0, preview) for session, count, preview, _ in rows], next_cursor
+    
+    @staticmethod
+    def _encode_cursor(activity_key: Optional[str], session_pk: int) -> str:
+        raw = f"{activity_key or ''}|{session_pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            activity_key, session_pk = raw.rsplit("|", 1)
+            return activity_key, int(session_pk)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
     @staticmethod
     def delete_session(db: Session, session_id: str) -> bool:
         """
@@ -79,6 +175,14 @@ class ChatRepository:
         """
         session = ChatRepository.get_session_by_id(db, session_id)
         if session:
+            # Tables outside the ChatSession relationships
+            DocumentRepository.delete_session_documents(db, session.id)
+            db.query(ChatSessionSummary)\
+                .filter(ChatSessionSummary.session_id == session.id)\
+                .delete(synchronize_session=False)
+            db.query(ChatSessionArchive)\
+                .filter(ChatSessionArchive.session_id == session.id)\
+                .delete(synchronize_session=False)
             db.delete(session)
             db.commit()
             logger.info(f"Deleted chat session {session_id}")
@@ -124,6 +228,60 @@ class ChatRepository:
         db.refresh(message)
         return message
     
+    @staticmethod
+    def save_turn(
+        db: Session,
+        chat_session: ChatSession,
+        user_content: str,
+        assistant_content: str,
+        user_created_at: Optional[datetime] = None,
+        title: Optional[str] = None
+    ) -> Tuple[Message, Message]:
+        """
+        Store a complete chat turn in one transaction
+        
+        Writes the user message, the assistant reply, the updated_at bump
+        and an optional new title together, for a session that has already
+        been resolved (no further session lookups).
+        
+        Args:
+            db: Database session
+            chat_session: Resolved ChatSession
+            user_content: User message content
+            assistant_content: Assistant reply content
+            user_created_at: When the user message was received (defaults to now)
+            title: Optional new session title
+            
+        Returns:
+            Tuple of (user Message, assistant Message)
+        """
+        now = datetime.utcnow()
+        # Explicit timestamps keep the pair ordered even within one second
+        user_message = Message(
+            session_id=chat_session.id,
+            role="user",
+            content=user_content,
+            created_at=user_created_at or now
+        )
+        assistant_message = Message(
+            session_id=chat_session.id,
+            role="assistant",
+            content=assistant_content,
+            created_at=max(now, user_created_at or now)
+        )
+        db.add_all([user_message, assistant_message])
+        
+        chat_session.updated_at = now
+        if title is not None:
+            chat_session.title = title
+        
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return user_message, assistant_message
+    
     @staticmethod
     def get_session_messages(
         db: Session,
@@ -144,16 +302,220 @@ class ChatRepository:
         chat_session = ChatRepository.get_session_by_id(db, session_id)
         if not chat_session:
             return []
+        return ChatRepository.get_messages(db, chat_session, limit)
+    
+    @staticmethod
+    def get_messages(
+        db: Session,
+        chat_session: ChatSession,
+        limit: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Get messages for an already resolved chat session
         
+        Args:
+            db: Database session
+            chat_session: ChatSession object
+            limit: Optional limit on number of messages
+            
+        Returns:
+            List of Message objects, oldest first
+        """
         query = db.query(Message)\
             .filter(Message.session_id == chat_session.id)\
-            .order_by(Message.created_at.asc())
+            .order_by(Message.created_at.asc(), Message.id.asc())
         
         if limit:
             query = query.limit(limit)
         
         return query.all()
     
+    @staticmethod
+    def get_user_sessions_after(
+        db: Session,
+        user_id: int,
+        after_pk: int = 0,
+        limit: int = 500
+    ) -> List[ChatSession]:
+        """
+        A page of a user's sessions in primary key order (keyset pagination)
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            after_pk: Only return sessions with a greater primary key
+            limit: Maximum number of sessions
+        """
+        return db.query(ChatSession)\
+            .filter(ChatSession.user_id == user_id, ChatSession.id > after_pk)\
+            .order_by(ChatSession.id.asc())\
+            .limit(limit)\
+            .all()
+    
+    @staticmethod
+    def iter_session_messages(
+        db: Session,
+        session_pks: List[int],
+        batch_size: int = 1000
+    ) -> Iterator[Tuple[int, str, str, Optional[datetime]]]:
+        """
+        Stream the messages of several sessions with a server-side cursor
+        
+        Rows are fetched batch_size at a time, so memory does not grow
+        with the number of messages.
+        
+        Args:
+            db: Database session
+            session_pks: Primary keys of the sessions
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            (session_pk, role, content, created_at), by session then message order
+        """
+        if not session_pks:
+            return iter(())
+        query = db.query(Message.session_id, Message.role, Message.content, Message.created_at)\
+            .filter(Message.session_id.in_(session_pks))\
+            .order_by(Message.session_id.asc(), Message.created_at.asc(), Message.id.asc())\
+            .execution_options(stream_results=True)\
+            .yield_per(batch_size)
+        return iter(query)
+    
+    @staticmethod
+    def bulk_add_messages(db: Session, rows: List[Dict]):
+        """
+        Insert many messages in one executemany (without committing)
+        
+        Args:
+            db: Database session
+            rows: Dicts with session_id, role, content and created_at
+        """
+        if rows:
+            db.execute(insert(Message), rows)
+    
+    @staticmethod
+    def get_recent_messages(
+        db: Session,
+        chat_session: ChatSession,
+        limit: int,
+        before_id: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Get the latest messages of a chat session (a sliding history window)
+        
+        Reads newest-first through the (session_id, created_at) index, so
+        only `limit` rows are touched however long the session is, then
+        returns them in chronological order.
+        
+        Args:
+            db: Database session
+            chat_session: ChatSession object
+            limit: Maximum number of messages
+            before_id: Only return messages older than this message (keyset cursor)
+            
+        Returns:
+            List of Message objects, oldest first
+        """
+        query = db.query(Message).filter(Message.session_id == chat_session.id)
+        if before_id is not None:
+            # Compare against the cursor row's stored timestamp in SQL
+            before_created_at = db.query(Message.created_at)\
+                .filter(Message.id == before_id, Message.session_id == chat_session.id)\
+                .scalar_subquery()
+            query = query.filter(or_(
+                Message.created_at < before_created_at,
+                and_(Message.created_at == before_created_at, Message.id < before_id)
+            ))
+        
+        messages = query\
+            .order_by(Message.created_at.desc(), Message.id.desc())\
+            .limit(limit)\
+            .all()
+        messages.reverse()
+        return messages
+    
+    @staticmethod
+    def get_messages_in_range(
+        db: Session,
+        chat_session_pk: int,
+        after_id: int,
+        until_id: int,
+        limit: int
+    ) -> List[Message]:
+        """
+        Get messages with after_id < id <= until_id (the rows a summary update covers)
+        
+        Args:
+            db: Database session
+            chat_session_pk: Primary key of the ChatSession
+            after_id: Last message id already covered by the summary
+            until_id: Last message id to cover
+            limit: Maximum number of messages
+            
+        Returns:
+            List of Message objects, oldest first
+        """
+        return db.query(Message)\
+            .filter(
+                Message.session_id == chat_session_pk,
+                Message.id > after_id,
+                Message.id <= until_id
+            )\
+            .order_by(Message.id.asc())\
+            .limit(limit)\
+            .all()
+    
+    @staticmethod
+    def count_messages(db: Session, chat_session: ChatSession) -> int:
+        """Number of messages in a chat session"""
+        return db.query(func.count(Message.id))\
+            .filter(Message.session_id == chat_session.id)\
+            .scalar()
+    
+    @staticmethod
+    def get_session_summary(db: Session, chat_session: ChatSession) -> Optional[ChatSessionSummary]:
+        """Get the rolling summary of a chat session, if any"""
+        return db.query(ChatSessionSummary)\
+            .filter(ChatSessionSummary.session_id == chat_session.id)\
+            .first()
+    
+    @staticmethod
+    def save_session_summary(
+        db: Session,
+        chat_session_pk: int,
+        summary: str,
+        summary_tokens: int,
+        summarized_until_id: int
+    ) -> ChatSessionSummary:
+        """
+        Create or replace the rolling summary of a chat session
+        
+        Args:
+            db: Database session
+            chat_session_pk: Primary key of the ChatSession
+            summary: Summary text
+            summary_tokens: Approximate token count of the summary
+            summarized_until_id: Last message id covered by the summary
+            
+        Returns:
+            Saved ChatSessionSummary object
+        """
+        row = db.query(ChatSessionSummary)\
+            .filter(ChatSessionSummary.session_id == chat_session_pk)\
+            .first()
+        if row is None:
+            row = ChatSessionSummary(session_id=chat_session_pk)
+            db.add(row)
+        elif row.summarized_until_id >= summarized_until_id:
+            # A newer summary was stored meanwhile
+            return row
+        row.summary = summary
+        row.summary_tokens = summary_tokens
+        row.summarized_until_id = summarized_until_id
+        db.commit()
+        db.refresh(row)
+        return row
+    
     @staticmethod
     def update_session_title(db: Session, session_id: str, title: str) -> Optional[ChatSession]:
         """
@@ -175,3 +537,7 @@ class ChatRepository:
             db.refresh(chat_session)
             logger.info(f"Updated title for session {session_id}")
         return chat_session
+
+
+# Time every repository call as a "chat_repository.<method>" stage
+instrument_static_methods(ChatRepository, "chat_repository")
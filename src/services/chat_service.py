@@ -1,21 +1,75 @@
 """
 Service for managing conversational chat with context using Google Gemini and database
 """
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from models.chat import ChatSession, Message
+from models.chat_summary import ChatSessionSummary
 from models.summarizer import gemini_model
+from services.async_repositories import AsyncChatRepository
+from services.chat_archive import chat_archive
 from services.chat_repository import ChatRepository
+from services.chat_context import conversation_context, ConversationContext
+from services.document_store import document_store
+from services.inference_executor import inference_executor, InferenceQueueFullError
+from utils.db import DbSession, run_db
 from utils.logger import setup_logger
+from utils.metrics import observe_chars
 
 logger = setup_logger(__name__)
 
+ERROR_REPLY = "I apologize, but I encountered an error while processing your request. Please try again."
+
+# Titles replaced by the first user message
+PLACEHOLDER_TITLES = (None, "", "Hội thoại mới", "New Conversation")
+
+
+class ChatTurn:
+    """State of one chat turn between resolving the session and saving it"""
+    
+    def __init__(
+        self,
+        chat_session: ChatSession,
+        message: str,
+        prompt: ConversationContext,
+        title: Optional[str]
+    ):
+        self.chat_session = chat_session
+        self.message = message
+        self.prompt = prompt
+        self.title = title
+        self.received_at = datetime.utcnow()
+    
+    @property
+    def history(self) -> List[Dict]:
+        return self.prompt.history
+    
+    @property
+    def context(self) -> Optional[str]:
+        return self.prompt.context
+    
+    @property
+    def usage(self) -> Dict[str, int]:
+        return self.prompt.usage
+
 
 class ChatService:
-    """Service for handling conversational chat with database persistence"""
+    """
+    Service for handling conversational chat with database persistence
+    
+    Methods that touch the database accept a Session or an AsyncSession.
+    """
     
     def __init__(self):
         self.repository = ChatRepository
+        self.async_repository = AsyncChatRepository
+        self.executor = inference_executor
+        self.context_manager = conversation_context
+        self.document_store = document_store
+        self.archive = chat_archive
     
     def create_session(self, db: Session, user_id: int, title: Optional[str] = None) -> str:
         """
@@ -36,72 +90,261 @@ class ChatService:
         """Get all chat sessions for a user"""
         return self.repository.get_user_sessions(db, user_id)
     
-    def delete_session(self, db: Session, session_id: str):
+    async def list_sessions(
+        self,
+        db: DbSession,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ):
+        """Get a page of a user's sessions with message counts and previews"""
+        return await run_db(db, self.repository.get_user_session_summaries, user_id, limit, cursor)
+    
+    async def delete_session(self, db: DbSession, session_id: str):
         """Delete a chat session"""
-        return self.repository.delete_session(db, session_id)
+        chat_session = await run_db(db, self.repository.get_session_by_id, session_id)
+        if chat_session is None:
+            return False
+        session_pk = chat_session.id
+        deleted = await run_db(db, self.repository.delete_session, session_id)
+        self.document_store.forget_session(session_pk)
+        return deleted
     
-    def update_session_title(self, db: Session, session_id: str, title: str):
+    async def update_session_title(self, db: DbSession, session_id: str, title: str):
         """Update session title"""
-        return self.repository.update_session_title(db, session_id, title)
+        return await run_db(db, self.repository.update_session_title, session_id, title)
     
     async def chat(
         self,
-        db: Session,
+        db: DbSession,
         session_id: str,
         message: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        chat_session: Optional[ChatSession] = None,
+        usage: Optional[Dict[str, int]] = None
     ) -> str:
         """
         Process a chat message with conversation history
         
+        The session is resolved once (or taken from chat_session when the
+        caller already loaded it) and the user message and reply are stored
+        together in one transaction after generation. The prompt is fitted
+        to CHAT_TOKEN_BUDGET by the conversation context manager.
+        
         Args:
-            db: Database session
+            db: Database session (sync or async)
             session_id: Chat session ID
             message: User message
             context: Optional context (e.g., summarized document)
+            chat_session: Already loaded ChatSession, to skip the lookup
+            usage: Optional dict, filled with this turn's token counts
             
         Returns:
             Assistant response
         """
+        turn = await self._begin_turn(db, session_id, message, context, chat_session)
+        if usage is not None:
+            usage.update(turn.usage)
+        
+        # Generate response using Gemini
+        response = await self._generate_response(message, turn.history, turn.context)
+        
+        await self._finish_turn(db, turn, response)
+        return response
+    
+    async def chat_stream(
+        self,
+        db: DbSession,
+        session_id: str,
+        message: str,
+        context: Optional[str] = None,
+        chat_session: Optional[ChatSession] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Process a chat message, yielding the assistant reply as it is generated
+        
+        Uses gemini_model.chat_stream when the model provides it and falls
+        back to a single chunk from gemini_model.chat otherwise. The turn is
+        persisted once, after the stream completes. If the consumer stops
+        early (client disconnected) generation is stopped and nothing is
+        stored.
+        
+        Args:
+            db: Database session (sync or async)
+            session_id: Chat session ID
+            message: User message
+            context: Optional context (e.g., summarized document)
+            chat_session: Already loaded ChatSession, to skip the lookup
+            usage: Optional dict, filled with this turn's token counts
+            
+        Yields:
+            Assistant reply chunks
+        """
+        turn = await self._begin_turn(db, session_id, message, context, chat_session)
+        if usage is not None:
+            usage.update(turn.usage)
+        
+        parts = []
+        try:
+            stream = self.executor.stream(
+                getattr(gemini_model, "chat_stream", gemini_model.chat),
+                message=message,
+                context=turn.context,
+                conversation_history=turn.history[:-1]  # Exclude current message
+            )
+            async with aclosing(stream):
+                async for chunk in stream:
+                    parts.append(chunk)
+                    yield chunk
+        except InferenceQueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            if not parts:
+                parts = [ERROR_REPLY]
+                yield ERROR_REPLY
+        
+        await self._finish_turn(db, turn, "".join(parts))
+    
+    async def _begin_turn(
+        self,
+        db: DbSession,
+        session_id: str,
+        message: str,
+        context: Optional[str] = None,
+        chat_session: Optional[ChatSession] = None
+    ) -> ChatTurn:
+        """
+        Resolve the session and assemble the prompt within the token budget
+        
+        Relevant passages from documents attached to the session are added
+        to the context, so files do not need to be sent again. Retrieval
+        scoring runs in a worker thread; the history reads then run in one
+        pass over the session.
+        
+        Returns:
+            ChatTurn whose history includes the new user message
+        """
+        observe_chars("chat_message", message)
         # Verify session exists
-        session = self.repository.get_session_by_id(db, session_id)
-        if not session:
+        if chat_session is None:
+            chat_session = await run_db(db, self.repository.get_session_by_id, session_id)
+        if not chat_session:
             raise ValueError(f"Session {session_id} not found")
         
-        # Auto-update session title from first user message
-        if session.title in [None, "", "Hội thoại mới", "New Conversation"]:
-            # Get message count to check if this is the first message
-            message_count = len(session.messages) if session.messages else 0
-            if message_count == 0:
-                # Use first 200 characters of user message as title
-                title = message[:200].strip()
-                if len(message) > 200:
-                    title += "..."
-                self.repository.update_session_title(db, session_id, title)
-                logger.info(f"Auto-updated session {session_id} title: {title}")
-        
-        # Add user message to database
-        self.repository.add_message(db, session_id, "user", message)
-        
-        # Get conversation history
-        messages = self.repository.get_session_messages(db, session_id, limit=10)
-        history = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        # Reject before doing anything else if the model is saturated
+        self.executor.ensure_capacity()
         
-        # Generate response using Gemini
-        response = await self._generate_response(message, history, context)
+        # Passages of the session's attached documents relevant to this message
+        passages = await self.document_store.retrieve(
+            db, chat_session, message, self.context_manager.context_max_tokens
+        )
+        if passages:
+            context = f"{context}\n\n{passages}" if context else passages
+        
+        await self.archive.rehydrate(db, chat_session)
+        summary, messages = await run_db(db, self._read_history, chat_session)
+        return self._prepare_turn(chat_session, summary, messages, message, context)
+    
+    def _read_history(
+        self,
+        db: Session,
+        chat_session: ChatSession
+    ) -> Tuple[Optional[ChatSessionSummary], List[Message]]:
+        """The session's rolling summary and its recent history window"""
+        summary = self.repository.get_session_summary(db, chat_session)
+        messages = self.repository.get_recent_messages(
+            db, chat_session, limit=self.context_manager.history_window
+        )
+        return summary, messages
+    
+    def _prepare_turn(
+        self,
+        chat_session: ChatSession,
+        summary: Optional[ChatSessionSummary],
+        messages: List[Message],
+        message: str,
+        context: Optional[str] = None
+    ) -> ChatTurn:
+        """
+        Fit the prompt to the budget and pick a title for a new session
         
-        # Add assistant response to database
-        self.repository.add_message(db, session_id, "assistant", response)
+        Nothing is written here; see _finish_turn.
+        """
+        prompt = self.context_manager.build(summary, messages, message, context)
+        logger.info(f"Chat turn tokens for session {chat_session.session_id}: {prompt.usage}")
         
-        return response
+        # Auto-update session title from first user message
+        title = None
+        if chat_session.title in PLACEHOLDER_TITLES and not messages and summary is None:
+            # Use first 200 characters of user message as title
+            title = message[:200].strip()
+            if len(message) > 200:
+                title += "..."
+        
+        return ChatTurn(chat_session, message, prompt, title)
+    
+    async def _finish_turn(self, db: DbSession, turn: ChatTurn, response: str):
+        """Store the user message, reply and session updates in one transaction"""
+        session_id = turn.chat_session.session_id
+        session_pk = turn.chat_session.id
+        await run_db(
+            db,
+            self.repository.save_turn,
+            turn.chat_session,
+            user_content=turn.message,
+            assistant_content=response,
+            user_created_at=turn.received_at,
+            title=turn.title
+        )
+        if turn.title is not None:
+            logger.info(f"Auto-updated session {session_id} title ({len(turn.title)} chars)")
+        
+        # Fold turns that no longer fit the budget into the rolling summary
+        self.context_manager.schedule_compaction(session_pk, turn.prompt)
     
     def get_session_history(self, db: Session, session_id: str):
         """Get all messages for a session"""
         return self.repository.get_session_messages(db, session_id)
     
+    async def get_history_page(
+        self,
+        db: DbSession,
+        chat_session: ChatSession,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ):
+        """
+        Get a page of a session's history, newest page first
+        
+        Args:
+            db: Database session
+            chat_session: ChatSession object
+            limit: Maximum number of messages
+            cursor: Cursor from a previous page (older messages are returned)
+            
+        Returns:
+            Tuple of (messages oldest first, next_cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        before_id = None
+        if cursor:
+            try:
+                before_id = int(cursor)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+        
+        await self.archive.rehydrate(db, chat_session)
+        messages = await run_db(db, self.repository.get_recent_messages, chat_session, limit + 1, before_id)
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[1:]
+            next_cursor = str(messages[0].id)
+        return messages, next_cursor
+    
     async def _generate_response(
         self,
         message: str,
@@ -121,16 +364,19 @@ class ChatService:
         """
         try:
             # Use Gemini to generate response
-            response = gemini_model.chat(
+            response = await self.executor.run(
+                gemini_model.chat,
                 message=message,
                 context=context,
-                conversation_history=history[:-1] if history else []  # Exclude current message
+                conversation_history=history[:-1]  # Exclude current message
             )
             
             return response
+        except InferenceQueueFullError:
+            raise
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
-            return "I apologize, but I encountered an error while processing your request. Please try again."
+            return ERROR_REPLY
 
 
 # Global instance
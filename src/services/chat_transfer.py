@@ -0,0 +1,315 @@
+"""
+Streaming NDJSON export and import of chat sessions
+"""
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.chat import ChatSession
+from services.chat_archive import ChatArchiveService
+from services.chat_repository import ChatRepository
+from utils.db import run_db
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _parse_timestamp(value: Optional[str], line_number: int) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Line {line_number}: invalid timestamp {value!r}")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = settings.CHAT_IMPORT_MAX_LINE_BYTES
+) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded lines
+
+    Only the current partial line is buffered, so a request body can be
+    consumed as it arrives. Its pieces are joined once the line ends.
+
+    Raises:
+        ValueError: If a line is longer than max_line_bytes
+    """
+    pending: List[bytes] = []
+    pending_size = 0
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            if pending:
+                line = b"".join(pending) + line
+                pending = []
+                pending_size = 0
+            if len(line) > max_line_bytes:
+                raise ValueError(f"Line longer than {max_line_bytes} bytes")
+            yield line.decode("utf-8")
+        if rest:
+            pending.append(rest)
+            pending_size += len(rest)
+            if pending_size > max_line_bytes:
+                raise ValueError(f"Line longer than {max_line_bytes} bytes")
+    if pending:
+        yield b"".join(pending).decode("utf-8")
+
+
+class ChatExporter:
+    """
+    Writes a user's chat sessions as NDJSON, one record per line
+
+    Each session is a {"type": "session", ...} line followed by its
+    {"type": "message", ...} lines, oldest first. Sessions are read in
+    keyset pages and messages through a server-side cursor, so memory
+    stays flat however much history the user has. Archived sessions are
+    exported from their archive without restoring them.
+    """
+
+    def __init__(self, page_size: int, batch_size: int):
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.repository = ChatRepository
+
+    def export_user(self, db: Session, user_id: int) -> Iterator[str]:
+        """
+        Export all sessions of a user
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Yields:
+            NDJSON lines, each ending with a newline
+        """
+        after_pk = 0
+        while True:
+            sessions = self.repository.get_user_sessions_after(db, user_id, after_pk, self.page_size)
+            if not sessions:
+                return
+            after_pk = sessions[-1].id
+            by_pk = {session.id: session for session in sessions}
+            archived = ChatArchiveService.archived_session_ids(db, list(by_pk))
+
+            # Live messages of the page, merged in session order; an archived
+            # session's live messages were written after its archive
+            live = self.repository.iter_session_messages(db, list(by_pk), self.batch_size)
+            pending = next(live, None)
+            for session in sessions:
+                yield self._line(self._session_record(session))
+                if session.id in archived:
+                    for _, role, content, created_at in ChatArchiveService.read_messages(db, session.id):
+                        yield self._line(self._message_record(session.session_id, role, content, created_at))
+                while pending is not None and pending[0] == session.id:
+                    _, role, content, created_at = pending
+                    yield self._line(
+                        self._message_record(session.session_id, role, content, _timestamp(created_at))
+                    )
+                    pending = next(live, None)
+
+    @staticmethod
+    def _session_record(session: ChatSession) -> Dict:
+        return {
+            "type": "session",
+            "session_id": session.session_id,
+            "title": session.title,
+            "created_at": _timestamp(session.created_at),
+            "updated_at": _timestamp(session.updated_at),
+        }
+
+    @staticmethod
+    def _message_record(session_id: str, role: str, content: str, created_at: Optional[str]) -> Dict:
+        return {
+            "type": "message",
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "created_at": created_at,
+        }
+
+    @staticmethod
+    def _line(record: Dict) -> str:
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class ChatImporter:
+    """
+    Reads NDJSON produced by ChatExporter into a user's account
+
+    Records are applied in batches: messages are inserted with one
+    executemany per batch and each batch is committed, so memory is
+    bounded by the batch size. A session whose session_id already exists
+    is not created again. If the user owns it, its messages already
+    stored are skipped and the rest are added, so re-running an import
+    that stopped partway completes the session a batch left unfinished.
+    Messages of another user's session are ignored.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.repository = ChatRepository
+        self.line_number = 0
+        self.stats = {"sessions": 0, "skipped_sessions": 0, "messages": 0}
+        self._session_id: Optional[str] = None
+        self._session_pk: Optional[int] = None
+        # Messages of the current session already stored by an earlier run
+        self._already_stored = 0
+
+    def parse(self, line: str) -> Optional[Dict]:
+        """
+        Decode one NDJSON line
+
+        Returns:
+            The record, or None for a blank line
+
+        Raises:
+            ValueError: If the line is not a JSON object
+        """
+        self.line_number += 1
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {self.line_number}: invalid JSON ({e.msg})")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {self.line_number}: expected a JSON object")
+        record["_line"] = self.line_number
+        return record
+
+    def write_batch(self, db: Session, records: List[Dict]):
+        """
+        Apply a batch of parsed records and commit
+
+        Raises:
+            ValueError: If a record is malformed
+        """
+        messages = []
+        for record in records:
+            kind = record.get("type")
+            line_number = record["_line"]
+            if kind == "session":
+                self._insert_messages(db, messages)
+                messages = []
+                self._start_session(db, record, line_number)
+            elif kind == "message":
+                if record.get("session_id") != self._session_id:
+                    raise ValueError(f"Line {line_number}: message does not follow its session")
+                if self._session_pk is None:
+                    continue
+                role = record.get("role")
+                content = record.get("content")
+                if role not in ("user", "assistant") or not isinstance(content, str):
+                    raise ValueError(f"Line {line_number}: invalid message")
+                if self._already_stored:
+                    self._already_stored -= 1
+                    continue
+                messages.append({
+                    "session_id": self._session_pk,
+                    "role": role,
+                    "content": content,
+                    "created_at": _parse_timestamp(record.get("created_at"), line_number) or datetime.utcnow(),
+                })
+            else:
+                raise ValueError(f"Line {line_number}: unknown record type {kind!r}")
+        self._insert_messages(db, messages)
+        db.commit()
+
+    def _insert_messages(self, db: Session, messages: List[Dict]):
+        self.repository.bulk_add_messages(db, messages)
+        self.stats["messages"] += len(messages)
+
+    def import_lines(self, db: Session, lines: Iterable[str], batch_size: int) -> Dict[str, int]:
+        """
+        Import an iterable of NDJSON lines
+
+        Returns:
+            Counts of imported sessions, skipped sessions and messages
+        """
+        batch = []
+        for line in lines:
+            record = self.parse(line)
+            if record is None:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.write_batch(db, batch)
+                batch = []
+        if batch:
+            self.write_batch(db, batch)
+        return self.stats
+
+    async def import_stream(
+        self,
+        db: Union[Session, AsyncSession],
+        chunks: AsyncIterator[bytes],
+        batch_size: int
+    ) -> Dict[str, int]:
+        """
+        Import NDJSON from a byte stream, such as a request body
+
+        Returns:
+            Counts of imported sessions, skipped sessions and messages
+        """
+        batch = []
+        async for line in iter_lines(chunks, settings.CHAT_IMPORT_MAX_LINE_BYTES):
+            record = self.parse(line)
+            if record is None:
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                await run_db(db, self.write_batch, batch)
+                batch = []
+        if batch:
+            await run_db(db, self.write_batch, batch)
+        return self.stats
+
+    def _start_session(self, db: Session, record: Dict, line_number: int):
+        session_id = record.get("session_id")
+        if not isinstance(session_id, str) or not session_id:
+            raise ValueError(f"Line {line_number}: session_id is required")
+        self._session_id = session_id
+        self._already_stored = 0
+        existing = self.repository.get_session_by_id(db, session_id)
+        if existing is not None:
+            self.stats["skipped_sessions"] += 1
+            if existing.user_id != self.user_id:
+                self._session_pk = None
+                return
+            # Messages are imported in file order, so those stored are a prefix
+            self._session_pk = existing.id
+            self._already_stored = self.repository.count_messages(db, existing) + \
+                ChatArchiveService.archived_message_count(db, existing.id)
+            return
+        created_at = _parse_timestamp(record.get("created_at"), line_number) or datetime.utcnow()
+        chat_session = ChatSession(
+            session_id=session_id,
+            user_id=self.user_id,
+            title=record.get("title"),
+            created_at=created_at,
+            updated_at=_parse_timestamp(record.get("updated_at"), line_number) or created_at
+        )
+        db.add(chat_session)
+        db.flush()
+        self._session_pk = chat_session.id
+        self.stats["sessions"] += 1
+
+
+# Global instance
+chat_exporter = ChatExporter(
+    page_size=settings.CHAT_EXPORT_PAGE_SIZE,
+    batch_size=settings.CHAT_TRANSFER_BATCH_SIZE
+)
@@ -0,0 +1,161 @@
+"""
+Repository layer for chat document database operations
+"""
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from models.chat_document import ChatDocument, ChatDocumentChunk
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class DocumentRepository:
+    """Repository for documents attached to chat sessions"""
+
+    @staticmethod
+    def find_by_file_hash(
+        db: Session,
+        file_hash: str,
+        session_pk: Optional[int] = None
+    ) -> Optional[ChatDocument]:
+        """
+        Find a document by the hash of its uploaded bytes
+
+        Args:
+            db: Database session
+            file_hash: sha256 of the uploaded file
+            session_pk: Restrict to one chat session (any session if None)
+        """
+        query = db.query(ChatDocument).filter(ChatDocument.file_hash == file_hash)
+        if session_pk is not None:
+            query = query.filter(ChatDocument.session_id == session_pk)
+        return query.first()
+
+    @staticmethod
+    def find_by_content_hash(db: Session, session_pk: int, content_hash: str) -> Optional[ChatDocument]:
+        """Find a session document by the hash of its extracted text"""
+        return db.query(ChatDocument)\
+            .filter(ChatDocument.session_id == session_pk, ChatDocument.content_hash == content_hash)\
+            .first()
+
+    @staticmethod
+    def add_document(
+        db: Session,
+        session_pk: int,
+        filename: str,
+        file_hash: str,
+        content_hash: str,
+        text: str,
+        chunks: List[Tuple[str, int]]
+    ) -> ChatDocument:
+        """
+        Store a document and its chunks in one transaction
+
+        Args:
+            db: Database session
+            session_pk: Primary key of the ChatSession
+            filename: Original filename
+            file_hash: sha256 of the uploaded bytes
+            content_hash: sha256 of the extracted text
+            text: Extracted text
+            chunks: (content, token_count) pairs in document order
+
+        Returns:
+            Created ChatDocument object
+        """
+        document = ChatDocument(
+            session_id=session_pk,
+            filename=filename,
+            file_hash=file_hash,
+            content_hash=content_hash,
+            text=text,
+            char_count=len(text),
+            chunk_count=len(chunks)
+        )
+        db.add(document)
+        db.flush()
+        db.add_all([
+            ChatDocumentChunk(
+                document_id=document.id,
+                session_id=session_pk,
+                position=position,
+                content=content,
+                token_count=token_count
+            )
+            for position, (content, token_count) in enumerate(chunks)
+        ])
+        db.commit()
+        db.refresh(document)
+        logger.info(f"Stored document {filename} ({len(chunks)} chunks) for session {session_pk}")
+        return document
+
+    @staticmethod
+    def list_documents(db: Session, session_pk: int) -> List[ChatDocument]:
+        """Documents of a chat session, oldest first"""
+        return db.query(ChatDocument)\
+            .filter(ChatDocument.session_id == session_pk)\
+            .order_by(ChatDocument.id.asc())\
+            .all()
+
+    @staticmethod
+    def get_document_ids(db: Session, session_pk: int) -> List[int]:
+        """Ids of a session's documents, oldest first"""
+        rows = db.query(ChatDocument.id)\
+            .filter(ChatDocument.session_id == session_pk)\
+            .order_by(ChatDocument.id.asc())\
+            .all()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def get_chunk_texts(db: Session, session_pk: int) -> List[Tuple[int, int, str]]:
+        """(chunk_id, document_id, content) of a session's chunks in document order"""
+        return [
+            tuple(row) for row in db.query(
+                ChatDocumentChunk.id, ChatDocumentChunk.document_id, ChatDocumentChunk.content
+            )
+            .filter(ChatDocumentChunk.session_id == session_pk)
+            .order_by(ChatDocumentChunk.document_id.asc(), ChatDocumentChunk.position.asc())
+            .all()
+        ]
+
+    @staticmethod
+    def get_chunks_by_ids(db: Session, chunk_ids: List[int]) -> List[Tuple[ChatDocumentChunk, str]]:
+        """Chunks with their document filename, in document order"""
+        if not chunk_ids:
+            return []
+        return db.query(ChatDocumentChunk, ChatDocument.filename)\
+            .join(ChatDocument, ChatDocument.id == ChatDocumentChunk.document_id)\
+            .filter(ChatDocumentChunk.id.in_(chunk_ids))\
+            .order_by(ChatDocumentChunk.document_id.asc(), ChatDocumentChunk.position.asc())\
+            .all()
+
+    @staticmethod
+    def delete_document(db: Session, session_pk: int, document_id: int) -> bool:
+        """
+        Delete a session document and its chunks
+
+        Returns:
+            True if deleted, False if not found
+        """
+        document = db.query(ChatDocument)\
+            .filter(ChatDocument.id == document_id, ChatDocument.session_id == session_pk)\
+            .first()
+        if not document:
+            return False
+        db.query(ChatDocumentChunk)\
+            .filter(ChatDocumentChunk.document_id == document.id)\
+            .delete(synchronize_session=False)
+        db.delete(document)
+        db.commit()
+        return True
+
+    @staticmethod
+    def delete_session_documents(db: Session, session_pk: int):
+        """Delete all documents of a session (without committing)"""
+        db.query(ChatDocumentChunk)\
+            .filter(ChatDocumentChunk.session_id == session_pk)\
+            .delete(synchronize_session=False)
+        db.query(ChatDocument)\
+            .filter(ChatDocument.session_id == session_pk)\
+            .delete(synchronize_session=False)
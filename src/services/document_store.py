@@ -0,0 +1,214 @@
+"""
+Session-scoped storage and retrieval of attached documents
+"""
+import asyncio
+import hashlib
+from typing import List, Optional, Tuple, Union
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.chat import ChatSession
+from models.chat_document import ChatDocument, ChatDocumentChunk
+from services.chat_context import estimate_tokens
+from services.document_repository import DocumentRepository
+from services.file_processor_service import FileProcessorService
+from services.retrieval_index import retrieval_index_store, RetrievalIndexStore
+from services.summary_cache import SummaryCache
+from services.text_chunker import TextChunker
+from services.upload_ingestion import upload_ingestor
+from utils.db import run_db
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Passages scoring below this fraction of the best match are left out
+MIN_RELATIVE_SCORE = 0.5
+
+# Candidates ranked by the index per passage that can be used
+CANDIDATES_PER_PASSAGE = 3
+
+
+class DocumentStore:
+    """
+    Stores each attached file once per session and serves relevant passages
+
+    Uploads are identified by the hash of their bytes, so re-attaching a
+    file skips extraction (the text is reused from any session that already
+    has it), and by the hash of their text, so the same content is stored
+    once per session. Documents are split into chunks; each turn gets the
+    chunks that best match the user message, within a token budget,
+    ranked by a per-session BM25 index that is rebuilt only when the
+    session's documents change.
+    """
+
+    def __init__(
+        self,
+        file_processor: FileProcessorService,
+        chunk_chars: int,
+        chunk_overlap: int,
+        max_passages: int,
+        index_store: RetrievalIndexStore
+    ):
+        self.file_processor = file_processor
+        self.ingestor = upload_ingestor
+        self.chunker = TextChunker(max_chars=chunk_chars, overlap_chars=chunk_overlap)
+        self.max_passages = max_passages
+        self.repository = DocumentRepository
+        self.index_store = index_store
+
+    async def add_upload(
+        self,
+        db: Union[Session, AsyncSession],
+        chat_session: ChatSession,
+        file: UploadFile
+    ) -> Tuple[ChatDocument, bool]:
+        """
+        Store an uploaded file for a chat session
+
+        Args:
+            db: Database session (sync or async)
+            chat_session: Session the file is attached to
+            file: Uploaded file
+
+        Returns:
+            Tuple of (ChatDocument, reused) where reused is True if the
+            document was already attached to the session
+
+        Raises:
+            ValueError: If the file type is unsupported or no text was extracted
+            UploadTooLargeError: If the upload exceeds MAX_UPLOAD_SIZE
+        """
+        with await self.ingestor.ingest(file) as upload:
+            existing = await run_db(db, self.repository.find_by_file_hash, upload.sha256, chat_session.id)
+            if existing:
+                logger.info(f"Document {upload.filename} already attached to session {chat_session.session_id}")
+                return existing, True
+
+            known = await run_db(db, self.repository.find_by_file_hash, upload.sha256)
+            if known:
+                logger.info(f"Reusing extracted text for {upload.filename}")
+                text = known.text
+            else:
+                text = await self.file_processor.extract_text_from_upload(upload)
+            file_hash = upload.sha256
+            filename = upload.filename
+
+        if not text or not text.strip():
+            raise ValueError(f"Could not extract text from {filename}")
+
+        content_hash = hashlib.sha256(SummaryCache.normalize_text(text).encode("utf-8")).hexdigest()
+        existing = await run_db(db, self.repository.find_by_content_hash, chat_session.id, content_hash)
+        if existing:
+            return existing, True
+
+        chunks = [(chunk, estimate_tokens(chunk)) for chunk in self.chunker.split(text)]
+        document = await run_db(
+            db, self.repository.add_document,
+            chat_session.id, filename, file_hash, content_hash, text, chunks
+        )
+        self.index_store.invalidate(chat_session.id)
+        return document, False
+
+    def list_documents(self, db: Session, chat_session: ChatSession) -> List[ChatDocument]:
+        """Documents attached to a chat session"""
+        return self.repository.list_documents(db, chat_session.id)
+
+    def delete_document(self, db: Session, chat_session: ChatSession, document_id: int) -> bool:
+        """Detach a document from a chat session"""
+        deleted = self.repository.delete_document(db, chat_session.id, document_id)
+        if deleted:
+            self.index_store.invalidate(chat_session.id)
+        return deleted
+
+    def forget_session(self, chat_session_pk: int):
+        """Drop the retrieval index of a deleted chat session"""
+        self.index_store.invalidate(chat_session_pk)
+
+    async def retrieve(
+        self,
+        db: Union[Session, AsyncSession],
+        chat_session: ChatSession,
+        query: str,
+        max_tokens: int
+    ) -> Optional[str]:
+        """
+        Passages from the session's documents relevant to a message
+
+        Only the row reads use the database session; loading or building
+        the index and scoring run in a worker thread, so a large document
+        does not stall other requests.
+
+        Args:
+            db: Database session (sync or async)
+            chat_session: Chat session
+            query: User message
+            max_tokens: Approximate token budget for the passages
+
+        Returns:
+            Formatted passages, or None if the session has no documents
+        """
+        document_ids = await run_db(db, self.repository.get_document_ids, chat_session.id)
+        if not document_ids:
+            return None
+
+        index = await self.index_store.get_async(
+            chat_session.id,
+            document_ids,
+            lambda: run_db(db, self.repository.get_chunk_texts, chat_session.id)
+        )
+        ranked = await asyncio.to_thread(index.search, query, self.max_passages * CANDIDATES_PER_PASSAGE)
+        if ranked:
+            threshold = ranked[0][1] * MIN_RELATIVE_SCORE
+            candidate_ids = [chunk_id for chunk_id, score in ranked if score >= threshold]
+        else:
+            # Nothing matches (e.g. "summarize this"): start of the newest document
+            candidate_ids = index.leading_chunks(document_ids[-1], self.max_passages)
+
+        rows = {
+            chunk.id: (chunk, filename)
+            for chunk, filename in await run_db(db, self.repository.get_chunks_by_ids, candidate_ids)
+        }
+        ranked_rows = [rows[chunk_id] for chunk_id in candidate_ids if chunk_id in rows]
+        selected = self._select(ranked_rows, max_tokens)
+        if not selected:
+            return None
+
+        parts = []
+        current = None
+        for chunk, filename in selected:
+            if filename != current:
+                parts.append(f"[From attached document: {filename}]")
+                current = filename
+            parts.append(chunk.content)
+        return "\n\n".join(parts)
+
+    def _select(
+        self,
+        ranked: List[Tuple[ChatDocumentChunk, str]],
+        max_tokens: int
+    ) -> List[Tuple[ChatDocumentChunk, str]]:
+        """Best-ranked chunks within the budget, in document order"""
+        chosen = []
+        used = 0
+        for row in ranked:
+            if len(chosen) >= self.max_passages:
+                break
+            cost = row[0].token_count
+            if used + cost > max_tokens:
+                continue
+            chosen.append(row)
+            used += cost
+        return sorted(chosen, key=lambda row: (row[0].document_id, row[0].position))
+
+
+# Global instance
+document_store = DocumentStore(
+    file_processor=FileProcessorService(),
+    chunk_chars=settings.CHAT_DOCUMENT_CHUNK_CHARS,
+    chunk_overlap=settings.CHAT_DOCUMENT_CHUNK_OVERLAP,
+    max_passages=settings.CHAT_DOCUMENT_MAX_PASSAGES,
+    index_store=retrieval_index_store
+)
@@ -2,111 +2,265 @@
 Service for processing uploaded files
 """
 from fastapi import UploadFile
-import PyPDF2
+import asyncio
 import docx
-from typing import Optional
-import io
-
-from pdf2image import convert_from_bytes
-import pytesseract
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import os
+from typing import Callable, List, Optional
 
+from config.settings import settings
+from services import pdf_extraction
+from services.upload_ingestion import upload_ingestor, SpooledUpload
 from utils.logger import setup_logger
+from utils.metrics import observe_bytes, timed_stage
 
 logger = setup_logger(__name__)
 
-import pytesseract
-import os
+# Single-batch documents are processed in-process, so configure Tesseract here too
+pdf_extraction.init_worker(settings.TESSERACT_CMD, settings.TESSDATA_PREFIX)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx')
+
+# Progress callback: (stage, done, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+# Process pool for PDF page extraction and OCR, created on first use
+_pdf_pool: Optional[ProcessPoolExecutor] = None
 
-pytesseract.pytesseract.tesseract_cmd = (
-    r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-)
 
-os.environ["TESSDATA_PREFIX"] = (
-    r"C:\Program Files\Tesseract-OCR\tessdata"
-)
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound PDF work"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS,
+            initializer=pdf_extraction.init_worker,
+            initargs=(settings.TESSERACT_CMD, settings.TESSDATA_PREFIX)
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    """Stop PDF worker processes (called on application shutdown)"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
 
 
 class FileProcessorService:
     """Service for extracting text from uploaded files"""
     
+    def __init__(self):
+        self.ingestor = upload_ingestor
+    
     async def extract_text(self, file: UploadFile) -> Optional[str]:
         """
         Extract text from uploaded file based on file type
         
+        The upload is streamed through the ingestor first, which enforces
+        MAX_UPLOAD_SIZE and leaves large files in the request's spool file,
+        which parsers read directly.
+        
         Args:
             file: Uploaded file
-            
+        
         Returns:
             Extracted text content
+            
+        Raises:
+            UploadTooLargeError: If the upload exceeds MAX_UPLOAD_SIZE
         """
         filename = file.filename.lower()
+        if not filename.endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"Unsupported file type: {filename}")
+        
+        with await self.ingestor.ingest(file) as upload:
+            return await self._extract(upload)
+    
+    async def extract_text_from_upload(self, upload: SpooledUpload) -> Optional[str]:
+        """
+        Extract text from an upload that has already been ingested
+        
+        Args:
+            upload: SpooledUpload from the ingestor (the caller cleans it up)
+            
+        Returns:
+            Extracted text content
+        """
+        if not upload.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"Unsupported file type: {upload.filename}")
+        return await self._extract(upload)
+    
+    async def extract_text_from_path(
+        self,
+        path: str,
+        filename: str,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Optional[str]:
+        """
+        Extract text from a file already stored on disk (e.g. a queued job's upload)
         
+        Args:
+            path: File path
+            filename: Original filename, used to pick the parser
+            progress_callback: Optional callable(stage, done, total) for page progress
+            
+        Returns:
+            Extracted text content
+        """
+        if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"Unsupported file type: {filename}")
+        upload = SpooledUpload(filename, os.path.getsize(path), path=path)
+        return await self._extract(upload, progress_callback)
+    
+    async def _extract(
+        self,
+        upload: SpooledUpload,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> str:
+        """Dispatch to the parser for the file type"""
+        filename = upload.filename.lower()
+        observe_bytes("upload", upload.size)
         try:
             if filename.endswith('.pdf'):
-                return await self._extract_from_pdf(file)
+                return await self._extract_from_pdf(upload, progress_callback)
             elif filename.endswith('.txt'):
-                return await self._extract_from_txt(file)
-            elif filename.endswith('.docx'):
-                return await self._extract_from_docx(file)
+                return await self._extract_from_txt(upload)
             else:
-                raise ValueError(f"Unsupported file type: {filename}")
+                return await self._extract_from_docx(upload)
         except Exception as e:
             logger.error(f"Failed to extract text from {filename}: {str(e)}")
             raise
     
-    async def _extract_from_pdf(self, file: UploadFile) -> str:
+    @timed_stage("file.pdf")
+    async def _extract_from_pdf(
+        self,
+        upload: SpooledUpload,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> str:
         """Extract text from PDF file"""
-        content = await file.read()
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        # Bytes for small uploads, a file path for large ones (worker processes need one)
+        source = upload.source
+        page_count = await asyncio.to_thread(pdf_extraction.count_pages, source)
         
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + " "
+        pages = await self._run_page_batches(
+            pdf_extraction.extract_text_pages, source, page_count,
+            progress_callback=progress_callback
+        )
+        text = " ".join(pages)
         if len(text.strip()) < 50:
-            logger.info(f"PDF appears to be image-based, using OCR: {file.filename}")
-            text = await self.__extract_from_pdf_with_ocr(content)
+            logger.info(f"PDF appears to be image-based, using OCR: {upload.filename}")
+            text = await self.__extract_from_pdf_with_ocr(source, page_count, progress_callback)
         
-        logger.info(f"Text extracted from PDF: {file.filename}")
+        logger.info(f"Text extracted from PDF: {upload.filename} ({page_count} pages)")
         return text.strip()
     
-    async def __extract_from_pdf_with_ocr(self, content: bytes) -> str:
+    @timed_stage("file.pdf_ocr")
+    async def __extract_from_pdf_with_ocr(
+        self,
+        source,
+        page_count: int,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> str:
         """Extract text from image-base PDF using OCR"""
-
+        
         try:
-            # Specify poppler path for Windows
-            poppler_path = r"C:\poppler\poppler-24.08.0\Library\bin"
-            images = convert_from_bytes(content, poppler_path=poppler_path)
-
-            text = ""
-            for i, image in enumerate(images):
-                # Use Tesseract OCR to read text
-                page_text = pytesseract.image_to_string(image, lang='vie+eng')
-                text += page_text + " "
-                logger.info(f"OCR processed page {i+1}")
-            return text.strip()
+            pages = await self._run_page_batches(
+                pdf_extraction.ocr_pages,
+                source,
+                page_count,
+                settings.POPPLER_PATH,
+                settings.OCR_LANGUAGES,
+                settings.OCR_DPI,
+                progress_callback=progress_callback
+            )
+            logger.info(f"OCR processed {len(pages)} pages")
+            return " ".join(pages).strip()
         except Exception as e:
             logger.error(f"OCR extraction failed: {str(e)}")
             raise
     
-    async def _extract_from_txt(self, file: UploadFile) -> str:
+    async def _run_page_batches(
+        self,
+        worker: Callable[..., List[str]],
+        source,
+        page_count: int,
+        *args,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[str]:
+        """
+        Run a page-range worker over the whole document in parallel batches
+        
+        Pages are split into batches of PDF_PAGES_PER_BATCH and at most
+        PDF_WORKERS batches run at once in the process pool, which bounds
+        the number of rasterized pages held in memory. Results are returned
+        in page order. Single-batch documents skip the process pool.
+        
+        Args:
+            worker: Function taking (source, start, end, *args)
+            source: PDF bytes or path
+            page_count: Number of pages in the document
+            *args: Extra arguments for worker
+            progress_callback: Optional callable("extracting", pages_done, page_count)
+        
+        Returns:
+            Per-page text in document order
+        """
+        batch_size = max(1, settings.PDF_PAGES_PER_BATCH)
+        ranges = [
+            (start, min(start + batch_size, page_count))
+            for start in range(0, page_count, batch_size)
+        ]
+        if not ranges:
+            return []
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            pages = await asyncio.to_thread(worker, source, start, end, *args)
+            if progress_callback:
+                progress_callback("extracting", page_count, page_count)
+            return pages
+        
+        loop = asyncio.get_running_loop()
+        pool = get_pdf_pool()
+        semaphore = asyncio.Semaphore(settings.PDF_WORKERS)
+        pages_done = 0
+        
+        async def run_batch(start: int, end: int) -> List[str]:
+            nonlocal pages_done
+            async with semaphore:
+                pages = await loop.run_in_executor(pool, worker, source, start, end, *args)
+            pages_done += end - start
+            if progress_callback:
+                progress_callback("extracting", pages_done, page_count)
+            return pages
+        
+        batches = await asyncio.gather(*(run_batch(start, end) for start, end in ranges))
+        return [page for batch in batches for page in batch]
+    
+    @timed_stage("file.txt")
+    async def _extract_from_txt(self, upload: SpooledUpload) -> str:
         """Extract text from TXT file"""
-        content = await file.read()
-        text = content.decode('utf-8')
+        text = await asyncio.to_thread(self._read_txt, upload)
         
-        logger.info(f"Text extracted from TXT: {file.filename}")
+        logger.info(f"Text extracted from TXT: {upload.filename}")
         return text.strip()
     
-    async def _extract_from_docx(self, file: UploadFile) -> str:
+    @staticmethod
+    def _read_txt(upload: SpooledUpload) -> str:
+        with upload.open() as f:
+            return f.read().decode('utf-8')
+    
+    @timed_stage("file.docx")
+    async def _extract_from_docx(self, upload: SpooledUpload) -> str:
         """Extract text from DOCX file"""
-        content = await file.read()
-        docx_file = io.BytesIO(content)
-        doc = docx.Document(docx_file)
+        text = await asyncio.to_thread(self._read_docx, upload)
         
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + " "
-        
-        logger.info(f"Text extracted from DOCX: {file.filename}")
+        logger.info(f"Text extracted from DOCX: {upload.filename}")
         return text.strip()
+    
+    @staticmethod
+    def _read_docx(upload: SpooledUpload) -> str:
+        with upload.open() as f:
+            doc = docx.Document(f)
+            return " ".join(paragraph.text for paragraph in doc.paragraphs)
@@ -0,0 +1,112 @@
+"""
+Shared pooled async HTTP client for outbound requests
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class HTTPClientManager:
+    """
+    Owns a single httpx.AsyncClient for the lifetime of the application
+
+    The client keeps connections alive between requests. On top of the
+    pool-wide limits, a per-host semaphore caps concurrent requests to any
+    one site. A host's semaphore is dropped once no request uses it, so
+    memory follows the number of hosts in flight, not every host ever seen.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        # host -> [semaphore, requests holding or waiting for it]
+        self._host_limits: Dict[str, List] = {}
+        self._in_flight = 0
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.SCRAPER_TIMEOUT_SECONDS,
+                connect=settings.SCRAPER_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            follow_redirects=True
+        )
+
+    async def start(self):
+        """Create the client (called on application startup)"""
+        if self._client is None:
+            self._client = self._build_client()
+            logger.info("HTTP client started")
+
+    async def close(self):
+        """Close pooled connections (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_limits.clear()
+            logger.info("HTTP client closed")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client, created lazily if startup has not run"""
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    @asynccontextmanager
+    async def _host_limit(self, url: str) -> AsyncIterator[None]:
+        host = urlsplit(url).netloc.lower()
+        entry = self._host_limits.get(host)
+        if entry is None:
+            entry = [asyncio.Semaphore(settings.SCRAPER_MAX_CONNECTIONS_PER_HOST), 0]
+            self._host_limits[host] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._host_limits.get(host) is entry:
+                del self._host_limits[host]
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        GET a URL through the shared pool
+
+        Args:
+            url: URL to fetch
+            headers: Optional request headers
+
+        Returns:
+            httpx.Response with the body read
+        """
+        self._in_flight += 1
+        try:
+            async with self._host_limit(url):
+                return await self.client.get(url, headers=headers)
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Requests in flight (including those waiting for a host slot) against the pool size"""
+        return {
+            "in_flight": self._in_flight,
+            "max_connections": settings.SCRAPER_MAX_CONNECTIONS,
+            "hosts": len(self._host_limits),
+        }
+
+
+# Global instance
+http_client = HTTPClientManager()
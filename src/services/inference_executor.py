@@ -0,0 +1,245 @@
+"""
+Bounded executor for running blocking Gemini calls off the event loop
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+from utils.metrics import STAGE_DURATION, track_stage
+
+logger = setup_logger(__name__)
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference executor cannot accept more work"""
+
+
+class InferenceExecutor:
+    """
+    Thread pool with a bounded backlog for model inference calls
+
+    The Gemini client is synchronous, so every call is handed to a worker
+    thread. Once the number of running plus queued calls reaches
+    ``max_workers + max_queue_size`` new submissions are rejected with
+    InferenceQueueFullError instead of piling up behind slow requests.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running plus queued calls"""
+        return self.max_workers + self.max_queue_size
+
+    def has_capacity(self) -> bool:
+        """Check whether a new call would currently be accepted"""
+        with self._lock:
+            return self._pending < self.capacity
+
+    def ensure_capacity(self):
+        """
+        Raise early if the executor is saturated
+
+        Useful before doing work (e.g. persisting a chat message) that
+        should not happen when the inference call is going to be rejected.
+
+        Raises:
+            InferenceQueueFullError: If no slot is available
+        """
+        if not self.has_capacity():
+            with self._lock:
+                self._rejected += 1
+            raise InferenceQueueFullError("Inference queue is full")
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the inference pool
+
+        Args:
+            func: Blocking callable (e.g. gemini_model.summarize)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            InferenceQueueFullError: If the backlog limit has been reached
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(
+                self._call, func, args, kwargs, self._stage(func), time.perf_counter()
+            )
+        except Exception:
+            self._release(None)
+            raise
+        # Release the slot when the worker finishes (or the call is cancelled
+        # before it started), not when the awaiting request goes away
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, func: Callable[..., Any], *args, **kwargs) -> AsyncIterator[str]:
+        """
+        Run a blocking callable that yields text chunks, forwarding them as they arrive
+
+        The worker thread holds one executor slot for the whole generation.
+        If func returns a plain string instead of an iterable, it is emitted
+        as a single chunk. When the consumer stops early (e.g. the client
+        disconnected) the producer is told to stop and the underlying
+        generator is closed.
+
+        Args:
+            func: Blocking callable returning an iterable of str, or a str
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Yields:
+            Text chunks
+
+        Raises:
+            InferenceQueueFullError: If the backlog limit has been reached
+        """
+        self._acquire()
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def publish(item, error=None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # Event loop already closed
+                stop.set()
+
+        def produce():
+            result = func(*args, **kwargs)
+            if isinstance(result, str):
+                result = [result]
+            iterator = iter(result)
+            try:
+                for chunk in iterator:
+                    if stop.is_set():
+                        break
+                    if chunk:
+                        publish(chunk)
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        stage = self._stage(func)
+        submitted = time.perf_counter()
+
+        def run_producer():
+            try:
+                self._call(produce, (), {}, stage, submitted)
+            except Exception as e:
+                publish(None, e)
+                return
+            publish(done)
+
+        try:
+            future = self._executor.submit(run_producer)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            while True:
+                item, error = await queue.get()
+                if error is not None:
+                    raise error
+                if item is done:
+                    break
+                yield item
+        finally:
+            stop.set()
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                logger.warning(
+                    f"Inference queue full ({self._pending}/{self.capacity}), rejecting call"
+                )
+                raise InferenceQueueFullError("Inference queue is full")
+            self._pending += 1
+
+    @staticmethod
+    def _stage(func: Callable[..., Any]) -> str:
+        """Metrics stage of a call, e.g. inference.summarize for gemini_model.summarize"""
+        return f"inference.{getattr(func, '__name__', 'call')}"
+
+    def _call(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        stage: str = "inference.call",
+        submitted: Optional[float] = None
+    ) -> Any:
+        if submitted is not None:
+            STAGE_DURATION.labels("inference.queue_wait").observe(time.perf_counter() - submitted)
+        with self._lock:
+            self._active += 1
+        try:
+            with track_stage(stage):
+                result = func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of queue depth and counters"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Inference executor shut down")
+
+
+# Global instance
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_MAX_WORKERS,
+    max_queue_size=settings.INFERENCE_MAX_QUEUE_SIZE
+)
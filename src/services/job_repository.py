@@ -0,0 +1,142 @@
+"""
+Repository layer for summarization job database operations
+"""
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from datetime import datetime
+import uuid
+
+from models.job import SummarizationJob
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobRepository:
+    """Repository for summarization job database operations"""
+    
+    @staticmethod
+    def create_job(
+        db: Session,
+        source_type: str,
+        length: str,
+        input_text: Optional[str] = None,
+        input_url: Optional[str] = None,
+        file_path: Optional[str] = None,
+        filename: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> SummarizationJob:
+        """
+        Create a queued job
+        
+        Args:
+            db: Database session
+            source_type: "text", "url" or "file"
+            length: Summary length preset
+            input_text: Text to summarize (text jobs)
+            input_url: URL to summarize (url jobs)
+            file_path: Stored upload path (file jobs)
+            filename: Original upload filename (file jobs)
+            job_id: Optional pre-generated job ID
+            
+        Returns:
+            Created SummarizationJob object
+        """
+        job = SummarizationJob(
+            job_id=job_id or str(uuid.uuid4()),
+            status="queued",
+            source_type=source_type,
+            length=length,
+            input_text=input_text,
+            input_url=input_url,
+            file_path=file_path,
+            filename=filename
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        logger.info(f"Created {source_type} job {job.job_id}")
+        return job
+    
+    @staticmethod
+    def get_job(db: Session, job_id: str) -> Optional[SummarizationJob]:
+        """Get job by job_id"""
+        return db.query(SummarizationJob).filter(SummarizationJob.job_id == job_id).first()
+    
+    @staticmethod
+    def get_queued_job_ids(db: Session) -> List[str]:
+        """IDs of queued jobs, oldest first"""
+        rows = db.query(SummarizationJob.job_id)\
+            .filter(SummarizationJob.status == "queued")\
+            .order_by(SummarizationJob.created_at.asc(), SummarizationJob.id.asc())\
+            .all()
+        return [row.job_id for row in rows]
+    
+    @staticmethod
+    def requeue_interrupted(db: Session) -> int:
+        """
+        Put jobs left running by a previous process back in the queue
+        
+        Returns:
+            Number of jobs requeued
+        """
+        count = db.query(SummarizationJob)\
+            .filter(SummarizationJob.status == "running")\
+            .update({"status": "queued", "stage": None}, synchronize_session=False)
+        db.commit()
+        return count
+    
+    @staticmethod
+    def mark_running(db: Session, job: SummarizationJob):
+        """Mark a job as picked up by a worker"""
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        db.commit()
+    
+    @staticmethod
+    def requeue_job(db: Session, job: SummarizationJob):
+        """Put a running job back in the queue (graceful shutdown)"""
+        job.status = "queued"
+        job.stage = None
+        db.commit()
+    
+    @staticmethod
+    def update_progress(db: Session, job: SummarizationJob, stage: str, done: int, total: int):
+        """Record progress for the current stage"""
+        job.stage = stage
+        if stage == "extracting":
+            job.pages_done, job.pages_total = done, total
+        elif stage == "summarizing":
+            job.chunks_done, job.chunks_total = done, total
+        db.commit()
+    
+    @staticmethod
+    def finish_job(
+        db: Session,
+        job: SummarizationJob,
+        status: str,
+        error: Optional[str] = None,
+        **result
+    ) -> SummarizationJob:
+        """
+        Move a job to a terminal status
+        
+        Args:
+            db: Database session
+            job: Job to update
+            status: "completed", "failed" or "cancelled"
+            error: Error message for failed jobs
+            **result: Result columns (summary, original_length, ...)
+        """
+        job.status = status
+        job.error = error
+        job.stage = None
+        job.finished_at = datetime.utcnow()
+        for key, value in result.items():
+            setattr(job, key, value)
+        db.commit()
+        db.refresh(job)
+        logger.info(f"Job {job.job_id} {status}")
+        return job
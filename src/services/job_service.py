@@ -0,0 +1,258 @@
+"""
+Background job queue for long-running summarizations
+"""
+import asyncio
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.job import SummarizationJob
+from services.job_repository import JobRepository, TERMINAL_STATUSES
+from services.summarization_service import SummarizationService
+from services.web_scraper_service import WebScraperService
+from services.file_processor_service import FileProcessorService, SUPPORTED_EXTENSIONS
+from services.upload_ingestion import upload_ingestor
+from utils.db import db_session
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# How long cancel() waits for a running job's worker to stop
+CANCEL_WAIT_SECONDS = 2.0
+
+
+class JobService:
+    """
+    Durable queue of summarization jobs processed by background workers
+
+    Jobs are stored in the database before they are queued, so a restart
+    picks up everything that was queued or running. Uploaded files are
+    kept under JOB_UPLOAD_DIR until the job finishes. Workers report
+    progress (pages extracted, chunks summarized) on the job row.
+    """
+
+    def __init__(
+        self,
+        summarization_service: SummarizationService,
+        web_scraper: WebScraperService,
+        file_processor: FileProcessorService,
+        workers: int,
+        upload_dir: str
+    ):
+        self.summarization_service = summarization_service
+        self.web_scraper = web_scraper
+        self.file_processor = file_processor
+        self.ingestor = upload_ingestor
+        self.workers = workers
+        self.upload_dir = upload_dir
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+
+    async def start(self):
+        """Requeue interrupted jobs and start the worker tasks"""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self._stopping = False
+        self._queue = asyncio.Queue()
+        with db_session() as db:
+            requeued = JobRepository.requeue_interrupted(db)
+            pending = JobRepository.get_queued_job_ids(db)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            f"Job workers started ({self.workers} workers, {len(pending)} queued, {requeued} requeued)"
+        )
+
+    async def stop(self):
+        """Stop the workers; running jobs are put back in the queue"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        logger.info("Job workers stopped")
+
+    async def submit_text(self, text: str, length: str) -> SummarizationJob:
+        """Queue a text summarization job"""
+        with db_session() as db:
+            job = JobRepository.create_job(db, "text", length, input_text=text)
+        self._enqueue(job.job_id)
+        return job
+
+    async def submit_url(self, url: str, length: str) -> SummarizationJob:
+        """Queue a URL summarization job"""
+        with db_session() as db:
+            job = JobRepository.create_job(db, "url", length, input_url=url)
+        self._enqueue(job.job_id)
+        return job
+
+    async def submit_file(self, file: UploadFile, length: str) -> SummarizationJob:
+        """
+        Store an upload and queue a file summarization job
+
+        Args:
+            file: Uploaded file
+            length: Summary length preset
+
+        Returns:
+            Created job
+
+        Raises:
+            ValueError: If the file type is not supported
+            UploadTooLargeError: If the upload exceeds MAX_UPLOAD_SIZE
+        """
+        filename = file.filename or "upload"
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file type: {filename}")
+
+        job_id = str(uuid.uuid4())
+        path = os.path.join(self.upload_dir, f"{job_id}{extension}")
+        with await self.ingestor.ingest(file) as upload:
+            await asyncio.to_thread(upload.save, path)
+
+        with db_session() as db:
+            job = JobRepository.create_job(
+                db, "file", length, file_path=path, filename=filename, job_id=job_id
+            )
+        self._enqueue(job.job_id)
+        return job
+
+    def get_job(self, db: Session, job_id: str) -> Optional[SummarizationJob]:
+        """Get job by job_id"""
+        return JobRepository.get_job(db, job_id)
+
+    async def cancel(self, db: Session, job_id: str) -> Optional[SummarizationJob]:
+        """
+        Cancel a queued or running job
+
+        A running job is interrupted and given CANCEL_WAIT_SECONDS to stop;
+        if its worker has not recorded the cancellation by then, the job is
+        returned still running and is marked cancelled once it stops.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        job = JobRepository.get_job(db, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return job
+
+        task = self._running.get(job_id)
+        if task is not None:
+            # The worker records the cancellation and removes the upload
+            task.cancel()
+            await asyncio.wait({task}, timeout=CANCEL_WAIT_SECONDS)
+            db.refresh(job)
+            return job
+
+        JobRepository.finish_job(db, job, "cancelled")
+        self._remove_upload(job)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of queue depth"""
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+        }
+
+    @staticmethod
+    def _remove_upload(job: SummarizationJob):
+        if job.file_path:
+            try:
+                os.remove(job.file_path)
+            except OSError:
+                pass
+
+    def _enqueue(self, job_id: str):
+        # Without running workers the job stays queued in the database
+        # and is picked up on the next start()
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            task = asyncio.create_task(self._process(job_id))
+            self._running[job_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                if self._stopping:
+                    raise
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {str(e)}")
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _process(self, job_id: str):
+        with db_session() as db:
+            job = JobRepository.get_job(db, job_id)
+            if job is None or job.status != "queued":
+                return
+            JobRepository.mark_running(db, job)
+            logger.info(f"Processing {job.source_type} job {job_id}")
+
+            def report(stage: str, done: int, total: int):
+                JobRepository.update_progress(db, job, stage, done, total)
+
+            try:
+                text = await self._extract(job, report)
+                if not text or not text.strip():
+                    raise ValueError("No text could be extracted")
+
+                summary, _ = await self.summarization_service.summarize_cached(
+                    text=text,
+                    length=job.length,
+                    db=db,
+                    progress_callback=report
+                )
+                JobRepository.finish_job(
+                    db, job, "completed",
+                    summary=summary,
+                    original_length=len(text.split()),
+                    summary_length=len(summary.split()),
+                    compression_ratio=round(len(summary) / len(text), 2)
+                )
+            except asyncio.CancelledError:
+                if self._stopping:
+                    JobRepository.requeue_job(db, job)
+                else:
+                    JobRepository.finish_job(db, job, "cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                JobRepository.finish_job(db, job, "failed", error=str(e) or type(e).__name__)
+            finally:
+                if job.status in TERMINAL_STATUSES:
+                    self._remove_upload(job)
+
+    async def _extract(self, job: SummarizationJob, report) -> Optional[str]:
+        if job.source_type == "text":
+            return job.input_text
+        if job.source_type == "url":
+            return await self.web_scraper.extract_text(job.input_url)
+        return await self.file_processor.extract_text_from_path(
+            job.file_path, job.filename, progress_callback=report
+        )
+
+
+# Global instance
+job_service = JobService(
+    summarization_service=SummarizationService(),
+    web_scraper=WebScraperService(),
+    file_processor=FileProcessorService(),
+    workers=settings.JOB_WORKERS,
+    upload_dir=settings.JOB_UPLOAD_DIR
+)
@@ -0,0 +1,220 @@
+"""
+On-disk cache of scraped pages for conditional GET revalidation
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class PageCache:
+    """
+    LRU page cache stored as one metadata file and one gzipped body per URL
+
+    Entries keep the extracted text together with the ETag/Last-Modified
+    validators, so a 304 response can be answered without re-parsing.
+    Only pages that carry a validator are stored. The least recently used
+    entries are evicted once either the entry or byte limit is exceeded.
+    """
+
+    def __init__(self, directory: str, max_entries: int, max_bytes: int):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "not_modified": 0,
+            "stores": 0,
+            "evictions": 0,
+            "bytes_saved": 0,
+        }
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Canonical form used as the cache key"""
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+        if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+            host = f"{host}:{parts.port}"
+        path = parts.path or "/"
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((scheme, host, path, query, ""))
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(self.normalize_url(url).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.html.gz"
+
+    def _ensure_loaded(self):
+        """Build the LRU index from files on disk (oldest access first)"""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            meta_path, body_path = self._paths(key)
+            try:
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+                entries.append((os.path.getmtime(meta_path), key, size))
+            except OSError:
+                continue
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up a cached page
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Dict with url, etag, last_modified, text and body_size, or None
+        """
+        key = self._key(url)
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._index:
+                self._counters["misses"] += 1
+                return None
+            meta_path, _ = self._paths(key)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable page cache entry for {url}: {e}")
+                self._remove(key)
+                self._counters["misses"] += 1
+                return None
+            self._counters["revalidations"] += 1
+            return entry
+
+    def get_body(self, url: str) -> Optional[str]:
+        """Raw HTML of a cached page"""
+        _, body_path = self._paths(self._key(url))
+        try:
+            with gzip.open(body_path, "rt", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def mark_not_modified(self, url: str, entry: Dict):
+        """Record a 304 for a cached page and refresh its LRU position"""
+        key = self._key(url)
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                meta_path, _ = self._paths(key)
+                try:
+                    os.utime(meta_path)
+                except OSError:
+                    pass
+            self._counters["hits"] += 1
+            self._counters["not_modified"] += 1
+            self._counters["bytes_saved"] += entry.get("body_size", 0)
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        text: str,
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ):
+        """
+        Store a page and its extracted text
+
+        Args:
+            url: Page URL
+            body: Raw HTML
+            text: Extracted text
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        if not etag and not last_modified:
+            return
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        entry = {
+            "url": self.normalize_url(url),
+            "etag": etag,
+            "last_modified": last_modified,
+            "text": text,
+            "body_size": len(body.encode("utf-8")),
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                with gzip.open(body_path, "wt", encoding="utf-8") as f:
+                    f.write(body)
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(entry, f)
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+            except OSError as e:
+                logger.warning(f"Could not write page cache entry for {url}: {e}")
+                return
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = size
+            self._total_bytes += size
+            self._counters["stores"] += 1
+            self._evict()
+
+    def _evict(self):
+        while self._index and (
+            len(self._index) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key = next(iter(self._index))
+            self._remove(key)
+            self._counters["evictions"] += 1
+
+    def _remove(self, key: str):
+        self._total_bytes -= self._index.pop(key, 0)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of cache size and hit/miss/revalidation counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._index)
+            stats["bytes"] = self._total_bytes
+        return stats
+
+
+# Global instance
+page_cache = PageCache(
+    directory=settings.PAGE_CACHE_DIR,
+    max_entries=settings.PAGE_CACHE_MAX_ENTRIES,
+    max_bytes=settings.PAGE_CACHE_MAX_BYTES
+)
@@ -0,0 +1,187 @@
+"""
+Bounded worker pool for bcrypt password hashing and verification
+"""
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import bcrypt
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PasswordQueueFullError(Exception):
+    """Raised when the password pool cannot accept more work"""
+
+
+class LoginThrottledError(Exception):
+    """Raised when a client or username has too many logins in flight"""
+
+
+def hash_password(password: str, rounds: int) -> str:
+    """Hash a password with bcrypt at the given cost"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against a bcrypt hash (False for a malformed hash)"""
+    try:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except Exception as e:
+        logger.error(f"Password verification error: {e}")
+        return False
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), None if unreadable"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop with bounded concurrency
+
+    bcrypt releases the GIL while hashing, so a thread pool keeps the
+    event loop free without the cost of worker processes. At most
+    ``max_workers + max_queue_size`` calls may be running or queued;
+    beyond that PasswordQueueFullError is raised. ``limit()`` additionally
+    caps logins in flight per client IP and per username, so one client
+    flooding the login endpoint is turned away before it occupies the
+    whole pool.
+    """
+
+    def __init__(
+        self,
+        rounds: int,
+        max_workers: int,
+        max_queue_size: int,
+        max_per_ip: int,
+        max_per_username: int
+    ):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.max_per_ip = max_per_ip
+        self.max_per_username = max_per_username
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._throttled = 0
+        # Only touched from the event loop
+        self._by_ip: Counter = Counter()
+        self._by_username: Counter = Counter()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running plus queued calls"""
+        return self.max_workers + self.max_queue_size
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password at the configured cost
+
+        Raises:
+            PasswordQueueFullError: If the pool backlog is full
+        """
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Check a password against its hash
+
+        Raises:
+            PasswordQueueFullError: If the pool backlog is full
+        """
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash was made at a different cost than configured"""
+        return hash_rounds(hashed_password) != self.rounds
+
+    @asynccontextmanager
+    async def limit(self, ip: Optional[str], username: Optional[str]) -> AsyncIterator[None]:
+        """
+        Hold a login slot for a client IP and username
+
+        Raises:
+            LoginThrottledError: If either already has its maximum in flight
+        """
+        username = username.lower() if username else None
+        if (ip and self._by_ip[ip] >= self.max_per_ip) or \
+                (username and self._by_username[username] >= self.max_per_username):
+            with self._lock:
+                self._throttled += 1
+            logger.warning(f"Login throttled (ip={ip}, username={username})")
+            raise LoginThrottledError("Too many login attempts in progress")
+
+        if ip:
+            self._by_ip[ip] += 1
+        if username:
+            self._by_username[username] += 1
+        try:
+            yield
+        finally:
+            if ip:
+                self._by_ip[ip] -= 1
+                if not self._by_ip[ip]:
+                    del self._by_ip[ip]
+            if username:
+                self._by_username[username] -= 1
+                if not self._by_username[username]:
+                    del self._by_username[username]
+
+    async def _run(self, func: Callable, *args):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                logger.warning(f"Password queue full ({self._pending}/{self.capacity}), rejecting call")
+                raise PasswordQueueFullError("Password hashing queue is full")
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool depth and counters"""
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "max_workers": self.max_workers,
+                "pending": self._pending,
+                "rejected": self._rejected,
+                "throttled": self._throttled,
+                "logins_in_flight": sum(self._by_ip.values()),
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Password hasher shut down")
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue_size=settings.PASSWORD_HASH_MAX_QUEUE_SIZE,
+    max_per_ip=settings.LOGIN_MAX_CONCURRENT_PER_IP,
+    max_per_username=settings.LOGIN_MAX_CONCURRENT_PER_USERNAME
+)
@@ -0,0 +1,75 @@
+"""
+Page-range PDF text extraction and OCR, run inside worker processes
+
+Functions here are module-level so they can be pickled by
+ProcessPoolExecutor. A source is either the PDF bytes or a path to the
+PDF on disk; each call only touches pages in [start, end).
+"""
+import io
+import os
+from typing import List, Optional, Union
+
+import PyPDF2
+import pytesseract
+from pdf2image import convert_from_bytes, convert_from_path
+
+PDFSource = Union[bytes, str]
+
+
+def init_worker(tesseract_cmd: Optional[str], tessdata_prefix: Optional[str]):
+    """
+    Configure Tesseract in a worker process
+
+    Paths are only applied when they exist, so the default Windows install
+    locations are harmless elsewhere and Tesseract is found on PATH.
+    """
+    if tesseract_cmd and os.path.exists(tesseract_cmd):
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    if tessdata_prefix and os.path.isdir(tessdata_prefix):
+        os.environ["TESSDATA_PREFIX"] = tessdata_prefix
+
+
+def _reader(source: PDFSource) -> PyPDF2.PdfReader:
+    if isinstance(source, (bytes, bytearray)):
+        return PyPDF2.PdfReader(io.BytesIO(source))
+    return PyPDF2.PdfReader(source)
+
+
+def count_pages(source: PDFSource) -> int:
+    """Number of pages in the PDF"""
+    return len(_reader(source).pages)
+
+
+def extract_text_pages(source: PDFSource, start: int, end: int) -> List[str]:
+    """Extract the embedded text layer of pages [start, end)"""
+    reader = _reader(source)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+
+def ocr_pages(
+    source: PDFSource,
+    start: int,
+    end: int,
+    poppler_path: Optional[str],
+    languages: str,
+    dpi: int
+) -> List[str]:
+    """Rasterize pages [start, end) and run Tesseract on each"""
+    options = {
+        "dpi": dpi,
+        "first_page": start + 1,
+        "last_page": end,
+    }
+    if poppler_path and os.path.isdir(poppler_path):
+        options["poppler_path"] = poppler_path
+
+    if isinstance(source, (bytes, bytearray)):
+        images = convert_from_bytes(source, **options)
+    else:
+        images = convert_from_path(source, **options)
+
+    texts = []
+    for image in images:
+        texts.append(pytesseract.image_to_string(image, lang=languages))
+        image.close()
+    return texts
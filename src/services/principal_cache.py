@@ -0,0 +1,164 @@
+"""
+In-process cache of verified access tokens and the users they authenticate
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from jose import jwt
+from sqlalchemy import event, inspect
+
+from config.settings import settings
+from models.schemas import TokenData
+from models.user import User
+from services.auth_service import AuthService
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PrincipalKey = Tuple[str, Optional[int]]
+
+
+class PrincipalCache:
+    """
+    Two small LRU caches in front of get_current_user
+
+    - Tokens: a verified JWT maps to its TokenData until the token's own
+      expiry, so the signature is checked once per token, not per request.
+      Tokens that fail verification are never cached.
+    - Principals: (subject, user_id) maps to a snapshot of the user row
+      for ttl_seconds, replacing the per-request user lookup.
+
+    Each hit returns a new detached User built from the snapshot, so
+    requests never share an ORM instance. Any ORM update or delete of a
+    User in this process (deactivation, password change) drops its
+    entries at once. Changes made elsewhere (another worker, bulk SQL)
+    are picked up when the TTL runs out, so keep it short.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, token_max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.token_max_entries = token_max_entries
+        self._principals: "OrderedDict[PrincipalKey, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._tokens: "OrderedDict[str, Tuple[TokenData, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "token_hits": 0,
+            "token_misses": 0,
+            "principal_hits": 0,
+            "principal_misses": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    def decode_token(self, token: str) -> TokenData:
+        """
+        Verify a token, reusing an earlier verification of the same token
+
+        Raises:
+            HTTPException: If the token is invalid or expired
+        """
+        if self.token_max_entries <= 0:
+            return AuthService.decode_access_token(token)
+
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is not None:
+                token_data, expires_at = entry
+                if expires_at > time.time():
+                    self._tokens.move_to_end(token)
+                    self._counters["token_hits"] += 1
+                    return token_data
+                del self._tokens[token]
+            self._counters["token_misses"] += 1
+
+        token_data = AuthService.decode_access_token(token)
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+        if expires_at is not None:
+            with self._lock:
+                self._tokens[token] = (token_data, float(expires_at))
+                while len(self._tokens) > self.token_max_entries:
+                    self._tokens.popitem(last=False)
+        return token_data
+
+    def get(self, username: str, user_id: Optional[int]) -> Optional[User]:
+        """
+        Cached user for a token subject
+
+        Returns:
+            A detached User, or None on a miss (the caller should query and set())
+        """
+        if self.ttl_seconds <= 0:
+            return None
+
+        key = (username, user_id)
+        with self._lock:
+            entry = self._principals.get(key)
+            if entry is not None:
+                values, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._principals.move_to_end(key)
+                    self._counters["principal_hits"] += 1
+                    return User(**values)
+                del self._principals[key]
+            self._counters["principal_misses"] += 1
+        return None
+
+    def set(self, username: str, user_id: Optional[int], user: User):
+        """Remember the user a token subject resolved to"""
+        if self.ttl_seconds <= 0:
+            return
+
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._principals[(username, user_id)] = (values, expires_at)
+            self._principals.move_to_end((username, user_id))
+            while len(self._principals) > self.max_entries:
+                self._principals.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate_user(self, user_id: Optional[int] = None, username: Optional[str] = None):
+        """Drop cached entries of a user, matched by id or username"""
+        with self._lock:
+            stale = [
+                key for key, (values, _) in self._principals.items()
+                if (user_id is not None and values.get("id") == user_id)
+                or (username is not None and values.get("username") == username)
+            ]
+            for key in stale:
+                del self._principals[key]
+            if stale:
+                self._counters["invalidations"] += len(stale)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._principals.clear()
+            self._tokens.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Sizes and counters; db_round_trips_saved is the number of principal hits"""
+        with self._lock:
+            return {
+                "principals": len(self._principals),
+                "tokens": len(self._tokens),
+                **self._counters,
+                "db_round_trips_saved": self._counters["principal_hits"],
+            }
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    token_max_entries=settings.TOKEN_CACHE_MAX_ENTRIES
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    principal_cache.invalidate_user(user_id=target.id, username=target.username)
@@ -0,0 +1,202 @@
+"""
+Readiness checks for load balancer probes: database, event loop, inference queue, scraper pool
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models import async_database
+from models.async_database import use_async_sessions
+from services.http_client import http_client, HTTPClientManager
+from services.inference_executor import inference_executor, InferenceExecutor
+from utils.db import db_session
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Loop lag samples kept; the check uses the worst of them
+LAG_WINDOW = 10
+
+
+def probe_database(db: Session):
+    """
+    Run a statement that only succeeds if requests can use the database
+
+    On SQLite, SELECT 1 is answered without opening the database file,
+    so the probe takes the write lock (BEGIN IMMEDIATE) and releases it;
+    a database locked by another connection fails or times out.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+        db.rollback()
+    else:
+        db.execute(text("SELECT 1"))
+
+
+class ReadinessProbe:
+    """
+    Decides whether this worker should receive traffic
+
+    A worker is ready when the database answers probe_database within
+    max_db_latency_ms, through the same kind of session requests get
+    (see use_async_sessions), the event loop wakes up within max_loop_lag_ms of
+    schedule, and neither the inference executor nor the scraper pool is
+    saturated. Event-loop lag is sampled by a background task; the rest
+    is checked on demand. Results are cached for cache_seconds and
+    concurrent probes share one check, so frequent probing costs at most
+    one database round trip per cache period.
+    """
+
+    def __init__(
+        self,
+        cache_seconds: float,
+        db_timeout_seconds: float,
+        max_db_latency_ms: float,
+        lag_interval_seconds: float,
+        max_loop_lag_ms: float,
+        max_inference_queue_ratio: float,
+        max_scraper_saturation: float,
+        executor: InferenceExecutor = inference_executor,
+        client: HTTPClientManager = http_client
+    ):
+        self.cache_seconds = cache_seconds
+        self.db_timeout_seconds = db_timeout_seconds
+        self.max_db_latency_ms = max_db_latency_ms
+        self.lag_interval_seconds = lag_interval_seconds
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_inference_queue_ratio = max_inference_queue_ratio
+        self.max_scraper_saturation = max_scraper_saturation
+        self.executor = executor
+        self.client = client
+        self._lag_samples: deque = deque(maxlen=LAG_WINDOW)
+        self._task: Optional[asyncio.Task] = None
+        self._cached: Optional[Tuple[float, bool, Dict[str, Any]]] = None
+        self._pending: Optional[asyncio.Future] = None
+
+    async def start(self):
+        """Start sampling event-loop lag"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_lag(), name="loop-lag")
+
+    async def stop(self):
+        """Stop sampling event-loop lag"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _sample_lag(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.lag_interval_seconds)
+            lag = time.perf_counter() - start - self.lag_interval_seconds
+            self._lag_samples.append(max(0.0, lag) * 1000)
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Current readiness, from cache if recent enough
+
+        Returns:
+            (ready, report with one entry per check)
+        """
+        now = time.monotonic()
+        if self._cached is not None and now - self._cached[0] < self.cache_seconds:
+            return self._cached[1], self._cached[2]
+
+        if self._pending is None:
+            self._pending = asyncio.ensure_future(self._run_checks())
+            self._pending.add_done_callback(self._clear_pending)
+        return await asyncio.shield(self._pending)
+
+    def _clear_pending(self, _future):
+        self._pending = None
+
+    async def _run_checks(self) -> Tuple[bool, Dict[str, Any]]:
+        checks = {
+            "database": await self._check_database(),
+            "event_loop": self._check_event_loop(),
+            "inference": self._check_inference(),
+            "scraper": self._check_scraper(),
+        }
+        ready = all(check["ok"] for check in checks.values())
+        if not ready:
+            failing = [name for name, check in checks.items() if not check["ok"]]
+            logger.warning(f"Not ready: {', '.join(failing)}")
+        self._cached = (time.monotonic(), ready, checks)
+        return ready, checks
+
+    async def _check_database(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            if use_async_sessions():
+                probe = self._probe_async()
+            else:
+                probe = asyncio.to_thread(self._probe_sync)
+            await asyncio.wait_for(probe, self.db_timeout_seconds)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"no answer within {self.db_timeout_seconds}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        latency_ms = (time.perf_counter() - start) * 1000
+        return {
+            "ok": latency_ms <= self.max_db_latency_ms,
+            "latency_ms": round(latency_ms, 2),
+            "max_latency_ms": self.max_db_latency_ms,
+        }
+
+    async def _probe_async(self):
+        if async_database.async_engine is None:
+            async_database.configure_async_database()
+        async with async_database.AsyncSessionLocal() as db:
+            await db.run_sync(probe_database)
+
+    def _probe_sync(self):
+        with db_session() as db:
+            probe_database(db)
+
+    def _check_event_loop(self) -> Dict[str, Any]:
+        lag_ms = max(self._lag_samples) if self._lag_samples else None
+        return {
+            "ok": lag_ms is None or lag_ms <= self.max_loop_lag_ms,
+            "lag_ms": round(lag_ms, 2) if lag_ms is not None else None,
+            "max_lag_ms": self.max_loop_lag_ms,
+        }
+
+    def _check_inference(self) -> Dict[str, Any]:
+        stats = self.executor.stats()
+        pending = stats["active"] + stats["queued"]
+        ratio = pending / self.executor.capacity
+        return {
+            "ok": ratio < self.max_inference_queue_ratio,
+            "active": stats["active"],
+            "queued": stats["queued"],
+            "capacity": self.executor.capacity,
+            "max_ratio": self.max_inference_queue_ratio,
+        }
+
+    def _check_scraper(self) -> Dict[str, Any]:
+        stats = self.client.stats()
+        saturation = stats["in_flight"] / max(1, stats["max_connections"])
+        return {
+            "ok": saturation < self.max_scraper_saturation,
+            "in_flight": stats["in_flight"],
+            "max_connections": stats["max_connections"],
+            "max_saturation": self.max_scraper_saturation,
+        }
+
+
+# Global instance
+readiness_probe = ReadinessProbe(
+    cache_seconds=settings.HEALTH_CACHE_SECONDS,
+    db_timeout_seconds=settings.HEALTH_DB_TIMEOUT_SECONDS,
+    max_db_latency_ms=settings.HEALTH_MAX_DB_LATENCY_MS,
+    lag_interval_seconds=settings.HEALTH_LOOP_LAG_INTERVAL_SECONDS,
+    max_loop_lag_ms=settings.HEALTH_MAX_LOOP_LAG_MS,
+    max_inference_queue_ratio=settings.HEALTH_MAX_INFERENCE_QUEUE_RATIO,
+    max_scraper_saturation=settings.HEALTH_MAX_SCRAPER_SATURATION
+)
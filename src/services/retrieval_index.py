@@ -0,0 +1,302 @@
+"""
+Local BM25 retrieval index over chat document chunks, persisted on disk
+"""
+import asyncio
+import gzip
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TERM = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+INDEX_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word terms used for indexing and queries"""
+    return [term for term in TERM.findall(text.lower()) if len(term) > 1]
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring
+
+    Each entry is a chunk, identified by its database id and carrying the
+    document id and position it came from. Postings map a term to
+    (entry, term frequency) pairs, so a query only touches the chunks that
+    contain one of its terms.
+    """
+
+    def __init__(
+        self,
+        document_ids: Sequence[int],
+        chunk_ids: List[int],
+        chunk_documents: List[int],
+        lengths: List[int],
+        postings: Dict[str, List[Tuple[int, int]]]
+    ):
+        self.document_ids = tuple(sorted(document_ids))
+        self.chunk_ids = chunk_ids
+        self.chunk_documents = chunk_documents
+        self.lengths = lengths
+        self.postings = postings
+        self.average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @classmethod
+    def build(cls, document_ids: Sequence[int], chunks: List[Tuple[int, int, str]]) -> "BM25Index":
+        """
+        Build an index
+
+        Args:
+            document_ids: Documents covered by the index
+            chunks: (chunk_id, document_id, content) in document order
+
+        Returns:
+            BM25Index
+        """
+        chunk_ids = []
+        chunk_documents = []
+        lengths = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for entry, (chunk_id, document_id, content) in enumerate(chunks):
+            terms = tokenize(content)
+            chunk_ids.append(chunk_id)
+            chunk_documents.append(document_id)
+            lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                postings.setdefault(term, []).append((entry, frequency))
+        return cls(document_ids, chunk_ids, chunk_documents, lengths, postings)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Top-k chunks for a query
+
+        Args:
+            query: Query text
+            k: Maximum number of results
+
+        Returns:
+            (chunk_id, score) pairs, best first; empty if no term matches
+        """
+        total = len(self.chunk_ids)
+        if not total:
+            return []
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            entries = self.postings.get(term)
+            if not entries:
+                continue
+            idf = math.log(1 + (total - len(entries) + 0.5) / (len(entries) + 0.5))
+            for entry, frequency in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[entry] / self.average_length)
+                scores[entry] = scores.get(entry, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(self.chunk_ids[entry], score) for entry, score in best]
+
+    def leading_chunks(self, document_id: int, k: int) -> List[int]:
+        """First k chunk ids of a document, in order"""
+        return [
+            chunk_id
+            for chunk_id, owner in zip(self.chunk_ids, self.chunk_documents)
+            if owner == document_id
+        ][:k]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": INDEX_VERSION,
+            "document_ids": list(self.document_ids),
+            "chunk_ids": self.chunk_ids,
+            "chunk_documents": self.chunk_documents,
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BM25Index":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError("Unsupported index version")
+        postings = {term: [tuple(pair) for pair in pairs] for term, pairs in data["postings"].items()}
+        return cls(
+            data["document_ids"], data["chunk_ids"], data["chunk_documents"], data["lengths"], postings
+        )
+
+
+class RetrievalIndexStore:
+    """
+    Per-session BM25 indexes kept in memory (LRU) and on disk
+
+    An index is rebuilt from the database when the set of documents in
+    the session differs from the one it was built for, so adding or
+    removing documents never serves stale results.
+    """
+
+    def __init__(self, directory: str, max_cached: int):
+        self.directory = directory
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[int, BM25Index]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_loads": 0, "builds": 0}
+
+    def _path(self, session_pk: int) -> str:
+        return os.path.join(self.directory, f"session_{session_pk}.json.gz")
+
+    def get(
+        self,
+        session_pk: int,
+        document_ids: Sequence[int],
+        load_chunks: Callable[[], List[Tuple[int, int, str]]]
+    ) -> BM25Index:
+        """
+        Index for a session's current documents
+
+        Args:
+            session_pk: Primary key of the ChatSession
+            document_ids: Ids of the session's documents
+            load_chunks: Returns (chunk_id, document_id, content) rows, used to (re)build
+
+        Returns:
+            BM25Index
+        """
+        wanted = tuple(sorted(document_ids))
+        index = self._cached(session_pk, wanted)
+        if index is not None:
+            return index
+
+        index = self._load_current(session_pk, wanted)
+        if index is None:
+            index = self._build(session_pk, wanted, load_chunks())
+        self._remember(session_pk, index)
+        return index
+
+    async def get_async(
+        self,
+        session_pk: int,
+        document_ids: Sequence[int],
+        load_chunks: Callable[[], Awaitable[List[Tuple[int, int, str]]]]
+    ) -> BM25Index:
+        """
+        Same as get, keeping disk reads and index builds off the event loop
+
+        Only load_chunks (the database read) runs on the caller's loop;
+        loading the index file and building the index run in a worker thread.
+        """
+        wanted = tuple(sorted(document_ids))
+        index = self._cached(session_pk, wanted)
+        if index is not None:
+            return index
+
+        index = await asyncio.to_thread(self._load_current, session_pk, wanted)
+        if index is None:
+            chunks = await load_chunks()
+            index = await asyncio.to_thread(self._build, session_pk, wanted, chunks)
+        self._remember(session_pk, index)
+        return index
+
+    def _cached(self, session_pk: int, wanted: Tuple[int, ...]) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._cache.get(session_pk)
+            if index is not None and index.document_ids == wanted:
+                self._cache.move_to_end(session_pk)
+                self._counters["memory_hits"] += 1
+                return index
+        return None
+
+    def _load_current(self, session_pk: int, wanted: Tuple[int, ...]) -> Optional[BM25Index]:
+        index = self._load(session_pk)
+        if index is None or index.document_ids != wanted:
+            return None
+        with self._lock:
+            self._counters["disk_loads"] += 1
+        return index
+
+    def _build(
+        self,
+        session_pk: int,
+        wanted: Tuple[int, ...],
+        chunks: List[Tuple[int, int, str]]
+    ) -> BM25Index:
+        index = BM25Index.build(wanted, chunks)
+        self._save(session_pk, index)
+        with self._lock:
+            self._counters["builds"] += 1
+        logger.info(f"Built retrieval index for session {session_pk} ({len(index)} chunks)")
+        return index
+
+    def _remember(self, session_pk: int, index: BM25Index):
+        with self._lock:
+            self._cache[session_pk] = index
+            self._cache.move_to_end(session_pk)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, session_pk: int):
+        """Drop a session's index from memory and disk"""
+        with self._lock:
+            self._cache.pop(session_pk, None)
+        try:
+            os.remove(self._path(session_pk))
+        except OSError:
+            pass
+
+    def _load(self, session_pk: int) -> Optional[BM25Index]:
+        path = self._path(session_pk)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return BM25Index.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable retrieval index {path}: {e}")
+            return None
+
+    def _save(self, session_pk: int, index: BM25Index):
+        path = self._path(session_pk)
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Fast compression: the index is rewritten whenever documents change
+            with gzip.open(temp_path, "wt", encoding="utf-8", compresslevel=1) as f:
+                json.dump(index.to_dict(), f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write retrieval index {path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of cache counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["cached"] = len(self._cache)
+        return stats
+
+
+def default_index_dir(database_url: str) -> str:
+    """Directory next to the SQLite database file (./data otherwise)"""
+    prefix = "sqlite:///"
+    if database_url.startswith(prefix) and database_url[len(prefix):] not in ("", ":memory:"):
+        base = os.path.dirname(database_url[len(prefix):]) or "."
+    else:
+        base = "./data"
+    return os.path.join(base, "retrieval_index")
+
+
+# Global instance
+retrieval_index_store = RetrievalIndexStore(
+    directory=settings.RETRIEVAL_INDEX_DIR or default_index_dir(settings.DATABASE_URL),
+    max_cached=settings.RETRIEVAL_INDEX_CACHE_SIZE
+)
@@ -1,10 +1,18 @@
 """
 Service for text summarization business logic using Google Gemini
 """
-from typing import Literal
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Literal, Optional, Tuple
+from sqlalchemy.orm import Session
 
 from models.summarizer import gemini_model
+from config.settings import settings
+from services.inference_executor import inference_executor
+from services.summary_cache import summary_cache
+from services.text_chunker import TextChunker
 from utils.logger import setup_logger
+from utils.metrics import observe_chars
 
 logger = setup_logger(__name__)
 
@@ -21,11 +29,14 @@ class SummarizationService:
     
     def __init__(self):
         self.model = gemini_model
+        self.executor = inference_executor
+        self.cache = summary_cache
     
     async def summarize(
         self,
         text: str,
-        length: Literal["short", "medium", "detailed"] = "medium"
+        length: Literal["short", "medium", "detailed"] = "medium",
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
     ) -> str:
         """
         Summarize text with specified length preset using Gemini
@@ -33,28 +44,212 @@ class SummarizationService:
         Args:
             text: Input text to summarize
             length: Summary length preset
+            progress_callback: Optional callable("summarizing", chunks_done, chunks_total)
             
         Returns:
             Generated summary
         """
         if not text or len(text.strip()) == 0:
             raise ValueError("Text cannot be empty")
+        observe_chars("summarize_text", text)
         
         # Get length configuration
         config = self.LENGTH_CONFIGS.get(length, self.LENGTH_CONFIGS["medium"])
         
+        if len(text) > settings.MAX_INPUT_LENGTH:
+            text = await self._reduce_to_fit(text, progress_callback)
+        
         logger.info(f"Summarizing text with Gemini (length preset: {length})")
         
         try:
-            summary = self.model.summarize(
-                text=text,
-                max_length=config["max_length"],
-                min_length=config["min_length"],
-                style=config["style"]
-            )
+            summary = await self._generate(text, config)
+            if progress_callback:
+                progress_callback("summarizing", 1, 1)
             
             logger.info(f"Summary generated successfully with Gemini")
             return summary
         except Exception as e:
             logger.error(f"Summarization failed: {str(e)}")
             raise
+    
+    async def _generate(self, text: str, config: Dict) -> str:
+        """Run a single Gemini summarization call on the inference executor"""
+        return await self.executor.run(
+            self.model.summarize,
+            text=text,
+            max_length=config["max_length"],
+            min_length=config["min_length"],
+            style=config["style"]
+        )
+    
+    async def _reduce_to_fit(
+        self,
+        text: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> str:
+        """
+        Condense text longer than MAX_INPUT_LENGTH with chunked map-reduce
+        
+        Chunks are summarized concurrently (map), the partial summaries are
+        joined and, while still too long, chunked and summarized again
+        (reduce). Each level shrinks the input by roughly the chunk/partial
+        size ratio, so the number of sequential levels grows with the log of
+        the document size. The caller applies the requested preset to the
+        result.
+        
+        Args:
+            text: Input text
+            progress_callback: Optional callable("summarizing", chunks_done, chunks_total);
+                the total grows as each reduce level is planned
+            
+        Returns:
+            Joined partial summaries no longer than MAX_INPUT_LENGTH
+        """
+        chunker = TextChunker(
+            max_chars=min(settings.SUMMARY_CHUNK_SIZE, settings.MAX_INPUT_LENGTH),
+            overlap_chars=settings.SUMMARY_CHUNK_OVERLAP
+        )
+        semaphore = asyncio.Semaphore(settings.SUMMARY_CHUNK_CONCURRENCY)
+        partial_config = self.LENGTH_CONFIGS["detailed"]
+        progress = {"done": 0, "total": 0}
+        
+        async def summarize_chunk(chunk: str) -> str:
+            async with semaphore:
+                partial = await self._generate(chunk, partial_config)
+            progress["done"] += 1
+            if progress_callback:
+                # +1 accounts for the final pass done by the caller
+                progress_callback("summarizing", progress["done"], progress["total"] + 1)
+            return partial
+        
+        current = text
+        for level in range(1, settings.SUMMARY_MAX_REDUCE_DEPTH + 1):
+            chunks = chunker.split(current)
+            progress["total"] += len(chunks)
+            logger.info(
+                f"Map-reduce level {level}: {len(current)} characters in {len(chunks)} chunks"
+            )
+            try:
+                partials = await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+            except Exception as e:
+                logger.error(f"Chunk summarization failed at level {level}: {str(e)}")
+                raise
+            current = "\n\n".join(partial.strip() for partial in partials if partial)
+            if len(current) <= settings.MAX_INPUT_LENGTH:
+                return current
+        
+        logger.warning(
+            f"Partial summaries still exceed {settings.MAX_INPUT_LENGTH} characters "
+            f"after {settings.SUMMARY_MAX_REDUCE_DEPTH} levels, truncating"
+        )
+        return current[:settings.MAX_INPUT_LENGTH]
+    
+    async def summarize_stream(
+        self,
+        text: str,
+        length: Literal["short", "medium", "detailed"] = "medium",
+        db: Optional[Session] = None
+    ) -> AsyncIterator[str]:
+        """
+        Summarize text, yielding the summary in pieces as Gemini produces them
+        
+        Uses gemini_model.summarize_stream when the model provides it and
+        falls back to a single chunk from gemini_model.summarize otherwise.
+        Long inputs are condensed with map-reduce first; only the final pass
+        is streamed. A completed summary is stored in the summary cache.
+        
+        Args:
+            text: Input text to summarize
+            length: Summary length preset
+            db: Optional database session for the persistent cache tier
+            
+        Yields:
+            Summary text chunks
+        """
+        if not text or len(text.strip()) == 0:
+            raise ValueError("Text cannot be empty")
+        observe_chars("summarize_text", text)
+        
+        if length not in self.LENGTH_CONFIGS:
+            length = "medium"
+        config = self.LENGTH_CONFIGS[length]
+        original_text = text
+        
+        if len(text) > settings.MAX_INPUT_LENGTH:
+            text = await self._reduce_to_fit(text)
+        
+        logger.info(f"Streaming summary with Gemini (length preset: {length})")
+        
+        parts = []
+        stream = self.executor.stream(
+            getattr(self.model, "summarize_stream", self.model.summarize),
+            text=text,
+            max_length=config["max_length"],
+            min_length=config["min_length"],
+            style=config["style"]
+        )
+        async with aclosing(stream):
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        
+        logger.info(f"Summary streamed successfully with Gemini")
+        self.store_summary(original_text, length, "".join(parts), db=db)
+    
+    def _cache_key(self, text: str, length: str) -> str:
+        return self.cache.make_key(text, length, settings.GEMINI_MODEL)
+    
+    def get_cached_summary(
+        self,
+        text: str,
+        length: str,
+        db: Optional[Session] = None
+    ) -> Optional[str]:
+        """Cached summary for this input and preset, or None"""
+        if not settings.SUMMARY_CACHE_ENABLED:
+            return None
+        if length not in self.LENGTH_CONFIGS:
+            length = "medium"
+        return self.cache.get(self._cache_key(text, length), db=db)
+    
+    def store_summary(
+        self,
+        text: str,
+        length: str,
+        summary: str,
+        db: Optional[Session] = None
+    ):
+        """Put a generated summary in the cache"""
+        if not settings.SUMMARY_CACHE_ENABLED or not summary:
+            return
+        if length not in self.LENGTH_CONFIGS:
+            length = "medium"
+        self.cache.set(self._cache_key(text, length), summary, length, settings.GEMINI_MODEL, db=db)
+    
+    async def summarize_cached(
+        self,
+        text: str,
+        length: Literal["short", "medium", "detailed"] = "medium",
+        db: Optional[Session] = None,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> Tuple[str, bool]:
+        """
+        Summarize text, reusing a cached summary of identical input if available
+        
+        Args:
+            text: Input text to summarize
+            length: Summary length preset
+            db: Optional database session for the persistent cache tier
+            progress_callback: Optional callable("summarizing", chunks_done, chunks_total)
+            
+        Returns:
+            Tuple of (summary, served_from_cache)
+        """
+        cached = self.get_cached_summary(text, length, db=db)
+        if cached is not None:
+            logger.info(f"Summary cache hit (length preset: {length})")
+            return cached, True
+        
+        summary = await self.summarize(text=text, length=length, progress_callback=progress_callback)
+        self.store_summary(text, length, summary, db=db)
+        return summary, False
@@ -0,0 +1,268 @@
+"""
+Content-addressed cache for generated summaries
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.summary_cache import SummaryCacheEntry
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Persistent hits refresh last_accessed_at at most this often per entry
+ACCESS_REFRESH_SECONDS = 300
+# Persistent writes between two size checks of the summary_cache table
+EVICT_EVERY_WRITES = 100
+
+
+class SummaryCache:
+    """
+    Two-tier summary cache
+
+    The first tier is an in-process LRU with a TTL. The optional second tier
+    stores entries in the application database so they survive restarts and
+    are shared between workers. Database errors in that tier are logged and
+    treated as misses. To keep hits read-only, last_accessed_at is refreshed
+    at most every ACCESS_REFRESH_SECONDS, and the size limit is enforced
+    every EVICT_EVERY_WRITES writes, so the table may briefly exceed it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        persistent: bool = False,
+        persistent_max_entries: int = 10000
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.persistent_max_entries = persistent_max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_evict = EVICT_EVERY_WRITES - 1
+        self._counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace so formatting-only differences share a key"""
+        return " ".join(text.split())
+
+    @classmethod
+    def make_key(cls, text: str, length: str, model_name: str) -> str:
+        """
+        Build a cache key from the input and everything that affects output
+
+        Args:
+            text: Text to be summarized
+            length: Length preset name
+            model_name: Model identifier
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (model_name, length, cls.normalize_text(text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str, db: Optional[Session] = None) -> Optional[str]:
+        """
+        Look up a cached summary
+
+        Args:
+            key: Cache key from make_key
+            db: Optional database session for the persistent tier
+
+        Returns:
+            Cached summary or None on miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                summary, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return summary
+                del self._entries[key]
+                self._counters["expirations"] += 1
+
+        if self.persistent and db is not None:
+            summary = self._get_persistent(db, key)
+            if summary is not None:
+                self._set_memory(key, summary)
+                with self._lock:
+                    self._counters["persistent_hits"] += 1
+                return summary
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def set(
+        self,
+        key: str,
+        summary: str,
+        length: str,
+        model_name: str,
+        db: Optional[Session] = None
+    ):
+        """
+        Store a summary in the cache
+
+        Args:
+            key: Cache key from make_key
+            summary: Generated summary
+            length: Length preset name
+            model_name: Model identifier
+            db: Optional database session for the persistent tier
+        """
+        self._set_memory(key, summary)
+        if self.persistent and db is not None:
+            try:
+                self._set_persistent(db, key, summary, length, model_name)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not persist cached summary: {str(e)}")
+
+    def _set_memory(self, key: str, summary: str):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (summary, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _get_persistent(self, db: Session, key: str) -> Optional[str]:
+        try:
+            return self._read_persistent(db, key)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not read cached summary: {str(e)}")
+            return None
+
+    def _read_persistent(self, db: Session, key: str) -> Optional[str]:
+        entry = db.query(SummaryCacheEntry)\
+            .filter(SummaryCacheEntry.cache_key == key)\
+            .first()
+        if entry is None:
+            return None
+
+        now = datetime.utcnow()
+        if entry.expires_at <= now:
+            db.delete(entry)
+            db.commit()
+            with self._lock:
+                self._counters["expirations"] += 1
+            return None
+
+        last_accessed_at = entry.last_accessed_at
+        if last_accessed_at is None or (now - last_accessed_at).total_seconds() > ACCESS_REFRESH_SECONDS:
+            entry.last_accessed_at = now
+            db.commit()
+        return entry.summary
+
+    def _set_persistent(
+        self,
+        db: Session,
+        key: str,
+        summary: str,
+        length: str,
+        model_name: str
+    ):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        entry = db.query(SummaryCacheEntry)\
+            .filter(SummaryCacheEntry.cache_key == key)\
+            .first()
+        if entry is None:
+            entry = SummaryCacheEntry(
+                cache_key=key,
+                length=length,
+                model_name=model_name,
+                summary=summary,
+                expires_at=expires_at,
+                last_accessed_at=now
+            )
+            db.add(entry)
+        else:
+            entry.summary = summary
+            entry.expires_at = expires_at
+            entry.last_accessed_at = now
+        db.commit()
+
+        with self._lock:
+            self._writes_since_evict += 1
+            due = self._writes_since_evict >= EVICT_EVERY_WRITES
+            if due:
+                self._writes_since_evict = 0
+        if due:
+            self._evict_persistent(db)
+
+    def _evict_persistent(self, db: Session):
+        """Drop expired rows and the least recently used rows over the size limit"""
+        now = datetime.utcnow()
+        expired = db.query(SummaryCacheEntry)\
+            .filter(SummaryCacheEntry.expires_at <= now)\
+            .delete(synchronize_session=False)
+
+        overflow = db.query(SummaryCacheEntry).count() - self.persistent_max_entries
+        evicted = 0
+        if overflow > 0:
+            stale_ids = [
+                row.id for row in db.query(SummaryCacheEntry.id)
+                .order_by(SummaryCacheEntry.last_accessed_at.asc())
+                .limit(overflow)
+            ]
+            evicted = db.query(SummaryCacheEntry)\
+                .filter(SummaryCacheEntry.id.in_(stale_ids))\
+                .delete(synchronize_session=False)
+        db.commit()
+
+        if expired or evicted:
+            with self._lock:
+                self._counters["expirations"] += expired
+                self._counters["evictions"] += evicted
+
+    def clear(self):
+        """Drop all in-process entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of cache size and hit/miss counters"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+        lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+        stats["hit_ratio"] = round(
+            (stats["memory_hits"] + stats["persistent_hits"]) / lookups, 4
+        ) if lookups else 0.0
+        return stats
+
+
+# Global instance
+summary_cache = SummaryCache(
+    max_entries=settings.SUMMARY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SUMMARY_CACHE_TTL_SECONDS,
+    persistent=settings.SUMMARY_CACHE_PERSISTENT,
+    persistent_max_entries=settings.SUMMARY_CACHE_PERSISTENT_MAX_ENTRIES
+)
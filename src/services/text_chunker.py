@@ -0,0 +1,105 @@
+"""
+Split long text into overlapping chunks on paragraph and sentence boundaries
+"""
+import re
+from typing import List
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TextChunker:
+    """Pack paragraphs and sentences into chunks no longer than max_chars"""
+
+    def __init__(self, max_chars: int, overlap_chars: int = 0):
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+        if overlap_chars < 0 or overlap_chars >= max_chars:
+            raise ValueError("overlap_chars must be between 0 and max_chars")
+        self.max_chars = max_chars
+        self.overlap_chars = overlap_chars
+
+    def split(self, text: str) -> List[str]:
+        """
+        Split text into chunks
+
+        Paragraph boundaries are preferred, then sentence boundaries; a
+        sentence longer than max_chars is cut on whitespace. Consecutive
+        chunks share up to overlap_chars of trailing sentences so context
+        is not lost at the seams.
+
+        Args:
+            text: Input text
+
+        Returns:
+            List of chunks in document order
+        """
+        text = text.strip()
+        if not text:
+            return []
+        if len(text) <= self.max_chars:
+            return [text]
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_len = 0
+
+        for unit in self._units(text):
+            unit_len = len(unit) + 1
+            if current and current_len + unit_len > self.max_chars:
+                chunks.append(" ".join(current))
+                current = self._overlap_tail(current, self.max_chars - unit_len)
+                current_len = sum(len(part) + 1 for part in current)
+            current.append(unit)
+            current_len += unit_len
+
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    def _units(self, text: str) -> List[str]:
+        """Paragraphs that fit in a chunk, otherwise their sentences"""
+        units: List[str] = []
+        for paragraph in PARAGRAPH_BREAK.split(text):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            if len(paragraph) <= self.max_chars:
+                units.append(paragraph)
+                continue
+            for sentence in SENTENCE_END.split(paragraph):
+                units.extend(self._hard_split(sentence))
+        return units
+
+    def _hard_split(self, sentence: str) -> List[str]:
+        """Cut an oversized sentence on whitespace (or mid-word as a last resort)"""
+        if len(sentence) <= self.max_chars:
+            return [sentence]
+        pieces: List[str] = []
+        words: List[str] = []
+        length = 0
+        for word in sentence.split(" "):
+            if words and (len(word) > self.max_chars or length + len(word) + 1 > self.max_chars):
+                pieces.append(" ".join(words))
+                words, length = [], 0
+            while len(word) > self.max_chars:
+                pieces.append(word[:self.max_chars])
+                word = word[self.max_chars:]
+            words.append(word)
+            length += len(word) + 1
+        if words:
+            pieces.append(" ".join(words))
+        return pieces
+
+    def _overlap_tail(self, units: List[str], room: int) -> List[str]:
+        """Trailing sentences of the previous chunk to repeat at the start of the next"""
+        budget = min(self.overlap_chars, room)
+        tail: List[str] = []
+        length = 0
+        for unit in reversed(units):
+            for sentence in reversed(SENTENCE_END.split(unit)):
+                if length + len(sentence) + 1 > budget:
+                    return tail
+                tail.insert(0, sentence)
+                length += len(sentence) + 1
+        return tail
@@ -0,0 +1,226 @@
+"""
+Streaming ingestion of uploaded files, keeping only small ones in memory
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from typing import BinaryIO, Dict, List, Optional, Union
+
+from fastapi import UploadFile
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE"""
+
+
+class _StreamView:
+    """File-like view of a shared stream that leaves it open on close"""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+class SpooledUpload:
+    """
+    Upload content held in memory (small files), in a file on disk, or in
+    the request's own spool file
+
+    Parsers get a file-like view through open(), so large uploads are read
+    where Starlette already spooled them rather than copied. Worker
+    processes need source, which is the bytes or a path; for an upload
+    still in the request's spool file the path is a temp copy, made on
+    first use.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        size: int,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        sha256: Optional[str] = None,
+        stream: Optional[BinaryIO] = None,
+        temp_dir: Optional[str] = None
+    ):
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256  # hex digest of the content, computed while streaming
+        self._data = data
+        self._path = path
+        self._stream = stream
+        self._temp_dir = temp_dir
+        self._owns_path = False
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the content is read from a file rather than held in memory"""
+        return self._path is not None or self._stream is not None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """Bytes for in-memory uploads, a file path otherwise"""
+        if self._path is None and self._stream is not None:
+            with tempfile.NamedTemporaryFile(
+                prefix="upload_", suffix=os.path.splitext(self.filename)[1],
+                dir=self._temp_dir, delete=False
+            ) as f:
+                self._stream.seek(0)
+                shutil.copyfileobj(self._stream, f)
+            self._path = f.name
+            self._owns_path = True
+        return self._path if self._path is not None else self._data
+
+    def open(self) -> BinaryIO:
+        """Readable binary file-like view of the content"""
+        if self._stream is not None:
+            self._stream.seek(0)
+            return _StreamView(self._stream)
+        if self._path is not None:
+            return open(self._path, "rb")
+        return io.BytesIO(self._data)
+
+    def save(self, path: str):
+        """Write the content to path, moving a temp file instead of copying it"""
+        if self._owns_path or (self._path is not None and self._stream is None):
+            shutil.move(self._path, path)
+            self._path = None
+            self._owns_path = False
+            return
+        with open(path, "wb") as f:
+            if self._stream is not None:
+                self._stream.seek(0)
+                shutil.copyfileobj(self._stream, f)
+            else:
+                f.write(self._data)
+
+    def cleanup(self):
+        """Remove the temp file, if any (the request's spool file is closed by the request)"""
+        if self._path is not None and (self._owns_path or self._stream is None):
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+        self._path = None
+        self._owns_path = False
+        self._stream = None
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+
+class UploadIngestor:
+    """Reads uploads in chunks, enforcing a size limit and hashing the content"""
+
+    def __init__(self, max_bytes: int, spool_threshold: int, chunk_size: int, temp_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.spool_threshold = spool_threshold
+        self.chunk_size = chunk_size
+        self.temp_dir = temp_dir
+        self._lock = threading.Lock()
+        self._counters = {
+            "uploads": 0,
+            "bytes_processed": 0,
+            "spooled_to_disk": 0,
+            "rejected_too_large": 0,
+        }
+
+    def _reject(self, filename: str, size: int):
+        with self._lock:
+            self._counters["rejected_too_large"] += 1
+        logger.warning(f"Rejected upload {filename}: {size} bytes exceeds limit of {self.max_bytes}")
+        raise UploadTooLargeError(
+            f"File exceeds maximum upload size of {self.max_bytes // (1024 * 1024)} MB"
+        )
+
+    async def ingest(self, file: UploadFile) -> SpooledUpload:
+        """
+        Read an upload once to check its size and hash it
+
+        Uploads up to spool_threshold are kept as bytes. Larger ones stay
+        in the request's spool file (file.file), rewound for the parsers.
+
+        Args:
+            file: Uploaded file
+
+        Returns:
+            SpooledUpload (caller must call cleanup() or use it as a context manager)
+
+        Raises:
+            UploadTooLargeError: If the upload exceeds max_bytes
+        """
+        filename = file.filename or "upload"
+        declared_size = getattr(file, "size", None)
+        if declared_size is not None and declared_size > self.max_bytes:
+            self._reject(filename, declared_size)
+
+        chunks: Optional[List[bytes]] = []
+        size = 0
+        digest = hashlib.sha256()
+        while True:
+            chunk = await file.read(self.chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            if size > self.max_bytes:
+                self._reject(filename, size)
+            if chunks is not None:
+                chunks.append(chunk)
+                if size > self.spool_threshold:
+                    chunks = None
+
+        with self._lock:
+            self._counters["uploads"] += 1
+            self._counters["bytes_processed"] += size
+            if chunks is None:
+                self._counters["spooled_to_disk"] += 1
+
+        if chunks is None:
+            await file.seek(0)
+            logger.info(f"Received upload {filename} ({size} bytes, read from its spool file)")
+            return SpooledUpload(
+                filename, size, sha256=digest.hexdigest(), stream=file.file, temp_dir=self.temp_dir
+            )
+
+        logger.info(f"Received upload {filename} ({size} bytes)")
+        return SpooledUpload(filename, size, data=b"".join(chunks), sha256=digest.hexdigest())
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of ingestion counters"""
+        with self._lock:
+            stats = dict(self._counters)
+        stats["max_upload_size"] = self.max_bytes
+        return stats
+
+
+# Global instance
+upload_ingestor = UploadIngestor(
+    max_bytes=settings.MAX_UPLOAD_SIZE,
+    spool_threshold=settings.UPLOAD_SPOOL_THRESHOLD,
+    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+    temp_dir=settings.UPLOAD_TEMP_DIR
+)
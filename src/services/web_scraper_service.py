@@ -1,12 +1,16 @@
 """
 Service for web scraping and content extraction
 """
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 from newspaper import Article
 from typing import Optional
 
+from config.settings import settings
+from services.http_client import http_client, HTTPClientManager
+from services.page_cache import page_cache, PageCache
 from utils.logger import setup_logger
+from utils.metrics import observe_bytes, observe_chars, timed_stage
 
 logger = setup_logger(__name__)
 
@@ -14,48 +18,100 @@ logger = setup_logger(__name__)
 class WebScraperService:
     """Service for extracting text from web pages"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        client: HTTPClientManager = http_client,
+        cache: Optional[PageCache] = page_cache
+    ):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.http = client
+        self.cache = cache if settings.PAGE_CACHE_ENABLED else None
     
+    @timed_stage("scraper.extract_text")
     async def extract_text(self, url: str) -> Optional[str]:
         """
         Extract main text content from URL
         
+        The page is downloaded once through the shared HTTP client and the
+        same body is handed to newspaper3k and, if needed, BeautifulSoup.
+        Parsing runs in a worker thread to keep the event loop free. Pages
+        seen before are revalidated with a conditional GET and the cached
+        text is reused on 304 Not Modified.
+        
         Args:
             url: Web page URL
             
         Returns:
             Extracted text content
         """
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        
+        try:
+            response = await self._download(url, cached)
+        except Exception as e:
+            logger.error(f"Failed to download {url}: {str(e)}")
+            raise
+        
+        if cached and response.status_code == 304:
+            await asyncio.to_thread(self.cache.mark_not_modified, url, cached)
+            logger.info(f"Page not modified, reusing cached text for {url}")
+            return cached["text"]
+        
+        try:
+            response.raise_for_status()
+            observe_bytes("scraped_page", len(response.content))
+            html = response.text
+            text = await asyncio.to_thread(self._parse, url, html)
+        except Exception as e:
+            logger.error(f"Failed to extract text from {url}: {str(e)}")
+            raise
+        observe_chars("scraped_text", text)
+        
+        if self.cache and text:
+            await asyncio.to_thread(
+                self.cache.put,
+                url,
+                html,
+                text,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+        return text
+    
+    @timed_stage("scraper.download")
+    async def _download(self, url: str, cached: Optional[dict] = None):
+        """Fetch the page, sending validators from a cached copy if present"""
+        headers = dict(self.headers)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return await self.http.get(url, headers=headers)
+    
+    @timed_stage("scraper.parse")
+    def _parse(self, url: str, html: str) -> str:
+        """Extract text from downloaded HTML, preferring newspaper3k"""
         try:
             # Try using newspaper3k first (better for articles)
             article = Article(url)
-            article.download()
+            article.download(input_html=html)
             article.parse()
             
             if article.text and len(article.text.strip()) > 100:
                 logger.info(f"Text extracted from {url} using newspaper3k")
                 return article.text
-            
-            # Fallback to BeautifulSoup
-            return await self._extract_with_bs4(url)
-            
         except Exception as e:
             logger.warning(f"newspaper3k failed, trying BeautifulSoup: {str(e)}")
-            try:
-                return await self._extract_with_bs4(url)
-            except Exception as e2:
-                logger.error(f"Failed to extract text from {url}: {str(e2)}")
-                raise
+        
+        # Fallback to BeautifulSoup
+        return self._extract_with_bs4(url, html)
     
-    async def _extract_with_bs4(self, url: str) -> str:
+    def _extract_with_bs4(self, url: str, html: str) -> str:
         """Extract text using BeautifulSoup as fallback"""
-        response = requests.get(url, headers=self.headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'lxml')
+        soup = BeautifulSoup(html, 'lxml')
         
         # Remove script and style elements
         for script in soup(["script", "style", "nav", "footer", "header"]):
@@ -0,0 +1,46 @@
+"""
+Database session helpers for work done outside a request
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.database import get_db
+
+T = TypeVar("T")
+
+# Either session type; run_db accepts both
+DbSession = Union[Session, AsyncSession]
+
+
+@contextmanager
+def db_session() -> Iterator[Session]:
+    """Database session for background tasks, closed on exit"""
+    gen = get_db()
+    db = next(gen)
+    try:
+        yield db
+    finally:
+        gen.close()
+
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous ORM code against either kind of session
+
+    With an AsyncSession, fn gets the session's sync facade and runs via
+    run_sync, so its queries are awaited on the async driver instead of
+    blocking the event loop. With a plain Session, fn is called directly.
+
+    Args:
+        db: Session or AsyncSession
+        fn: Callable taking the Session as its first argument
+
+    Returns:
+        Whatever fn returns
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return fn(db, *args, **kwargs)
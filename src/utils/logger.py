@@ -1,51 +1,183 @@
 """
 Logging utility
+
+Module loggers hand records to one shared QueueHandler; a single
+QueueListener thread formats them and writes the console and the
+rotating log file. Callers (including the event loop) therefore never
+wait on disk I/O.
 """
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
 from config.settings import settings
+from utils.request_id import get_request_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(request_id)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with timestamp, level, logger, request id and message"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamp records with the current request id and sample INFO and below
+
+    Runs in the calling thread, where the request context is available.
+    Records at WARNING and above are always kept.
+    """
+
+    def __init__(self, info_sample_rate: float):
+        super().__init__()
+        self.info_sample_rate = info_sample_rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.info_sample_rate < 1.0 \
+                and random.random() >= self.info_sample_rate:
+            self.sampled_out += 1
+            return False
+        record.request_id = get_request_id()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments into the message here; copying and
+        # formatting the record is left to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The shared queue, its listener thread and the sink handlers"""
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        self.context_filter = ContextFilter(settings.LOG_INFO_SAMPLE_RATE)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(self.context_filter)
+        self.sinks = self._build_sinks()
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *self.sinks, respect_handler_level=True
+        )
+        self.listener.start()
+        self._stopped = False
+        atexit.register(self.stop)
+
+    @staticmethod
+    def _build_sinks() -> List[logging.Handler]:
+        formatter = JsonFormatter() if settings.LOG_JSON else logging.Formatter(TEXT_FORMAT)
+
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(formatter)
+        sinks = [console_handler]
+
+        try:
+            log_dir = os.path.dirname(settings.LOG_FILE)
+            if log_dir and not os.path.exists(log_dir):
+                os.makedirs(log_dir)
+
+            file_handler = logging.handlers.RotatingFileHandler(
+                settings.LOG_FILE,
+                maxBytes=settings.LOG_MAX_BYTES,
+                backupCount=settings.LOG_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+            sinks.append(file_handler)
+        except Exception as e:
+            console_handler.handle(logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Could not setup file handler: {e}",
+                "request_id": None,
+            }))
+        return sinks
+
+    def stop(self):
+        """Flush queued records and close the sinks"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.listener.stop()
+        for sink in self.sinks:
+            sink.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Queue depth and records not written"""
+        return {
+            "queued": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "sampled_out": self.context_filter.sampled_out,
+        }
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """The process-wide logging pipeline, started on first use"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline()
+        return _pipeline
 
 
 def setup_logger(name: str) -> logging.Logger:
     """
-    Setup logger with file and console handlers
-    
+    Setup logger writing through the shared logging pipeline
+
     Args:
         name: Logger name (usually __name__)
-        
+
     Returns:
         Configured logger
     """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
-    
+
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
-    
-    # File handler
-    try:
-        log_dir = os.path.dirname(settings.LOG_FILE)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        file_handler = logging.FileHandler(settings.LOG_FILE)
-        file_handler.setLevel(logging.DEBUG)
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
-    except Exception as e:
-        logger.warning(f"Could not setup file handler: {e}")
-    
+
+    logger.addHandler(get_log_pipeline().handler)
     return logger
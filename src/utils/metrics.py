@@ -0,0 +1,190 @@
+"""
+Prometheus metrics: per-route request latency, per-stage timings, input sizes and errors
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Seconds; spans fast DB calls up to long OCR and model calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = tuple(4 ** n for n in range(3, 15))  # 64 .. 268M
+# Any other request method is labelled "other"; the method comes from the client
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"})
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    ["method"]
+)
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Time spent in a processing stage (scraping, extraction, inference, database)",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+STAGES_IN_FLIGHT = Gauge(
+    "stages_in_flight",
+    "Processing stages currently running",
+    ["stage"]
+)
+STAGE_ERRORS = Counter(
+    "stage_errors_total",
+    "Processing stages that raised, by exception type",
+    ["stage", "error"]
+)
+INPUT_CHARS = Histogram(
+    "input_size_chars",
+    "Size of text inputs (texts to summarize, chat messages, scraped text)",
+    ["kind"],
+    buckets=SIZE_BUCKETS
+)
+INPUT_BYTES = Histogram(
+    "input_size_bytes",
+    "Size of binary inputs (uploaded files, downloaded pages)",
+    ["kind"],
+    buckets=SIZE_BUCKETS
+)
+
+
+# Labelled children per stage, so the hot path skips the labels() lookup
+_stage_series: Dict[str, Tuple[Any, Any]] = {}
+
+
+def _series(stage: str) -> Tuple[Any, Any]:
+    series = _stage_series.get(stage)
+    if series is None:
+        series = _stage_series.setdefault(
+            stage, (STAGE_DURATION.labels(stage), STAGES_IN_FLIGHT.labels(stage))
+        )
+    return series
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """
+    Time a block as a processing stage
+
+    Records its duration, counts it as in flight while it runs, and
+    counts exceptions by type.
+    """
+    duration, in_flight = _series(stage)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        STAGE_ERRORS.labels(stage, type(e).__name__).inc()
+        raise
+    finally:
+        duration.observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+def timed_stage(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator form of track_stage for sync and async functions"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track_stage(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_static_methods(cls: type, prefix: str) -> type:
+    """Time every public staticmethod of a repository class as stage <prefix>.<method>"""
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod) and not name.startswith("_"):
+            setattr(cls, name, staticmethod(timed_stage(f"{prefix}.{name}")(attr.__func__)))
+    return cls
+
+
+def observe_chars(kind: str, text: str):
+    """Record the length of a text input"""
+    INPUT_CHARS.labels(kind).observe(len(text) if text else 0)
+
+
+def observe_bytes(kind: str, size: int):
+    """Record the size of a binary input"""
+    INPUT_BYTES.labels(kind).observe(size or 0)
+
+
+def render_metrics() -> bytes:
+    """All metrics in the Prometheus text exposition format"""
+    return generate_latest()
+
+
+def route_template(scope) -> str:
+    """
+    Template of the route that handled a request, e.g. /api/v1/chat/sessions/{session_id}
+
+    The matched route's path may or may not include the prefix of the
+    router it was included with, depending on the FastAPI version; the
+    prefix is taken from the leading segments of the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    if ":path}" in template:
+        return template
+    segments = scope.get("path", "").rstrip("/").split("/")
+    depth = template.rstrip("/").count("/")
+    return "/".join(segments[:len(segments) - depth]) + template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and in-flight count of HTTP requests
+
+    Requests are labelled with the matched route template (e.g.
+    /api/v1/chat/sessions/{session_id}/history) rather than the raw path,
+    which keeps the number of series bounded. Unmatched paths share the
+    "unmatched" label and non-standard methods the "other" label. Streaming responses are timed until the body ends.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(
+                method, route_template(scope), str(status)
+            ).observe(time.perf_counter() - start)
+            in_flight.dec()
@@ -0,0 +1,28 @@
+"""
+Server-Sent Events helpers
+"""
+import json
+from typing import Any, Dict, Optional
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+}
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Format a single SSE message
+
+    Args:
+        data: JSON-serializable payload
+        event: Optional event name
+
+    Returns:
+        Encoded event text terminated by a blank line
+    """
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
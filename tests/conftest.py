@@ -0,0 +1,52 @@
+"""
+Shared fixtures: an in-memory database and a user owning the test data
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from models.user import User
+from models.chat_indexes import ensure_chat_indexes
+import models.chat_archive  # noqa: F401 (registers the archive table)
+import models.chat_document  # noqa: F401 (registers the document tables)
+import models.chat_summary  # noqa: F401 (registers the summary table)
+import models.job  # noqa: F401 (registers the job table)
+import models.summary_cache  # noqa: F401 (registers the summary cache table)
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with all tables"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    ensure_chat_indexes(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Database session"""
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def alice():
+    """Unsaved account for the user owning the test data"""
+    return User(email="alice@example.com", username="alice", hashed_password="x", is_active=True)
+
+
+@pytest.fixture
+def user(db, alice):
+    """A user owning the test data"""
+    db.add(alice)
+    db.commit()
+    return alice
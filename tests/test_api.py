@@ -3,6 +3,8 @@ Unit tests for API endpoints
 """
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
 import sys
 import os
 
@@ -10,10 +12,24 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from main import app
+from models import database
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def temp_db():
+    """Bind SessionLocal (requests and the job service) to an in-memory database"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal.configure(bind=engine)
+    yield engine
+    database.SessionLocal.configure(bind=database.engine)
+    engine.dispose()
+
+
 def test_health_check():
     """Test health check endpoint"""
     response = client.get("/api/v1/health")
@@ -44,6 +60,74 @@ def test_summarize_text_endpoint():
     assert response.status_code in [200, 500]
 
 
+def test_summarize_text_stream_endpoint():
+    """Test streaming text summarization endpoint"""
+    payload = {
+        "text": "This is a test text for summarization. It contains multiple sentences.",
+        "length": "short"
+    }
+    
+    response = client.post("/api/v1/summarize/text/stream", json=payload)
+    assert response.status_code in [200, 503]
+    if response.status_code == 200:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "data: " in response.text
+
+
+def test_summarize_batch_endpoint():
+    """Test batch summarization returns one result per item in order"""
+    payload = {
+        "items": [
+            {"type": "text", "text": "First article text. It has two sentences."},
+            {"type": "text", "text": "First article text.  It has two sentences."},
+            {"type": "file", "file": "not-uploaded.pdf"}
+        ],
+        "length": "short"
+    }
+    
+    response = client.post("/api/v1/summarize/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][1]["duplicate_of"] == 0
+    assert data["results"][2]["status"] == "error"
+
+
+def test_summarize_batch_validation():
+    """Test that batch items must carry their source field"""
+    response = client.post("/api/v1/summarize/batch", json={"items": [{"type": "url"}]})
+    assert response.status_code == 422
+
+
+def test_summarize_job_lifecycle(temp_db):
+    """Test queueing a job and polling its status"""
+    response = client.post(
+        "/api/v1/jobs/summarize/text",
+        json={"text": "This is a test text for a background job.", "length": "short"}
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    
+    status = client.get(f"/api/v1/jobs/{job['job_id']}")
+    assert status.status_code == 200
+    assert "progress" in status.json()
+    
+    # Without running workers the job stays queued and can be cancelled
+    result = client.get(f"/api/v1/jobs/{job['job_id']}/result")
+    assert result.status_code == 409
+    cancelled = client.delete(f"/api/v1/jobs/{job['job_id']}")
+    assert cancelled.status_code == 200
+    assert cancelled.json()["status"] == "cancelled"
+
+
+def test_summarize_job_not_found(temp_db):
+    """Test polling an unknown job"""
+    response = client.get("/api/v1/jobs/does-not-exist")
+    assert response.status_code == 404
+
+
 def test_summarize_text_validation():
     """Test text summarization input validation"""
     payload = {
@@ -0,0 +1,93 @@
+"""
+Unit tests for the AsyncSession repository path
+"""
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from config.settings import settings
+from models.async_database import async_database_url, use_async_sessions
+from services.async_repositories import AsyncAuthRepository, AsyncChatRepository
+from services.chat_service import ChatService
+
+
+@pytest_asyncio.fixture
+async def db():
+    """In-memory aiosqlite session with all tables"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def user(db, alice):
+    """A user owning the test sessions, saved through the async session"""
+    db.add(alice)
+    await db.commit()
+    return alice
+
+
+@pytest.mark.asyncio
+async def test_chat_repository_round_trip(db, user):
+    """Test that sessions and turns are stored and read back through AsyncSession"""
+    session = await AsyncChatRepository.create_session(db, user.id, "async")
+    await AsyncChatRepository.save_turn(db, session, "question", "answer")
+
+    found = await AsyncChatRepository.get_session_by_id(db, session.session_id)
+    messages = await AsyncChatRepository.get_recent_messages(db, found, limit=10)
+
+    assert [(m.role, m.content) for m in messages] == [("user", "question"), ("assistant", "answer")]
+    assert await AsyncChatRepository.count_messages(db, found) == 2
+    assert (await AsyncAuthRepository.get_user_by_username(db, "alice")).id == user.id
+
+
+@pytest.mark.asyncio
+async def test_chat_service_accepts_async_session(db, user):
+    """Test that a chat turn runs end to end on an AsyncSession"""
+    session = await AsyncChatRepository.create_session(db, user.id, "New Conversation")
+
+    service = ChatService()
+    with patch("services.chat_service.gemini_model") as model:
+        model.chat.return_value = "answer"
+        reply = await service.chat(db, session.session_id, "What is new?")
+
+    messages, cursor = await service.get_history_page(db, session, limit=10)
+    assert reply == "answer"
+    assert cursor is None
+    assert [m.content for m in messages] == ["What is new?", "answer"]
+    assert (await AsyncChatRepository.get_session_by_id(db, session.session_id)).title == "What is new?"
+
+
+def test_async_database_url():
+    """Test that sync URLs map to their async drivers"""
+    assert async_database_url("sqlite:///./data/app.db") == "sqlite+aiosqlite:///./data/app.db"
+    assert async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert async_database_url("postgresql+psycopg2://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/app")
+
+
+def test_request_sessions_follow_backend(monkeypatch):
+    """Test that requests use the async driver except on SQLite unless configured"""
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "auto")
+    assert not use_async_sessions("sqlite:///./data/app.db")
+    assert use_async_sessions("postgresql://u:p@db/app")
+
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "always")
+    assert use_async_sessions("sqlite:///./data/app.db")
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "never")
+    assert not use_async_sessions("postgresql://u:p@db/app")
+
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "sometimes")
+    with pytest.raises(ValueError):
+        use_async_sessions()
@@ -0,0 +1,166 @@
+"""
+Unit tests for chat session archival
+"""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from models.user import User
+from models.chat import Message
+from models.chat_archive import ChatSessionArchive
+from services.chat_archive import ChatArchiveService
+from services.chat_repository import ChatRepository
+from services.chat_service import ChatService
+
+
+@pytest.fixture
+def archive():
+    """Archive service for sessions idle more than 30 days"""
+    return ChatArchiveService(idle_days=30, interval_seconds=3600, batch_size=10)
+
+
+def make_session(db, user, title, turns, age_days):
+    """Session with a few turns whose last activity was age_days ago"""
+    session = ChatRepository.create_session(db, user.id, title)
+    for i in range(turns):
+        ChatRepository.save_turn(db, session, f"{title} q{i}", f"{title} a{i}")
+    session.updated_at = datetime.utcnow() - timedelta(days=age_days)
+    db.commit()
+    return session
+
+
+def test_idle_sessions_are_archived(db, user, archive):
+    """Test that only idle sessions move out of the messages table"""
+    old = make_session(db, user, "old", turns=3, age_days=60)
+    recent = make_session(db, user, "recent", turns=1, age_days=1)
+
+    assert archive.archive_idle_sessions(db) == 1
+    assert archive.archive_idle_sessions(db) == 0
+
+    assert db.query(Message).filter(Message.session_id == old.id).count() == 0
+    assert db.query(Message).filter(Message.session_id == recent.id).count() == 2
+    row = db.query(ChatSessionArchive).one()
+    assert row.message_count == 6
+    assert row.raw_bytes > 0
+
+    sessions, _ = ChatRepository.get_user_session_summaries(db, user.id)
+    listed = {session.title: (count, preview) for session, count, preview in sessions}
+    assert listed["old"] == (6, "old a2")
+    assert listed["recent"] == (2, "recent a0")
+
+
+@pytest.mark.asyncio
+async def test_history_rehydrates_archived_session(db, user, archive):
+    """Test that opening the history restores the messages in order"""
+    session = make_session(db, user, "old", turns=3, age_days=60)
+    original = [m.content for m in ChatRepository.get_messages(db, session, limit=100)]
+    archive.archive_idle_sessions(db)
+
+    service = ChatService()
+    service.archive = archive
+    messages, cursor = await service.get_history_page(db, session, limit=100)
+
+    assert cursor is None
+    assert [m.content for m in messages] == original
+    assert db.query(ChatSessionArchive).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_rehydrate_after_message_ids_are_reused(db, user, archive):
+    """Test that restoring works when SQLite has handed the archived ids to new messages"""
+    session = make_session(db, user, "old", turns=2, age_days=60)
+    archive.archive_idle_sessions(db)
+    other = make_session(db, user, "new", turns=1, age_days=0)
+    assert min(m.id for m in ChatRepository.get_messages(db, other, limit=10)) == 1
+
+    assert await archive.rehydrate(db, session)
+    assert not await archive.rehydrate(db, session)
+
+    assert [m.content for m in ChatRepository.get_messages(db, session, limit=10)] == \
+        ["old q0", "old a0", "old q1", "old a1"]
+    assert [m.content for m in ChatRepository.get_messages(db, other, limit=10)] == ["new q0", "new a0"]
+    assert db.query(ChatSessionArchive).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_history_includes_archive_next_to_live_messages(db, user, archive):
+    """Test that messages written to an archived session are kept after the restored ones"""
+    session = make_session(db, user, "old", turns=2, age_days=60)
+    ChatRepository.save_session_summary(db, session.id, "first turn", 2, summarized_until_id=2)
+    archive.archive_idle_sessions(db)
+    ChatRepository.bulk_add_messages(db, [
+        {"session_id": session.id, "role": "user", "content": "late", "created_at": datetime.utcnow()}
+    ])
+    db.commit()
+
+    service = ChatService()
+    service.archive = archive
+    messages, _ = await service.get_history_page(db, session, limit=100)
+
+    assert [m.content for m in messages] == ["old q0", "old a0", "old q1", "old a1", "late"]
+    assert [m.id for m in messages] == sorted(m.id for m in messages)
+    summary = ChatRepository.get_session_summary(db, session)
+    assert summary.summarized_until_id == messages[1].id
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_rehydrates_archived_session(db, user, archive):
+    """Test that a new turn in an archived session sees its earlier history"""
+    session = make_session(db, user, "old", turns=1, age_days=60)
+    session_id = session.session_id
+    archive.archive_idle_sessions(db)
+
+    service = ChatService()
+    service.archive = archive
+    with patch("services.chat_service.gemini_model") as model:
+        model.chat.return_value = "welcome back"
+        await service.chat(db, session_id, "remember me?")
+
+    history = model.chat.call_args.kwargs["conversation_history"]
+    assert [m["content"] for m in history] == ["old q0", "old a0"]
+    assert ChatRepository.count_messages(db, ChatRepository.get_session_by_id(db, session_id)) == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_opens_restore_once(tmp_path, archive):
+    """Test that two requests opening an archived session both see its messages"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'archive.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    first, second = factory(), factory()
+    owner = User(email="bob@example.com", username="bob", hashed_password="x")
+    first.add(owner)
+    first.commit()
+    session = make_session(first, owner, "old", turns=2, age_days=60)
+    archive.archive_idle_sessions(first)
+
+    try:
+        restored = await asyncio.gather(
+            archive.rehydrate(first, session),
+            archive.rehydrate(second, ChatRepository.get_session_by_id(second, session.session_id))
+        )
+        assert sorted(restored) == [False, True]
+        assert ChatRepository.count_messages(second, session) == 4
+        assert second.query(ChatSessionArchive).count() == 0
+    finally:
+        first.close()
+        second.close()
+        engine.dispose()
+
+
+def test_delete_archived_session(db, user, archive):
+    """Test that deleting a session removes its archive"""
+    session = make_session(db, user, "old", turns=1, age_days=60)
+    archive.archive_idle_sessions(db)
+
+    assert ChatRepository.delete_session(db, session.session_id)
+    assert db.query(ChatSessionArchive).count() == 0
@@ -0,0 +1,153 @@
+"""
+Unit tests for ConversationContextManager
+"""
+import asyncio
+import threading
+import pytest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from models.user import User
+import models.chat_summary  # noqa: F401 (registers the summary table)
+from services.chat_context import ConversationContextManager, estimate_tokens
+from services.chat_repository import ChatRepository
+
+
+def make_message(id, role, content):
+    return SimpleNamespace(id=id, role=role, content=content)
+
+
+@pytest.fixture
+def manager():
+    """Context manager with a small budget"""
+    return ConversationContextManager(
+        executor=MagicMock(),
+        token_budget=100,
+        context_max_tokens=40,
+        history_window=50,
+        summary_trigger_tokens=10,
+        summary_max_words=50
+    )
+
+
+def test_estimate_tokens():
+    """Test the character-based token estimate"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_history_fits_budget_newest_first(manager):
+    """Test that the newest messages are kept and older ones evicted"""
+    messages = [make_message(i, "user" if i % 2 else "assistant", "x" * 80) for i in range(1, 9)]
+
+    prompt = manager.build(None, messages, "hello")
+
+    assert prompt.usage["total"] <= 100
+    assert prompt.history[-1] == {"role": "user", "content": "hello"}
+    kept = prompt.usage["history_messages"]
+    assert 0 < kept < len(messages)
+    assert [m["id"] for m in prompt.evicted] == [m.id for m in messages[:len(messages) - kept]]
+
+
+def test_document_context_is_truncated(manager):
+    """Test that an attached document is capped at context_max_tokens"""
+    document = "word " * 500
+
+    prompt = manager.build(None, [], "summarize this", context=document)
+
+    assert prompt.usage["context_truncated"] is True
+    assert prompt.usage["context"] <= 40
+    assert "truncated" in prompt.context
+
+
+def test_summary_replaces_covered_messages(manager):
+    """Test that messages covered by the rolling summary are not resent"""
+    summary = SimpleNamespace(summary="Earlier the user asked about X.", summarized_until_id=2)
+    messages = [make_message(i, "user", f"m{i}") for i in range(1, 5)]
+
+    prompt = manager.build(summary, messages, "next")
+
+    assert [m["content"] for m in prompt.history] == ["m3", "m4", "next"]
+    assert prompt.context.startswith("Summary of the earlier conversation:")
+    assert prompt.usage["summary"] == estimate_tokens(summary.summary)
+    assert prompt.summary == summary.summary
+
+
+@pytest.mark.asyncio
+async def test_compaction_waits_for_trigger(manager):
+    """Test that small evictions do not start a summarization"""
+    prompt = manager.build(None, [], "hi")
+    prompt.evicted = [{"id": 1, "role": "user", "content": "tiny"}]
+    prompt.compact_until_id = 1
+
+    manager.schedule_compaction(1, prompt)
+
+    assert not manager._tasks
+    manager.executor.run.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_compaction_covers_messages_older_than_window(monkeypatch):
+    """Test that messages pushed out of the history window reach the summary"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    threads = []
+
+    @contextmanager
+    def db_session():
+        threads.append(threading.get_ident())
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    monkeypatch.setattr("services.chat_context.db_session", db_session)
+    db = factory()
+    user = User(email="alice@example.com", username="alice", hashed_password="x")
+    db.add(user)
+    db.commit()
+    chat_session = ChatRepository.create_session(db, user.id, "long")
+    for i in range(10):
+        ChatRepository.save_turn(db, chat_session, user_content=f"q{i}", assistant_content=f"a{i}")
+
+    executor = MagicMock()
+    executor.run = AsyncMock(return_value="Summary of the early turns.")
+    manager = ConversationContextManager(
+        executor=executor,
+        token_budget=100000,
+        context_max_tokens=40,
+        history_window=4,
+        summary_trigger_tokens=1,
+        summary_max_words=50
+    )
+    window = ChatRepository.get_recent_messages(db, chat_session, limit=4)
+
+    prompt = manager.build(None, window, "next")
+    assert prompt.usage["evicted_messages"] == 0
+    manager.schedule_compaction(chat_session.id, prompt)
+    await asyncio.gather(*manager._tasks)
+
+    transcript = executor.run.call_args.kwargs["text"]
+    assert "User: q0" in transcript and "Assistant: a7" in transcript
+    assert "q8" not in transcript
+    assert len(threads) == 2 and threading.get_ident() not in threads  # read and write off the loop
+    db.expire_all()
+    summary = ChatRepository.get_session_summary(db, chat_session)
+    assert summary.summarized_until_id == window[0].id - 1
+    db.close()
+    engine.dispose()
@@ -0,0 +1,171 @@
+"""
+Unit tests for chat persistence queries
+"""
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.chat_repository import ChatRepository
+from services.chat_service import ChatService
+
+
+def test_session_summaries_include_counts_and_preview(db, user):
+    """Test that counts and the latest message come back with each session"""
+    busy = ChatRepository.create_session(db, user.id, "busy")
+    ChatRepository.create_session(db, user.id, "empty")
+    ChatRepository.add_message(db, busy.session_id, "user", "first")
+    ChatRepository.add_message(db, busy.session_id, "assistant", "second " * 50)
+
+    sessions, next_cursor = ChatRepository.get_user_session_summaries(db, user.id)
+
+    assert next_cursor is None
+    by_title = {session.title: (count, preview) for session, count, preview in sessions}
+    assert by_title["empty"] == (0, None)
+    count, preview = by_title["busy"]
+    assert count == 2
+    assert preview.startswith("second")
+    assert len(preview) <= 120
+
+
+def test_session_summaries_single_statement(db, engine, user):
+    """Test that a page is loaded without per-session queries"""
+    for i in range(5):
+        session = ChatRepository.create_session(db, user.id, f"s{i}")
+        ChatRepository.add_message(db, session.session_id, "user", f"hello {i}")
+    user_id = user.id
+    db.expire_all()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    sessions, _ = ChatRepository.get_user_session_summaries(db, user_id)
+    [(session.title, count) for session, count, _ in sessions]
+
+    assert len(sessions) == 5
+    assert len(statements) == 1
+
+
+def test_session_summaries_cursor_pagination(db, user):
+    """Test that pages cover every session once, newest activity first"""
+    created = [ChatRepository.create_session(db, user.id, f"s{i}") for i in range(5)]
+    ChatRepository.add_message(db, created[0].session_id, "user", "bump")
+
+    titles = []
+    cursor = None
+    while True:
+        page, cursor = ChatRepository.get_user_session_summaries(db, user.id, limit=2, cursor=cursor)
+        titles += [session.title for session, _, _ in page]
+        if cursor is None:
+            break
+
+    assert titles[0] == "s0"
+    assert sorted(titles) == [f"s{i}" for i in range(5)]
+
+
+def test_session_summaries_invalid_cursor(db, user):
+    """Test that a malformed cursor is rejected"""
+    with pytest.raises(ValueError):
+        ChatRepository.get_user_session_summaries(db, user.id, cursor="not-a-cursor")
+
+
+def test_save_turn_single_transaction(db, engine, user):
+    """Test that both messages and the session update are committed together"""
+    session = ChatRepository.create_session(db, user.id, "New Conversation")
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    ChatRepository.save_turn(db, session, "question", "answer", title="question")
+
+    assert len(commits) == 1
+    messages = ChatRepository.get_messages(db, session)
+    assert [(m.role, m.content) for m in messages] == [("user", "question"), ("assistant", "answer")]
+    assert session.title == "question"
+
+
+@pytest.mark.asyncio
+async def test_chat_turn_round_trips(db, engine, user):
+    """Test that a chat turn resolves the session once and commits once"""
+    session = ChatRepository.create_session(db, user.id, "New Conversation")
+    ChatRepository.save_turn(db, session, "earlier", "reply")
+    session_id = session.session_id
+    db.expire_all()
+
+    statements = []
+    commits = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    service = ChatService()
+    with patch("services.chat_service.gemini_model") as model:
+        model.chat.return_value = "answer"
+        reply = await service.chat(db, session_id, "question")
+
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert reply == "answer"
+    assert len(selects) == 5  # session, archive check, document passages, rolling summary and history
+    assert len(commits) == 1
+    history = model.chat.call_args.kwargs["conversation_history"]
+    assert [m["content"] for m in history] == ["earlier", "reply"]
+
+
+def test_recent_messages_returns_latest_window(db, user):
+    """Test that the history window holds the newest messages, oldest first"""
+    session = ChatRepository.create_session(db, user.id, "long")
+    for i in range(10):
+        ChatRepository.save_turn(db, session, f"q{i}", f"a{i}")
+
+    window = ChatRepository.get_recent_messages(db, session, limit=4)
+
+    assert [m.content for m in window] == ["q8", "a8", "q9", "a9"]
+
+
+def test_recent_messages_uses_history_index(db, engine, user):
+    """Test that the window query is served by the (session_id, created_at) index"""
+    session = ChatRepository.create_session(db, user.id, "long")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, params, *args: statements.append((statement, params)))
+    ChatRepository.get_recent_messages(db, session, limit=4)
+
+    statement, params = statements[-1]
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()
+    assert "ix_messages_session_id_created_at" in " ".join(str(row) for row in plan)
+
+
+def test_session_listing_uses_activity_index(db, engine, user):
+    """Test that the session listing is served by the (user_id, activity) index"""
+    ChatRepository.create_session(db, user.id, "one")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, params, *args: statements.append((statement, params)))
+    ChatRepository.get_user_session_summaries(db, user.id)
+
+    statement, params = statements[-1]
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params).fetchall()
+    assert "ix_chat_sessions_user_id_activity" in " ".join(str(row) for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_history_keyset_pagination(db, user):
+    """Test that history pages walk back through the session without overlap"""
+    session = ChatRepository.create_session(db, user.id, "long")
+    for i in range(5):
+        ChatRepository.save_turn(db, session, f"q{i}", f"a{i}")
+
+    service = ChatService()
+    pages = []
+    cursor = None
+    while True:
+        messages, cursor = await service.get_history_page(db, session, limit=3, cursor=cursor)
+        pages.append([m.content for m in messages])
+        if cursor is None:
+            break
+
+    assert pages[0] == ["a3", "q4", "a4"]
+    assert [content for page in reversed(pages) for content in page] == [
+        f"{role}{i}" for i in range(5) for role in ("q", "a")
+    ]
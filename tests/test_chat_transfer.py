@@ -0,0 +1,164 @@
+"""
+Unit tests for NDJSON chat export and import
+"""
+import json
+import pytest
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.user import User
+from models.chat import ChatSession
+from services.chat_archive import ChatArchiveService
+from services.chat_repository import ChatRepository
+from services.chat_transfer import ChatExporter, ChatImporter, iter_lines
+
+
+@pytest.fixture
+def users(db, user):
+    """Source and destination accounts"""
+    bob = User(email="bob@example.com", username="bob", hashed_password="x")
+    db.add(bob)
+    db.commit()
+    return user, bob
+
+
+def make_session(db, user, title, turns):
+    """Session with a few turns"""
+    session = ChatRepository.create_session(db, user.id, title)
+    for i in range(turns):
+        ChatRepository.save_turn(db, session, f"{title} q{i}", f"{title} a{i}")
+    return session
+
+
+def conversations(db, user):
+    """Title and message contents of each of a user's sessions"""
+    sessions = db.query(ChatSession).filter(ChatSession.user_id == user.id).order_by(ChatSession.id).all()
+    return [
+        (s.title, [m.content for m in ChatRepository.get_session_messages(db, s.session_id)])
+        for s in sessions
+    ]
+
+
+def test_round_trip_includes_archived_sessions(db, users):
+    """Test that an export imports back to the same conversations"""
+    alice, bob = users
+    make_session(db, alice, "first", turns=2)
+    old = make_session(db, alice, "old", turns=3)
+    make_session(db, alice, "empty", turns=0)
+    old.updated_at = datetime.utcnow() - timedelta(days=60)
+    db.commit()
+    ChatArchiveService(idle_days=30, interval_seconds=3600, batch_size=10).archive_idle_sessions(db)
+
+    lines = list(ChatExporter(page_size=2, batch_size=2).export_user(db, alice.id))
+    records = [json.loads(line) for line in lines]
+    assert [r["type"] for r in records].count("session") == 3
+    assert [r["type"] for r in records].count("message") == 10
+
+    # Import the same file under new session ids for another user
+    renamed = [line.replace(old.session_id, "restored-old") for line in lines]
+    for record in records:
+        if record["type"] == "session" and record["session_id"] != old.session_id:
+            renamed = [line.replace(record["session_id"], "copy-" + record["session_id"]) for line in renamed]
+
+    stats = ChatImporter(bob.id).import_lines(db, renamed, batch_size=3)
+
+    assert stats == {"sessions": 3, "skipped_sessions": 0, "messages": 10}
+    expected = [
+        ("first", ["first q0", "first a0", "first q1", "first a1"]),
+        ("old", ["old q0", "old a0", "old q1", "old a1", "old q2", "old a2"]),
+        ("empty", []),
+    ]
+    assert conversations(db, bob) == expected
+
+
+def test_export_includes_messages_written_after_archiving(db, users):
+    """Test that an archived session's live messages follow its archived ones"""
+    alice, _ = users
+    session = make_session(db, alice, "old", turns=1)
+    session.updated_at = datetime.utcnow() - timedelta(days=60)
+    db.commit()
+    ChatArchiveService(idle_days=30, interval_seconds=3600, batch_size=10).archive_idle_sessions(db)
+    ChatRepository.bulk_add_messages(db, [
+        {"session_id": session.id, "role": "user", "content": "late", "created_at": datetime.utcnow()}
+    ])
+    db.commit()
+
+    records = [json.loads(line) for line in ChatExporter(page_size=10, batch_size=10).export_user(db, alice.id)]
+
+    assert [r["content"] for r in records if r["type"] == "message"] == ["old q0", "old a0", "late"]
+
+
+def test_import_skips_existing_sessions(db, users):
+    """Test that re-importing an export adds nothing"""
+    alice, _ = users
+    make_session(db, alice, "first", turns=2)
+    lines = list(ChatExporter(page_size=10, batch_size=10).export_user(db, alice.id))
+
+    stats = ChatImporter(alice.id).import_lines(db, lines, batch_size=2)
+
+    assert stats == {"sessions": 0, "skipped_sessions": 1, "messages": 0}
+    assert conversations(db, alice) == [("first", ["first q0", "first a0", "first q1", "first a1"])]
+
+
+def test_rerun_completes_partially_imported_session(db, users):
+    """Test that re-running an import stopped mid-session adds only the missing messages"""
+    alice, bob = users
+    source = make_session(db, alice, "long", turns=3)
+    lines = list(ChatExporter(page_size=10, batch_size=10).export_user(db, alice.id))
+    lines = [line.replace(source.session_id, "imported") for line in lines]
+
+    # The first batch (session + 2 messages) is committed before the bad line
+    with pytest.raises(ValueError, match="Line 5"):
+        ChatImporter(bob.id).import_lines(db, lines[:4] + ["not json"] + lines[4:], batch_size=3)
+    assert conversations(db, bob) == [("long", ["long q0", "long a0"])]
+
+    stats = ChatImporter(bob.id).import_lines(db, lines, batch_size=3)
+
+    assert stats == {"sessions": 0, "skipped_sessions": 1, "messages": 4}
+    assert conversations(db, bob) == [("long", ["long q0", "long a0", "long q1", "long a1", "long q2", "long a2"])]
+
+    # Another user's session with the same id is left alone
+    stats = ChatImporter(alice.id).import_lines(db, lines, batch_size=3)
+    assert stats == {"sessions": 0, "skipped_sessions": 1, "messages": 0}
+    assert len(conversations(db, bob)[0][1]) == 6
+
+
+@pytest.mark.parametrize("line, error", [
+    ("not json", "invalid JSON"),
+    ("[1, 2]", "expected a JSON object"),
+    ('{"type": "bogus"}', "unknown record type"),
+    ('{"type": "message", "session_id": "x", "role": "user", "content": "hi"}', "message does not follow its session"),
+])
+def test_malformed_lines_are_rejected(db, users, line, error):
+    """Test that a malformed line raises ValueError with its line number"""
+    alice, _ = users
+    with pytest.raises(ValueError, match=f"Line 2: {error}"):
+        ChatImporter(alice.id).import_lines(db, ['{"type": "session", "session_id": "s1"}', line], batch_size=10)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_splits_across_chunks():
+    """Test that lines split over chunk boundaries are reassembled"""
+    async def chunks():
+        for chunk in [b'{"a"', b': 1}\n{"b": 2}\n{"c"', b": 3}"]:
+            yield chunk
+
+    assert [line async for line in iter_lines(chunks())] == ['{"a": 1}', '{"b": 2}', '{"c": 3}']
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_rejects_overlong_lines():
+    """Test that a line over the size cap raises ValueError before it is buffered whole"""
+    async def chunks():
+        yield b'{"a": 1}\n'
+        while True:
+            yield b"x" * 10
+
+    lines = iter_lines(chunks(), max_line_bytes=25)
+    assert await lines.__anext__() == '{"a": 1}'
+    with pytest.raises(ValueError, match="longer than 25 bytes"):
+        await lines.__anext__()
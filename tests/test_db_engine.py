@@ -0,0 +1,47 @@
+"""
+Unit tests for database engine tuning
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.engine import configure_sqlite, create_database_engine, engine_options
+
+
+def test_sqlite_pragmas_applied(tmp_path):
+    """Test that new SQLite connections use WAL, the synchronous level and busy timeout"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+
+
+def test_invalid_sqlite_mode_rejected(tmp_path):
+    """Test that unknown pragma values are refused"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with pytest.raises(ValueError):
+        configure_sqlite(engine, journal_mode="WAL; DROP TABLE users", synchronous="NORMAL", busy_timeout_ms=0)
+    engine.dispose()
+
+
+def test_engine_options_per_backend():
+    """Test pool options for file SQLite, in-memory SQLite and PostgreSQL"""
+    memory = engine_options("sqlite://")
+    assert memory["poolclass"] is StaticPool
+    assert "pool_size" not in memory
+
+    sqlite_file = engine_options("sqlite:///./data/app.db")
+    assert sqlite_file["connect_args"]["check_same_thread"] is False
+    assert sqlite_file["pool_size"] == 5
+
+    postgres = engine_options("postgresql://user:secret@db/app")
+    assert "connect_args" not in postgres
+    assert postgres["pool_pre_ping"] is True
+    assert postgres["max_overflow"] == 10
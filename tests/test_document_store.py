@@ -0,0 +1,112 @@
+"""
+Unit tests for DocumentStore
+"""
+import pytest
+import io
+from unittest.mock import AsyncMock
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.chat_repository import ChatRepository
+from services.document_store import DocumentStore
+from services.retrieval_index import RetrievalIndexStore
+
+
+class FakeUpload:
+    """Minimal stand-in for fastapi.UploadFile"""
+
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.size = None
+        self.file = io.BytesIO(content)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+
+    async def seek(self, offset: int):
+        self.file.seek(offset)
+
+
+DOCUMENT = "\n\n".join(
+    f"Section {i} describes the {name} subsystem in detail. " * 8
+    for i, name in enumerate(["storage", "network", "billing", "search"])
+)
+
+
+@pytest.fixture
+def chat_session(db, user):
+    """A chat session to attach documents to"""
+    return ChatRepository.create_session(db, user.id, "docs")
+
+
+@pytest.fixture
+def store(tmp_path):
+    """DocumentStore with a mocked file processor"""
+    processor = AsyncMock()
+    processor.extract_text_from_upload.return_value = DOCUMENT
+    return DocumentStore(
+        processor, chunk_chars=500, chunk_overlap=0, max_passages=2,
+        index_store=RetrievalIndexStore(str(tmp_path), max_cached=4)
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_is_stored_once(db, chat_session, store):
+    """Test that re-attaching the same file reuses the stored document"""
+    first, reused_first = await store.add_upload(db, chat_session, FakeUpload("spec.txt", DOCUMENT.encode()))
+    second, reused_second = await store.add_upload(db, chat_session, FakeUpload("copy.txt", DOCUMENT.encode()))
+
+    assert not reused_first
+    assert reused_second
+    assert second.id == first.id
+    assert first.chunk_count > 1
+    assert store.file_processor.extract_text_from_upload.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieve_returns_matching_passages(db, chat_session, store):
+    """Test that only passages relevant to the message are returned"""
+    await store.add_upload(db, chat_session, FakeUpload("spec.txt", DOCUMENT.encode()))
+
+    passages = await store.retrieve(db, chat_session, "How does billing work?", max_tokens=1000)
+
+    assert passages.startswith("[From attached document: spec.txt]")
+    assert "billing" in passages
+    assert "network" not in passages
+
+
+@pytest.mark.asyncio
+async def test_retrieve_falls_back_to_document_start(db, chat_session, store):
+    """Test that a message with no matching terms gets the start of the document"""
+    await store.add_upload(db, chat_session, FakeUpload("spec.txt", DOCUMENT.encode()))
+
+    passages = await store.retrieve(db, chat_session, "summarize it", max_tokens=1000)
+
+    assert "Section 0" in passages
+
+
+@pytest.mark.asyncio
+async def test_retrieve_without_documents(db, chat_session, store):
+    """Test that sessions without documents get no context"""
+    assert await store.retrieve(db, chat_session, "anything", max_tokens=1000) is None
+
+
+@pytest.mark.asyncio
+async def test_deleted_document_is_not_retrieved(db, chat_session, store):
+    """Test that the index is rebuilt when a document is detached"""
+    billing = "Invoices and billing cycles are explained here. " * 5
+    processor = store.file_processor
+    processor.extract_text_from_upload.return_value = billing
+    document, _ = await store.add_upload(db, chat_session, FakeUpload("billing.txt", billing.encode()))
+    assert "Invoices" in await store.retrieve(db, chat_session, "billing", max_tokens=1000)
+
+    processor.extract_text_from_upload.return_value = DOCUMENT
+    await store.add_upload(db, chat_session, FakeUpload("spec.txt", DOCUMENT.encode()))
+    store.delete_document(db, chat_session, document.id)
+
+    passages = await store.retrieve(db, chat_session, "billing", max_tokens=1000)
+    assert "Invoices" not in passages
+    assert "[From attached document: spec.txt]" in passages
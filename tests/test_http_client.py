@@ -0,0 +1,43 @@
+"""
+Unit tests for the shared HTTP client
+"""
+import asyncio
+import httpx
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.settings import settings
+from services.http_client import HTTPClientManager
+
+
+@pytest.mark.asyncio
+async def test_host_limits_are_dropped_when_idle():
+    """Test that per-host semaphores do not accumulate across hosts"""
+    active = {"now": 0, "max": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return httpx.Response(200, text="ok")
+
+    manager = HTTPClientManager()
+    manager._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        await asyncio.gather(*(
+            manager.get("https://same.example/page") for _ in range(settings.SCRAPER_MAX_CONNECTIONS_PER_HOST * 2)
+        ))
+        for n in range(50):
+            await manager.get(f"https://host{n}.example/")
+        stats = manager.stats()
+    finally:
+        await manager.close()
+
+    assert active["max"] == settings.SCRAPER_MAX_CONNECTIONS_PER_HOST
+    assert stats["hosts"] == 0
+    assert stats["in_flight"] == 0
@@ -0,0 +1,107 @@
+"""
+Unit tests for InferenceExecutor
+"""
+import pytest
+import asyncio
+import threading
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+
+@pytest.fixture
+def executor():
+    """Create a small InferenceExecutor"""
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_off_event_loop(executor):
+    """Test that calls run in a worker thread and return their result"""
+    main_thread = threading.get_ident()
+
+    result = await executor.run(lambda x: (x * 2, threading.get_ident()), 21)
+
+    assert result[0] == 42
+    assert result[1] != main_thread
+    assert executor.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_full(executor):
+    """Test backpressure once running plus queued calls reach capacity"""
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceQueueFullError):
+        await executor.run(release.wait)
+
+    stats = executor.stats()
+    assert stats["active"] == 1
+    assert stats["queued"] == 1
+    assert stats["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert executor.has_capacity()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_errors(executor):
+    """Test that exceptions from the callable reach the caller"""
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await executor.run(fail)
+
+    assert executor.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_forwards_chunks_in_order(executor):
+    """Test that chunks from a blocking generator are yielded as they arrive"""
+    def generate():
+        for word in ["one ", "two ", "three"]:
+            yield word
+
+    chunks = [chunk async for chunk in executor.stream(generate)]
+
+    assert chunks == ["one ", "two ", "three"]
+    assert executor.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_wraps_plain_string_result(executor):
+    """Test that a non-streaming callable is emitted as a single chunk"""
+    chunks = [chunk async for chunk in executor.stream(lambda: "full reply")]
+    assert chunks == ["full reply"]
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_producer_when_consumer_closes(executor):
+    """Test that closing the stream early stops the worker generator"""
+    produced = []
+
+    def generate():
+        for i in range(1000):
+            produced.append(i)
+            yield f"{i} "
+            threading.Event().wait(0.001)
+
+    stream = executor.stream(generate)
+    await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0.1)
+
+    assert len(produced) < 1000
+    assert executor.has_capacity()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the background job queue
+"""
+import asyncio
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from models.job import SummarizationJob
+from services.job_service import JobService
+
+
+class BlockingSummarizer:
+    """Summarizer that never finishes, so jobs stay running"""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def summarize_cached(self, **kwargs):
+        self.started.set()
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """In-memory database shared by the workers and the test"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine, tables=[SummarizationJob.__table__])
+    factory = sessionmaker(bind=engine)
+
+    @contextmanager
+    def db_session():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr("services.job_service.db_session", db_session)
+    yield factory
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job_reports_cancelled(session_factory, tmp_path):
+    """Test that cancelling a running job waits for the worker to record it"""
+    summarizer = BlockingSummarizer()
+    service = JobService(summarizer, None, None, workers=1, upload_dir=str(tmp_path))
+    await service.start()
+    db = session_factory()
+    try:
+        job = await service.submit_text("Some text to summarize.", "short")
+        await asyncio.wait_for(summarizer.started.wait(), 5)
+
+        cancelled = await service.cancel(db, job.job_id)
+        assert cancelled.status == "cancelled"
+        assert service.stats()["running"] == 0
+    finally:
+        db.close()
+        await service.stop()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the queued, structured logging pipeline
+"""
+import json
+import logging
+import queue
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.logger import ContextFilter, DroppingQueueHandler, JsonFormatter
+from utils.request_id import RequestIdMiddleware, request_id_var, get_request_id
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+def test_records_carry_request_id_as_json():
+    """Test that the filter stamps the request id and the formatter emits one JSON object"""
+    record = make_record()
+    token = request_id_var.set("req-1")
+    try:
+        assert ContextFilter(info_sample_rate=1.0).filter(record)
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["request_id"] == "req-1"
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+
+
+def test_info_sampling_keeps_warnings():
+    """Test that sampling drops INFO records but never warnings"""
+    sampler = ContextFilter(info_sample_rate=0.0)
+    assert not sampler.filter(make_record(logging.INFO))
+    assert sampler.filter(make_record(logging.WARNING))
+    assert sampler.sampled_out == 1
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Test that a full queue drops records and counts them"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.dropped == 1
+
+
+def test_request_id_middleware():
+    """Test that request ids are generated or taken from the client and echoed"""
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/id")
+    async def current_id():
+        return {"request_id": get_request_id()}
+
+    client = TestClient(app)
+    response = client.get("/id", headers={"X-Request-ID": "client-id"})
+    assert response.json()["request_id"] == "client-id"
+    assert response.headers["X-Request-ID"] == "client-id"
+
+    generated = client.get("/id")
+    assert len(generated.headers["X-Request-ID"]) == 32
+    assert generated.json()["request_id"] == generated.headers["X-Request-ID"]
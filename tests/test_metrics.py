@@ -0,0 +1,96 @@
+"""
+Unit tests for Prometheus metrics
+"""
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api import metrics
+from utils.metrics import MetricsMiddleware, instrument_static_methods, timed_stage, track_stage
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_track_stage_records_duration_and_errors():
+    """Test that a stage is timed and its exceptions counted by type"""
+    before = sample("stage_duration_seconds_count", stage="test.block")
+    with track_stage("test.block"):
+        assert sample("stages_in_flight", stage="test.block") == 1
+    with pytest.raises(KeyError):
+        with track_stage("test.block"):
+            raise KeyError("missing")
+
+    assert sample("stage_duration_seconds_count", stage="test.block") == before + 2
+    assert sample("stage_errors_total", stage="test.block", error="KeyError") == 1
+    assert sample("stages_in_flight", stage="test.block") == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_stage_wraps_sync_and_async_functions():
+    """Test the decorator on coroutines and on repository staticmethods"""
+    @timed_stage("test.coroutine")
+    async def work(value):
+        return value * 2
+
+    class Repository:
+        @staticmethod
+        def lookup(value):
+            return value + 1
+
+    instrument_static_methods(Repository, "test_repository")
+
+    assert await work(2) == 4
+    assert Repository.lookup(1) == 2
+    assert sample("stage_duration_seconds_count", stage="test.coroutine") == 1
+    assert sample("stage_duration_seconds_count", stage="test_repository.lookup") == 1
+
+
+def test_requests_are_labelled_by_route_template():
+    """Test per-route latency with the full template and the exposition endpoint"""
+    router = APIRouter()
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router, prefix="/api/test")
+    app.include_router(metrics.router)
+    client = TestClient(app)
+    unmatched = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+
+    client.get("/api/test/items/1")
+    client.get("/api/test/items/2")
+    client.get("/nowhere")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/test/items/{item_id}"' in response.text
+    assert sample("http_request_duration_seconds_count",
+                  method="GET", route="/api/test/items/{item_id}", status="200") == 2
+    assert sample("http_request_duration_seconds_count",
+                  method="GET", route="unmatched", status="404") == unmatched + 1
+
+
+def test_unknown_methods_share_one_label():
+    """Test that client-chosen request methods do not create new series"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+    before = sample("http_request_duration_seconds_count", method="other", route="unmatched", status="404")
+
+    client.request("FOO1", "/nowhere")
+    client.request("FOO2", "/nowhere")
+
+    assert sample("http_request_duration_seconds_count", method="other", route="unmatched", status="404") == before + 2
+    assert sample("http_request_duration_seconds_count", method="FOO1", route="unmatched", status="404") == 0
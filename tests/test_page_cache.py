@@ -0,0 +1,75 @@
+"""
+Unit tests for PageCache
+"""
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.page_cache import PageCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a PageCache in a temporary directory"""
+    return PageCache(directory=str(tmp_path), max_entries=2, max_bytes=10 * 1024 * 1024)
+
+
+def test_normalize_url():
+    """Test that equivalent URLs share a cache key"""
+    assert PageCache.normalize_url("HTTPS://Example.com:443/a?b=2&a=1#frag") == \
+        PageCache.normalize_url("https://example.com/a?a=1&b=2")
+    assert PageCache.normalize_url("http://example.com") == "http://example.com/"
+
+
+def test_put_and_get(cache):
+    """Test storing and reading back a page"""
+    assert cache.get("https://example.com/a") is None
+
+    cache.put("https://example.com/a", "<html>body</html>", "body", '"v1"', None)
+    entry = cache.get("https://example.com/a")
+
+    assert entry["text"] == "body"
+    assert entry["etag"] == '"v1"'
+    assert cache.get_body("https://example.com/a") == "<html>body</html>"
+
+
+def test_pages_without_validators_are_not_stored(cache):
+    """Test that only revalidatable pages are cached"""
+    cache.put("https://example.com/a", "<html></html>", "text", None, None)
+    assert cache.get("https://example.com/a") is None
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used page is evicted"""
+    cache.put("https://example.com/1", "one", "one", '"1"', None)
+    cache.put("https://example.com/2", "two", "two", '"2"', None)
+    cache.mark_not_modified("https://example.com/1", cache.get("https://example.com/1"))
+    cache.put("https://example.com/3", "three", "three", '"3"', None)
+
+    assert cache.get("https://example.com/2") is None
+    assert cache.get("https://example.com/1") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_index_survives_restart(cache, tmp_path):
+    """Test that a new instance picks up entries from disk"""
+    cache.put("https://example.com/a", "<html>a</html>", "a", None, "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    reopened = PageCache(directory=str(tmp_path), max_entries=2, max_bytes=10 * 1024 * 1024)
+    entry = reopened.get("https://example.com/a")
+    assert entry["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def test_not_modified_counters(cache):
+    """Test hit and bytes-saved accounting on 304"""
+    cache.put("https://example.com/a", "x" * 100, "text", '"v1"', None)
+    entry = cache.get("https://example.com/a")
+    cache.mark_not_modified("https://example.com/a", entry)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["revalidations"] == 1
+    assert stats["bytes_saved"] == 100
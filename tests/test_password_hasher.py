@@ -0,0 +1,112 @@
+"""
+Unit tests for the bcrypt worker pool and login limits
+"""
+import asyncio
+import threading
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.database import Base
+from models.user import User
+from services.async_repositories import AsyncAuthRepository
+from services.password_hasher import (
+    PasswordHasher, PasswordQueueFullError, LoginThrottledError, hash_password, hash_rounds
+)
+
+
+def make_hasher(**overrides):
+    options = dict(rounds=4, max_workers=2, max_queue_size=2, max_per_ip=2, max_per_username=1)
+    options.update(overrides)
+    return PasswordHasher(**options)
+
+
+@pytest_asyncio.fixture
+async def db():
+    """In-memory aiosqlite session with all tables"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_off_the_event_loop():
+    """Test that hashes use the configured cost and are checked in a worker thread"""
+    hasher = make_hasher(rounds=5)
+    hashed = await hasher.hash("secret1")
+
+    assert hash_rounds(hashed) == 5
+    assert not hasher.needs_rehash(hashed)
+    assert hasher.needs_rehash(hash_password("secret1", 4))
+
+    threads = []
+    with patch("services.password_hasher.check_password",
+               side_effect=lambda *args: threads.append(threading.current_thread().name) or True):
+        assert await hasher.verify("secret1", hashed)
+    assert threads[0].startswith("bcrypt")
+    assert await hasher.verify("secret1", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    assert not await hasher.verify("secret1", "not a hash")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_calls():
+    """Test that calls beyond workers plus queue are rejected"""
+    hasher = make_hasher(max_workers=1, max_queue_size=1)
+    release = threading.Event()
+    with patch("services.password_hasher.check_password", side_effect=lambda *args: release.wait(5)):
+        running = [asyncio.ensure_future(hasher.verify("a", "b")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordQueueFullError):
+            await hasher.verify("a", "b")
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_per_ip_and_username():
+    """Test that concurrent logins are capped per client and per username"""
+    hasher = make_hasher(max_per_ip=2, max_per_username=1)
+
+    async with hasher.limit("10.0.0.1", "alice"):
+        with pytest.raises(LoginThrottledError):
+            async with hasher.limit("10.0.0.2", "Alice"):
+                pass
+        async with hasher.limit("10.0.0.1", "bob"):
+            with pytest.raises(LoginThrottledError):
+                async with hasher.limit("10.0.0.1", "carol"):
+                    pass
+
+    # Slots are released on exit
+    async with hasher.limit("10.0.0.1", "alice"):
+        pass
+    assert hasher.stats()["throttled"] == 2
+    assert hasher.stats()["logins_in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_authenticate_upgrades_hash_cost(db):
+    """Test that a login re-hashes a password stored at an old cost"""
+    hasher = make_hasher(rounds=5)
+    db.add(User(email="alice@example.com", username="alice",
+                hashed_password=hash_password("secret1", 4), is_active=True))
+    await db.commit()
+
+    with patch("services.async_repositories.password_hasher", hasher):
+        assert await AsyncAuthRepository.authenticate_user(db, "alice", "wrong") is None
+        user = await AsyncAuthRepository.authenticate_user(db, "alice@example.com", "secret1")
+
+    assert user.username == "alice"
+    assert hash_rounds(user.hashed_password) == 5
@@ -0,0 +1,100 @@
+"""
+Unit tests for the token and principal cache behind get_current_user
+"""
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.auth import get_current_user
+from services.auth_service import AuthService
+from services.principal_cache import PrincipalCache
+
+
+@pytest.fixture
+def cache():
+    return PrincipalCache(ttl_seconds=30, max_entries=2, token_max_entries=10)
+
+
+def test_tokens_are_verified_once(cache):
+    """Test that a token's signature is checked only on its first use"""
+    token = AuthService.create_access_token({"sub": "alice", "user_id": 1})
+    with patch.object(AuthService, "decode_access_token", wraps=AuthService.decode_access_token) as decode:
+        assert cache.decode_token(token).username == "alice"
+        assert cache.decode_token(token).user_id == 1
+    assert decode.call_count == 1
+    assert cache.stats()["token_hits"] == 1
+
+
+def test_expired_and_invalid_tokens_are_not_served(cache):
+    """Test that cached tokens stop working at their expiry and bad tokens are never cached"""
+    expired = AuthService.create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        cache.decode_token(expired)
+    with pytest.raises(HTTPException):
+        cache.decode_token("not-a-token")
+    assert cache.stats()["tokens"] == 0
+
+    # Past its expiry a cached token is verified again (and rejected by jose)
+    token = AuthService.create_access_token({"sub": "alice"}, expires_delta=timedelta(minutes=5))
+    cache.decode_token(token)
+    with patch("services.principal_cache.time.time", return_value=10 ** 12), \
+            patch.object(AuthService, "decode_access_token", side_effect=HTTPException(401)) as decode:
+        with pytest.raises(HTTPException):
+            cache.decode_token(token)
+    assert decode.call_count == 1
+
+
+def test_principal_hits_return_detached_copies(cache, user):
+    """Test that a hit rebuilds the user without touching the database"""
+    assert cache.get("alice", user.id) is None
+    cache.set("alice", user.id, user)
+
+    first = cache.get("alice", user.id)
+    second = cache.get("alice", user.id)
+
+    assert (first.id, first.email, first.is_active) == (user.id, "alice@example.com", True)
+    assert first is not second and first is not user
+    assert cache.get("alice", user.id + 1) is None
+    assert cache.stats()["db_round_trips_saved"] == 2
+
+
+def test_principals_expire_and_are_bounded(cache, user):
+    """Test TTL expiry and LRU eviction"""
+    cache.set("alice", user.id, user)
+    with patch("services.principal_cache.time.monotonic", return_value=10 ** 12):
+        assert cache.get("alice", user.id) is None
+
+    for user_id in (1, 2, 3):
+        cache.set(f"user{user_id}", user_id, user)
+    assert cache.stats()["principals"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_updating_a_user_invalidates_it(db, user):
+    """Test that deactivating a user through the ORM drops the cached principal"""
+    with patch("services.principal_cache.principal_cache", PrincipalCache(30, 10, 10)) as cache:
+        cache.set("alice", user.id, user)
+        user.is_active = False
+        db.commit()
+
+        assert cache.get("alice", user.id) is None
+        assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_queries_once(user):
+    """Test that repeated requests with one token share a single user lookup"""
+    token = AuthService.create_access_token({"sub": "alice", "user_id": user.id})
+    lookup = AsyncMock(return_value=user)
+    with patch("api.auth.principal_cache", PrincipalCache(30, 10, 10)), \
+            patch("api.auth.AsyncAuthRepository.get_user_by_username", lookup):
+        for _ in range(3):
+            assert (await get_current_user(token=token, db=None)).username == "alice"
+
+    assert lookup.await_count == 1
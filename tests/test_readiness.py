@@ -0,0 +1,167 @@
+"""
+Unit tests for the readiness probe
+"""
+import asyncio
+import sqlite3
+import time
+import pytest
+from contextlib import contextmanager
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api import health
+from config.settings import settings
+from models import async_database
+from services import readiness
+from services.readiness import ReadinessProbe
+
+
+class FakeExecutor:
+    capacity = 10
+
+    def __init__(self, active=0, queued=0):
+        self.active = active
+        self.queued = queued
+
+    def stats(self):
+        return {"active": self.active, "queued": self.queued}
+
+
+class FakeClient:
+    def __init__(self, in_flight=0):
+        self.in_flight = in_flight
+
+    def stats(self):
+        return {"in_flight": self.in_flight, "max_connections": 10, "hosts": 0}
+
+
+def make_probe(executor=None, client=None, cache_seconds=0.0, **overrides):
+    options = dict(
+        cache_seconds=cache_seconds,
+        db_timeout_seconds=2.0,
+        max_db_latency_ms=1000.0,
+        lag_interval_seconds=0.01,
+        max_loop_lag_ms=250.0,
+        max_inference_queue_ratio=0.9,
+        max_scraper_saturation=0.9,
+        executor=executor or FakeExecutor(),
+        client=client or FakeClient()
+    )
+    options.update(overrides)
+    return ReadinessProbe(**options)
+
+
+@pytest.mark.asyncio
+async def test_ready_when_all_checks_pass():
+    """Test that an idle worker with a reachable database is ready"""
+    probe = make_probe()
+    ready, checks = await probe.check()
+
+    assert ready
+    assert set(checks) == {"database", "event_loop", "inference", "scraper"}
+    assert checks["database"]["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_saturated_inference_or_scraper_is_not_ready():
+    """Test that crossing the queue and pool thresholds fails readiness"""
+    ready, checks = await make_probe(executor=FakeExecutor(active=4, queued=5)).check()
+    assert not ready
+    assert not checks["inference"]["ok"]
+
+    ready, checks = await make_probe(client=FakeClient(in_flight=10)).check()
+    assert not ready
+    assert not checks["scraper"]["ok"]
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached():
+    """Test that probes within the cache period reuse the last result"""
+    executor = FakeExecutor()
+    probe = make_probe(executor=executor, cache_seconds=60.0)
+    assert (await probe.check())[0]
+
+    executor.queued = 10
+    assert (await probe.check())[0]
+
+
+@pytest.mark.asyncio
+async def test_database_failure_is_not_ready(monkeypatch):
+    """Test that an unreachable or slow database fails readiness"""
+    class SlowSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def run_sync(self, fn):
+            await asyncio.sleep(1)
+
+    if async_database.async_engine is None:
+        async_database.configure_async_database()
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "always")
+    monkeypatch.setattr(async_database, "AsyncSessionLocal", SlowSession)
+
+    ready, checks = await make_probe(db_timeout_seconds=0.05).check()
+    assert not ready
+    assert "error" in checks["database"]
+
+
+def test_locked_sqlite_database_is_not_ready(monkeypatch, tmp_path):
+    """Test that /health/ready returns 503 while another connection locks the SQLite file"""
+    path = tmp_path / "locked.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 0.1})
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def locked_db_session():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(settings, "DATABASE_ASYNC_SESSIONS", "never")
+    monkeypatch.setattr(readiness, "db_session", locked_db_session)
+    monkeypatch.setattr(health, "readiness_probe", make_probe())
+    app = FastAPI()
+    app.include_router(health.router)
+    client = TestClient(app)
+    assert client.get("/health/ready").status_code == 200
+
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN EXCLUSIVE")
+    try:
+        response = client.get("/health/ready")
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+        engine.dispose()
+
+    assert response.status_code == 503
+    assert "locked" in response.json()["checks"]["database"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_is_sampled():
+    """Test that blocking the loop shows up as lag"""
+    probe = make_probe(max_loop_lag_ms=50.0)
+    await probe.start()
+    try:
+        await asyncio.sleep(0)
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        ready, checks = await probe.check()
+    finally:
+        await probe.stop()
+
+    assert not checks["event_loop"]["ok"]
+    assert checks["event_loop"]["lag_ms"] >= 50
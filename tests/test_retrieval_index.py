@@ -0,0 +1,111 @@
+"""
+Unit tests for the BM25 retrieval index
+"""
+import threading
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.retrieval_index import BM25Index, RetrievalIndexStore, default_index_dir
+
+
+CHUNKS = [
+    (10, 1, "The storage layer writes pages to disk and keeps a write-ahead log."),
+    (11, 1, "The network layer retries failed requests with exponential backoff."),
+    (12, 2, "Billing runs nightly and sends invoices to every customer."),
+    (13, 2, "Invoices list each billing item and the tax that applies."),
+]
+
+
+def test_search_ranks_matching_chunks():
+    """Test that chunks sharing rare query terms rank first"""
+    index = BM25Index.build([1, 2], CHUNKS)
+
+    results = index.search("When are invoices sent for billing?", k=3)
+
+    assert [chunk_id for chunk_id, _ in results][:2] in ([12, 13], [13, 12])
+    assert all(score > 0 for _, score in results)
+    assert index.search("kubernetes", k=3) == []
+
+
+def test_leading_chunks():
+    """Test that leading chunks follow document order"""
+    index = BM25Index.build([1, 2], CHUNKS)
+
+    assert index.leading_chunks(2, 1) == [12]
+    assert index.leading_chunks(1, 5) == [10, 11]
+
+
+def test_store_persists_and_reuses_index(tmp_path):
+    """Test that an index is built once and then loaded from disk"""
+    calls = []
+
+    def load():
+        calls.append(1)
+        return CHUNKS
+
+    first = RetrievalIndexStore(str(tmp_path), max_cached=2)
+    built = first.get(7, [2, 1], load)
+    assert os.path.exists(tmp_path / "session_7.json.gz")
+    assert first.get(7, [1, 2], load) is built
+
+    second = RetrievalIndexStore(str(tmp_path), max_cached=2)
+    loaded = second.get(7, [1, 2], load)
+
+    assert len(calls) == 1
+    assert second.stats()["disk_loads"] == 1
+    assert loaded.search("invoices", k=1) == built.search("invoices", k=1)
+
+
+def test_store_rebuilds_when_documents_change(tmp_path):
+    """Test that a different document set triggers a rebuild"""
+    store = RetrievalIndexStore(str(tmp_path), max_cached=2)
+    store.get(7, [1, 2], lambda: CHUNKS)
+
+    index = store.get(7, [1], lambda: CHUNKS[:2])
+
+    assert len(index) == 2
+    assert store.stats()["builds"] == 2
+
+
+def test_invalidate_removes_file(tmp_path):
+    """Test that invalidation drops the persisted index"""
+    store = RetrievalIndexStore(str(tmp_path), max_cached=2)
+    store.get(7, [1, 2], lambda: CHUNKS)
+
+    store.invalidate(7)
+
+    assert not os.path.exists(tmp_path / "session_7.json.gz")
+    assert store.stats()["cached"] == 0
+
+
+def test_default_index_dir():
+    """Test that indexes are kept next to the SQLite database"""
+    assert default_index_dir("sqlite:///./data/summarizer.db") == os.path.join("./data", "retrieval_index")
+    assert default_index_dir("postgresql://db/app") == os.path.join("./data", "retrieval_index")
+
+
+@pytest.mark.asyncio
+async def test_async_get_builds_off_the_event_loop(tmp_path):
+    """Test that loading and building run in a worker thread, the row read on the loop"""
+    loop_thread = threading.get_ident()
+    build_threads = []
+
+    async def load():
+        assert threading.get_ident() == loop_thread
+        return CHUNKS
+
+    store = RetrievalIndexStore(str(tmp_path), max_cached=2)
+    build = store._build
+    store._build = lambda *args: build_threads.append(threading.get_ident()) or build(*args)
+
+    index = await store.get_async(7, [1, 2], load)
+    assert build_threads and build_threads[0] != loop_thread
+    assert await store.get_async(7, [2, 1], load) is index
+
+    reloaded = await RetrievalIndexStore(str(tmp_path), max_cached=2).get_async(7, [1, 2], load)
+    assert reloaded.search("invoices", k=1) == index.search("invoices", k=1)
+    assert store.stats()["builds"] == 1
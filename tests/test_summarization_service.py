@@ -57,3 +57,26 @@ async def test_summarize_length_presets(service):
         # Test detailed
         await service.summarize(text="Test text", length="detailed")
         assert mock_summarize.call_args[1]["max_length"] == 250
+
+
+@pytest.mark.asyncio
+async def test_summarize_long_text_uses_map_reduce(service):
+    """Test that text over MAX_INPUT_LENGTH is summarized in chunks"""
+    text = " ".join(f"Sentence number {i} of a long document." for i in range(200))
+    
+    with patch.object(service.model, 'summarize') as mock_summarize, \
+            patch("services.summarization_service.settings") as mock_settings:
+        mock_summarize.return_value = "Partial."
+        mock_settings.MAX_INPUT_LENGTH = 2000
+        mock_settings.SUMMARY_CHUNK_SIZE = 1000
+        mock_settings.SUMMARY_CHUNK_OVERLAP = 100
+        mock_settings.SUMMARY_CHUNK_CONCURRENCY = 2
+        mock_settings.SUMMARY_MAX_REDUCE_DEPTH = 3
+        
+        result = await service.summarize(text=text, length="short")
+        
+        assert result == "Partial."
+        # One call per chunk plus the final reduce
+        assert mock_summarize.call_count > 2
+        assert all(len(c[1]["text"]) <= 2000 for c in mock_summarize.call_args_list)
+        assert mock_summarize.call_args[1]["max_length"] == 100
@@ -0,0 +1,88 @@
+"""
+Unit tests for SummaryCache
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import OperationalError
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def cache():
+    """Create an in-memory SummaryCache"""
+    return SummaryCache(max_entries=2, ttl_seconds=60)
+
+
+def test_key_ignores_whitespace_differences():
+    """Test that formatting-only changes map to the same key"""
+    key_a = SummaryCache.make_key("Hello   world\n", "short", "model-a")
+    key_b = SummaryCache.make_key(" Hello world", "short", "model-a")
+    assert key_a == key_b
+
+
+def test_key_depends_on_length_and_model():
+    """Test that length preset and model are part of the key"""
+    base = SummaryCache.make_key("Hello world", "short", "model-a")
+    assert base != SummaryCache.make_key("Hello world", "medium", "model-a")
+    assert base != SummaryCache.make_key("Hello world", "short", "model-b")
+
+
+def test_get_and_set(cache):
+    """Test hit and miss accounting"""
+    assert cache.get("k1") is None
+    cache.set("k1", "summary", "short", "model-a")
+    assert cache.get("k1") == "summary"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used entry is evicted"""
+    cache.set("k1", "one", "short", "model-a")
+    cache.set("k2", "two", "short", "model-a")
+    cache.get("k1")
+    cache.set("k3", "three", "short", "model-a")
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == "one"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(cache):
+    """Test that expired entries are not served"""
+    with patch("services.summary_cache.time.monotonic", return_value=1000.0):
+        cache.set("k1", "summary", "short", "model-a")
+    with patch("services.summary_cache.time.monotonic", return_value=1061.0):
+        assert cache.get("k1") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_persistent_hit_is_read_only(db):
+    """Test that a hit on a recently used row does not write"""
+    cache = SummaryCache(max_entries=2, ttl_seconds=60, persistent=True)
+    cache.set("k1", "summary", "short", "model-a", db=db)
+    cache.clear()
+
+    with patch.object(db, "commit") as commit:
+        assert cache.get("k1", db=db) == "summary"
+    commit.assert_not_called()
+    assert cache.stats()["persistent_hits"] == 1
+
+
+def test_persistent_read_error_is_a_miss():
+    """Test that a database error on lookup is logged and treated as a miss"""
+    db = MagicMock()
+    db.query.side_effect = OperationalError("SELECT", {}, Exception("database is locked"))
+    cache = SummaryCache(max_entries=2, ttl_seconds=60, persistent=True)
+
+    assert cache.get("k1", db=db) is None
+    db.rollback.assert_called_once()
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,57 @@
+"""
+Unit tests for TextChunker
+"""
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.text_chunker import TextChunker
+
+
+def test_short_text_is_single_chunk():
+    """Test that text under the limit is returned unchanged"""
+    assert TextChunker(max_chars=100).split("  Short text.  ") == ["Short text."]
+
+
+def test_chunks_respect_max_chars():
+    """Test that no chunk exceeds max_chars"""
+    paragraphs = [
+        " ".join(f"Sentence {p}-{i} has a few words." for i in range(40))
+        for p in range(20)
+    ]
+    chunks = TextChunker(max_chars=500, overlap_chars=100).split("\n\n".join(paragraphs))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert chunks[0].startswith("Sentence 0-0")
+    assert chunks[-1].endswith("Sentence 19-39 has a few words.")
+
+
+def test_chunks_overlap_on_sentences():
+    """Test that consecutive chunks share trailing sentences"""
+    text = " ".join(f"Sentence number {i}." for i in range(100))
+    chunks = TextChunker(max_chars=200, overlap_chars=50).split(text)
+
+    last_sentence = chunks[0].split(". ")[-1]
+    assert last_sentence in chunks[1]
+
+
+def test_oversized_words_are_not_dropped():
+    """Test hard splitting of text without whitespace"""
+    chunks = TextChunker(max_chars=50).split("x" * 120 + " tail.")
+    assert "".join(chunks).replace(" ", "").count("x") == 120
+
+
+def test_oversized_words_keep_document_order():
+    """Test that words before an oversized word stay before its pieces"""
+    chunks = TextChunker(max_chars=10)._hard_split("a b " + "x" * 25 + " c d")
+    assert chunks == ["a b", "x" * 10, "x" * 10, "xxxxx c d"]
+
+
+def test_invalid_overlap():
+    """Test that overlap must be smaller than the chunk size"""
+    with pytest.raises(ValueError):
+        TextChunker(max_chars=100, overlap_chars=100)
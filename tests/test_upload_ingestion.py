@@ -0,0 +1,113 @@
+"""
+Unit tests for UploadIngestor
+"""
+import pytest
+import io
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from services.upload_ingestion import UploadIngestor, UploadTooLargeError
+
+
+class FakeUpload:
+    """Minimal stand-in for fastapi.UploadFile"""
+    
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.size = None
+        self.file = io.BytesIO(content)
+    
+    async def read(self, size: int = -1) -> bytes:
+        return self.file.read(size)
+    
+    async def seek(self, offset: int):
+        self.file.seek(offset)
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """Create an UploadIngestor with small limits"""
+    return UploadIngestor(max_bytes=1000, spool_threshold=100, chunk_size=32, temp_dir=str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_small_upload_stays_in_memory(ingestor):
+    """Test that uploads under the threshold are not spooled"""
+    upload = await ingestor.ingest(FakeUpload("a.txt", b"hello"))
+    
+    assert not upload.on_disk
+    assert upload.source == b"hello"
+    with upload.open() as f:
+        assert f.read() == b"hello"
+
+
+@pytest.mark.asyncio
+async def test_large_upload_is_read_from_its_spool_file(ingestor, tmp_path):
+    """Test that uploads over the threshold are parsed from the request's file, not copied"""
+    content = bytes(range(256)) * 2
+    file = FakeUpload("a.pdf", content)
+    upload = await ingestor.ingest(file)
+    
+    assert upload.on_disk
+    assert os.listdir(tmp_path) == []
+    with upload.open() as f:
+        assert f.read() == content
+    assert not file.file.closed
+    
+    # Worker processes get a temp copy, made only when asked for
+    path = upload.source
+    assert path.endswith(".pdf")
+    with open(path, "rb") as f:
+        assert f.read() == content
+    
+    upload.cleanup()
+    assert not os.path.exists(path)
+    assert ingestor.stats()["spooled_to_disk"] == 1
+    assert ingestor.stats()["bytes_processed"] == len(content)
+
+
+@pytest.mark.asyncio
+async def test_save_writes_the_upload(ingestor, tmp_path):
+    """Test that an upload can be stored for a queued job from either form"""
+    for name, content in [("small.txt", b"hello"), ("large.txt", b"z" * 500)]:
+        with await ingestor.ingest(FakeUpload(name, content)) as upload:
+            upload.save(str(tmp_path / name))
+        assert (tmp_path / name).read_bytes() == content
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_is_rejected(ingestor, tmp_path):
+    """Test that the size limit is enforced while streaming"""
+    with pytest.raises(UploadTooLargeError):
+        await ingestor.ingest(FakeUpload("a.pdf", b"x" * 2000))
+    
+    assert os.listdir(tmp_path) == []
+    assert ingestor.stats()["rejected_too_large"] == 1
+
+
+@pytest.mark.asyncio
+async def test_declared_size_is_checked_before_reading(ingestor):
+    """Test early rejection when the upload size is known"""
+    upload = FakeUpload("a.pdf", b"")
+    upload.size = 5000
+    
+    with pytest.raises(UploadTooLargeError):
+        await ingestor.ingest(upload)
+
+
+@pytest.mark.asyncio
+async def test_upload_hash_matches_content(ingestor):
+    """Test that the content hash is computed while streaming, in memory or spooled"""
+    import hashlib
+    content = b"y" * 500
+    
+    small = await ingestor.ingest(FakeUpload("a.txt", b"hello"))
+    large = await ingestor.ingest(FakeUpload("b.txt", content))
+    
+    assert small.sha256 == hashlib.sha256(b"hello").hexdigest()
+    assert large.on_disk
+    assert large.sha256 == hashlib.sha256(content).hexdigest()
+    large.cleanup()